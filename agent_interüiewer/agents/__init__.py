@@ -10,7 +10,55 @@ from .boss_interviewer import create_boss_interviewer
 from .candidate_agent import create_candidate_agent
 from .score_evaluator import create_score_evaluator
 from .info_extractor import create_info_extractor
-from .hr_offer_agent import create_hr_offer_agent, generate_offer_letter, should_generate_offer
+from .hr_offer_agent import (
+    create_hr_offer_agent,
+    generate_offer_letter,
+    generate_offer_letter_async,
+    generate_offer_letter_fallback,
+    generate_offer_letter_with_market_data,
+    generate_offer_letters,
+    build_offer_context,
+    prepare_offer_batch,
+    get_baseline_salary,
+    get_market_salary_data_by_location,
+    get_market_salary_data_for_queries,
+    warm_market_salary_data,
+    get_salary_lookup_metrics,
+    resolve_offer_locations,
+    resolve_offer_position,
+    resolve_offer_position_async,
+    resolve_offer_positions,
+    should_generate_offer,
+    start_market_salary_prefetch
+)
+from .mcp_pool import close_mcp_pool, get_mcp_pool
+from .salary_warmer import SalaryCacheWarmer, warm_salary_cache
+from .salary_snapshot import SalarySnapshot, get_salary_snapshot, import_salary_dumps
+from .skill_taxonomy import SKILL_CATEGORIES, analyze_candidate, score_skills, weighted_scores
+from .position_classifier import (
+    PositionClassifier,
+    classify_position,
+    classify_position_async,
+    classify_positions,
+    classify_positions_async
+)
+from .title_translator import TitleTranslationCache, resolve_english_position, warm_title_translations
+from .offer_templates import OFFER_LOCALE, register_offer_templates, render_offer_letter
+from .offer_regenerator import dedupe_offer_files, find_interview_results, regenerate_offers
+from .storage_utils import atomic_write_bytes, atomic_write_json, atomic_write_text, interview_stamp, new_interview_id, unique_stamp
+from .blob_store import BlobStore, get_blob_store
+from .result_archive import (
+    RESULTS_EXPORT_FORMAT,
+    load_result_file,
+    migrate_results,
+    pack_result,
+    result_path_for,
+    unpack_result,
+    write_result_file
+)
+from .results_store import RESULTS_JSON_EXPORT, ResultsStore, get_results_store, month_range
+from .transcript_journal import TranscriptJournal, follow_journal, journal_path, read_journal
+from .salary_stats import QuantileSketch, compute_salary_statistics, score_to_percentile, suggest_salaries
 
 __all__ = [
     'create_technical_interviewer',
@@ -21,5 +69,73 @@ __all__ = [
     'create_info_extractor',
     'create_hr_offer_agent',
     'generate_offer_letter',
-    'should_generate_offer'
+    'generate_offer_letter_async',
+    'generate_offer_letter_fallback',
+    'generate_offer_letter_with_market_data',
+    'generate_offer_letters',
+    'build_offer_context',
+    'prepare_offer_batch',
+    'get_baseline_salary',
+    'get_market_salary_data_by_location',
+    'get_market_salary_data_for_queries',
+    'warm_market_salary_data',
+    'get_salary_lookup_metrics',
+    'resolve_offer_locations',
+    'resolve_offer_position',
+    'resolve_offer_position_async',
+    'resolve_offer_positions',
+    'should_generate_offer',
+    'start_market_salary_prefetch',
+    'close_mcp_pool',
+    'get_mcp_pool',
+    'SalaryCacheWarmer',
+    'warm_salary_cache',
+    'SalarySnapshot',
+    'get_salary_snapshot',
+    'import_salary_dumps',
+    'SKILL_CATEGORIES',
+    'analyze_candidate',
+    'score_skills',
+    'weighted_scores',
+    'PositionClassifier',
+    'classify_position',
+    'classify_position_async',
+    'classify_positions',
+    'classify_positions_async',
+    'TitleTranslationCache',
+    'resolve_english_position',
+    'warm_title_translations',
+    'OFFER_LOCALE',
+    'register_offer_templates',
+    'render_offer_letter',
+    'dedupe_offer_files',
+    'find_interview_results',
+    'regenerate_offers',
+    'atomic_write_bytes',
+    'atomic_write_json',
+    'atomic_write_text',
+    'interview_stamp',
+    'new_interview_id',
+    'unique_stamp',
+    'BlobStore',
+    'get_blob_store',
+    'RESULTS_EXPORT_FORMAT',
+    'load_result_file',
+    'migrate_results',
+    'pack_result',
+    'result_path_for',
+    'unpack_result',
+    'write_result_file',
+    'RESULTS_JSON_EXPORT',
+    'ResultsStore',
+    'get_results_store',
+    'month_range',
+    'TranscriptJournal',
+    'follow_journal',
+    'journal_path',
+    'read_journal',
+    'QuantileSketch',
+    'compute_salary_statistics',
+    'score_to_percentile',
+    'suggest_salaries'
 ]
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+内容寻址存储
+offer 通知信和面试对话内容按 SHA-256 保存为 data/blobs/<前两位>/<哈希>，每份内容只存一次：
+重新生成的相同 offer、重放的相同对话不再占用额外空间。
+offer 文件是指向 blob 的硬链接（文件系统不支持时退回为复制），面试结果存储只记录哈希；
+gc 删除不再被引用的 blob
+"""
+
+import os
+import time
+import hashlib
+import tempfile
+from pathlib import Path
+
+from .storage_utils import atomic_write_bytes
+
+BLOB_DIR = os.getenv("BLOB_DIR", "data/blobs")
+# 新写入的 blob 在这段时间内不会被 gc 删除（秒），避免删除正在保存、还未记录引用的内容
+BLOB_GC_GRACE = int(os.getenv("BLOB_GC_GRACE", "3600"))
+
+def blob_digest(data):
+    """内容的 SHA-256（十六进制）"""
+    return hashlib.sha256(data).hexdigest()
+
+class BlobStore:
+    """按内容哈希保存的只读文件存储"""
+
+    def __init__(self, root=BLOB_DIR):
+        self.root = Path(root)
+
+    def path(self, digest):
+        """blob 文件路径"""
+        return self.root / digest[:2] / digest
+
+    def has(self, digest):
+        """blob 是否存在"""
+        return self.path(digest).exists()
+
+    def put(self, data):
+        """保存内容，返回哈希（内容已存在时不重复写入）"""
+        digest = blob_digest(data)
+        path = self.path(digest)
+        if path.exists():
+            # 刷新修改时间，保存期间不会被 gc 当作过期内容删除
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        else:
+            self._create(path, data)
+        return digest
+
+    @staticmethod
+    def _create(path, data):
+        """写入新 blob：先写临时文件，再用硬链接发布（已存在时保留先写入的那份，不替换 inode）"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            # blob 与 offer 文件共享 inode，设为只读防止就地修改
+            os.chmod(tmp_path, 0o444)
+            try:
+                os.link(tmp_path, path)
+            except FileExistsError:
+                # 其他进程同时写入了相同内容
+                pass
+            except OSError:
+                # 文件系统不支持硬链接
+                if not path.exists():
+                    os.replace(tmp_path, path)
+        finally:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+
+    def put_text(self, text):
+        """保存文本（UTF-8），返回哈希"""
+        return self.put(text.encode("utf-8"))
+
+    def get(self, digest):
+        """读取内容，不存在时抛出 FileNotFoundError"""
+        with open(self.path(digest), "rb") as f:
+            return f.read()
+
+    def get_text(self, digest):
+        """读取文本"""
+        return self.get(digest).decode("utf-8")
+
+    def digests(self):
+        """所有 blob 的哈希"""
+        if not self.root.exists():
+            return
+        for directory in self.root.iterdir():
+            if directory.is_dir() and len(directory.name) == 2:
+                for path in directory.iterdir():
+                    if len(path.name) == 64 and path.name.startswith(directory.name):
+                        yield path.name
+
+    def link(self, digest, target):
+        """让 target 成为 blob 的硬链接（原子替换已有文件），不支持硬链接时复制"""
+        source = self.path(digest)
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists() and os.path.samefile(source, target):
+            return
+        tmp_path = target.with_name(f".{target.name}.{os.getpid()}.{time.time_ns()}.link")
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            # 跨设备或文件系统不支持硬链接
+            atomic_write_bytes(target, self.get(digest))
+            return
+        try:
+            os.replace(tmp_path, target)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def write_linked(self, target, text):
+        """保存文本并让 target 指向它，返回哈希"""
+        digest = self.put_text(text)
+        self.link(digest, target)
+        return digest
+
+    def gc(self, referenced, grace=BLOB_GC_GRACE, dry_run=False):
+        """删除不再被引用的 blob
+
+        Args:
+            referenced (set): 仍被引用的哈希
+            grace (int): 最近 grace 秒内写入的 blob 保留
+            dry_run (bool): 只统计不删除
+
+        Returns:
+            dict: 统计信息（blobs、removed、freed_bytes）
+        """
+        cutoff = time.time() - grace
+        stats = {"blobs": 0, "removed": 0, "freed_bytes": 0}
+        for digest in list(self.digests()):
+            stats["blobs"] += 1
+            path = self.path(digest)
+            info = path.stat()
+            # 仍有硬链接（offer 文件）或刚写入的 blob 保留
+            if digest in referenced or info.st_nlink > 1 or info.st_mtime > cutoff:
+                continue
+            stats["removed"] += 1
+            stats["freed_bytes"] += info.st_size
+            if not dry_run:
+                path.unlink()
+        return stats
+
+# 进程内共享的存储实例
+_blob_store = None
+
+def get_blob_store():
+    """获取共享的内容寻址存储实例"""
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = BlobStore()
+    return _blob_store
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+熔断器
+上游连续失败后暂停请求，冷却期过后放行一个试探请求，成功则恢复
+"""
+
+import time
+
+class CircuitBreaker:
+    """熔断器（closed → open → half_open → closed）
+
+    - closed：正常放行，连续失败达到阈值后熔断
+    - open：直接拒绝，冷却 reset_timeout 秒后进入 half_open
+    - half_open：只放行一个试探请求，成功则恢复，失败则重新熔断
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=60.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self.stats = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def allow(self):
+        """是否放行本次请求"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.stats["rejected"] += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.stats["rejected"] += 1
+                return False
+            self._probe_in_flight = True
+
+        return True
+
+    def record_success(self):
+        """记录一次成功请求"""
+        self.stats["successes"] += 1
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+        if self.state != self.CLOSED:
+            print(f"✅ {self.name} 熔断器已恢复")
+        self.state = self.CLOSED
+
+    def record_failure(self):
+        """记录一次失败请求"""
+        self.stats["failures"] += 1
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.stats["opened"] += 1
+                print(f"⚠️ {self.name} 连续失败{self.consecutive_failures}次，熔断{self.reset_timeout:g}秒")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """请求被调用方取消，不计成功也不计失败，只释放半开状态下的试探名额"""
+        self._probe_in_flight = False
+
+    def snapshot(self):
+        """熔断器状态，用于监控"""
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            **self.stats
+        }
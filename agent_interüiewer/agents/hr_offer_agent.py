@@ -10,12 +10,19 @@ import aiohttp
 from datetime import datetime
 from pathlib import Path
 
-# MCP 协议相关导入
-try:
-    from autogen_ext.tools.mcp import StdioServerParams, mcp_server_tools
-    MCP_AVAILABLE = True
-except ImportError:
-    MCP_AVAILABLE = False
+# MCP 协议相关导入（常驻连接池）
+from .mcp_pool import MCP_AVAILABLE, get_mcp_pool
+from .salary_cache import get_salary_cache
+from .salary_stats import QuantileSketch, suggest_salaries
+from .salary_snapshot import SALARY_SOURCE, get_salary_snapshot
+from .circuit_breaker import CircuitBreaker
+from .skill_taxonomy import analyze_candidate, score_skills, weighted_scores
+from .position_classifier import classify_position, classify_position_async, classify_positions_async
+from .title_translator import DEFAULT_ENGLISH_POSITION, lookup_english_position, resolve_english_position
+from .offer_templates import OFFER_LOCALE, render_offer_letter, resolve_offer_locale
+from .results_store import get_results_store, load_indexed_result
+
+if not MCP_AVAILABLE:
     print("警告: MCP 协议不可用，将使用直接 HTTP 调用")
 
 # Adzuna API 配置（从环境变量读取）
@@ -23,55 +30,381 @@ ADZUNA_APP_ID = os.getenv("ADZUNA_APP_ID", "")
 ADZUNA_APP_KEY = os.getenv("ADZUNA_APP_KEY", "")
 ADZUNA_BASE_URL = os.getenv("ADZUNA_BASE_URL", "https://api.adzuna.com/v1/api/jobs/gb/search/1")
 
-async def get_market_salary_data(position="Python Developer", location="London"):
-    """通过 Adzuna API 获取市场薪资数据"""
-    # 优先使用 MCP 协议
-    if MCP_AVAILABLE:
-        return await get_market_salary_data_mcp(position, location)
-    else:
-        # 备用方案：直接 HTTP 调用
-        return await get_market_salary_data_http(position, location)
+# 多页抓取配置（页数、并发页数、样本数达到后提前结束，0表示不提前结束）
+ADZUNA_PAGES = int(os.getenv("ADZUNA_PAGES", "1"))
+ADZUNA_PAGE_CONCURRENCY = int(os.getenv("ADZUNA_PAGE_CONCURRENCY", "4"))
+ADZUNA_MIN_SAMPLES = int(os.getenv("ADZUNA_MIN_SAMPLES", "0"))
 
-async def get_market_salary_data_mcp(position="Python Developer", location="London"):
-    """通过 MCP 协议获取市场薪资数据"""
+# 时间预算（秒）：offer 阶段等待薪资查询的上限、单次上游请求的上限
+SALARY_LOOKUP_TIMEOUT = float(os.getenv("SALARY_LOOKUP_TIMEOUT", "5"))
+ADZUNA_REQUEST_TIMEOUT = float(os.getenv("ADZUNA_REQUEST_TIMEOUT", "15"))
+
+# 熔断配置（连续失败次数、熔断冷却秒数）
+SALARY_BREAKER_FAILURES = int(os.getenv("SALARY_BREAKER_FAILURES", "3"))
+SALARY_BREAKER_RESET = float(os.getenv("SALARY_BREAKER_RESET", "60"))
+
+# Adzuna 上游熔断器（MCP 和 HTTP 共用）
+_salary_breaker = CircuitBreaker("Adzuna", SALARY_BREAKER_FAILURES, SALARY_BREAKER_RESET)
+
+# 薪资查询监控计数
+_salary_lookup_metrics = {
+    "lookups": 0,               # offer 阶段的薪资查询次数
+    "lookup_timeouts": 0,       # 超出 SALARY_LOOKUP_TIMEOUT 的查询
+    "upstream_timeouts": 0,     # 超出 ADZUNA_REQUEST_TIMEOUT 的上游请求
+    "baseline_fallbacks": 0     # 没有市场数据、使用职位基准薪资生成的offer
+}
+
+# 默认招聘地点（逗号分隔，第一个为主要工作地点）
+SALARY_LOCATIONS = [l.strip() for l in os.getenv("SALARY_LOCATIONS", "London").split(",") if l.strip()] or ["London"]
+
+# 地点名称映射（英文到中文，用于offer信）
+LOCATION_NAMES = {
+    "london": "伦敦",
+    "manchester": "曼彻斯特",
+    "birmingham": "伯明翰",
+    "leeds": "利兹",
+    "liverpool": "利物浦",
+    "bristol": "布里斯托",
+    "sheffield": "谢菲尔德",
+    "nottingham": "诺丁汉",
+    "newcastle": "纽卡斯尔",
+    "reading": "雷丁",
+    "cambridge": "剑桥",
+    "oxford": "牛津",
+    "edinburgh": "爱丁堡",
+    "glasgow": "格拉斯哥",
+    "cardiff": "加的夫",
+    "belfast": "贝尔法斯特"
+}
+
+class SalaryUpstreamError(Exception):
+    """Adzuna 上游故障（连接、HTTP 状态码或响应异常），计入熔断器；查询没有薪资数据不属于故障"""
+
+def get_salary_lookup_metrics():
+    """薪资查询监控数据：熔断器状态、超时次数和基准薪资回退次数"""
+    return {
+        **_salary_lookup_metrics,
+        "breaker": _salary_breaker.snapshot()
+    }
+
+async def get_market_salary_data(position="Python Developer", location="London", timeout=None):
+    """获取市场薪资数据
+    
+    - SALARY_SOURCE=offline：只查询本地薪资快照，不访问网络
+    - 其他情况：优先读取本地缓存（过期数据先返回再后台刷新），上游请求失败时使用快照
+    
+    Args:
+        timeout (float): 等待上限（秒），默认 SALARY_LOOKUP_TIMEOUT；超时后返回快照或 None，
+            上游请求仍在后台完成并写入缓存
+    """
+    if SALARY_SOURCE == "offline":
+        return get_salary_snapshot().lookup(position, location)
+    
+    _salary_lookup_metrics["lookups"] += 1
+    timeout = SALARY_LOOKUP_TIMEOUT if timeout is None else timeout
     try:
-        # 创建 MCP 服务器连接
-        adzuna_server = StdioServerParams(
-            command="python",
-            args=["mcp_servers/adzuna_mcp_server.py"]
+        market_data = await asyncio.wait_for(
+            get_salary_cache().get_or_fetch(position, location, fetch_market_salary_data),
+            timeout
         )
+    except asyncio.TimeoutError:
+        _salary_lookup_metrics["lookup_timeouts"] += 1
+        print(f"⚠️ 市场薪资查询超过{timeout:g}秒: {position} @ {location}")
+        market_data = None
+    
+    if market_data is None:
+        market_data = get_salary_snapshot().lookup(position, location)
+        if market_data:
+            print(f"⚠️ 实时薪资数据不可用，使用离线快照: {position} @ {location}")
+    return market_data
+
+async def get_market_salary_data_by_location(position="Python Developer", locations=None):
+    """并发获取多个地点的市场薪资数据，总耗时取决于最慢的一个地点
+    
+    Args:
+        position (str): 英文职位名称
+        locations (list): 地点列表，默认使用 SALARY_LOCATIONS
         
-        # 获取 MCP 工具
-        tools = await mcp_server_tools(adzuna_server)
-        
-        # 查找薪资数据工具
-        for tool in tools:
-            if tool.get("name") == "get_market_salary_data":
-                # 调用 MCP 工具
-                result = await tool["function"](position=position, location=location)
-                if result.get("success", True):
-                    return {
-                        'average_salary': result.get('average_salary'),
-                        'min_salary': result.get('min_salary'),
-                        'max_salary': result.get('max_salary'),
-                        'sample_count': result.get('sample_count'),
-                        'currency': result.get('currency', 'GBP')
-                    }
-                else:
-                    print(f"MCP 调用失败: {result.get('error')}")
-                    return None
+    Returns:
+        dict: {地点: 市场薪资数据或None}，顺序与 locations 一致
+    """
+    locations = list(dict.fromkeys(locations or SALARY_LOCATIONS))
+    results = await asyncio.gather(
+        *(get_market_salary_data(position, location) for location in locations),
+        return_exceptions=True
+    )
+    
+    market_data_by_location = {}
+    for location, result in zip(locations, results):
+        if isinstance(result, Exception):
+            print(f"获取{location}市场薪资数据失败: {result}")
+            result = None
+        market_data_by_location[location] = result
+    return market_data_by_location
+
+async def get_market_salary_data_for_queries(queries):
+    """批量获取多个 (职位, 地点) 的市场薪资数据（用于批量生成 offer）
+    
+    未过期的缓存直接返回，其余查询通过 get_market_salary_data_batch() 一次请求上游并写入缓存；
+    上游没有结果时依次使用过期缓存和离线快照。
+    
+    Args:
+        queries (list): (英文职位, 地点) 元组列表
         
-        print("未找到 MCP 工具")
+    Returns:
+        dict: {(英文职位, 地点): 市场薪资数据或None}
+    """
+    queries = list(dict.fromkeys(queries))
+    snapshot = get_salary_snapshot()
+    if SALARY_SOURCE == "offline":
+        return {query: snapshot.lookup(*query) for query in queries}
+    
+    cache = get_salary_cache()
+    results, stale, pending = {}, {}, []
+    for query in queries:
+        entry = cache.get_entry(*query)
+        if entry is not None and entry[1] < cache.ttl:
+            results[query] = entry[0]
+            continue
+        if entry is not None and entry[1] < cache.ttl + cache.stale_ttl:
+            stale[query] = entry[0]
+        pending.append(query)
+    
+    if pending:
+        fetched = await get_market_salary_data_batch(pending)
+        for query in pending:
+            market_data = fetched.get(query)
+            if market_data:
+                cache.put(*query, market_data)
+            else:
+                market_data = stale.get(query) or snapshot.lookup(*query)
+            results[query] = market_data
+    return {query: results[query] for query in queries}
+
+async def warm_market_salary_data(position="Python Developer", locations=None):
+    """预热多个地点的薪资缓存（用于面试期间的预取）
+    
+    不受 SALARY_LOOKUP_TIMEOUT 限制：MCP 连接池冷启动加一次上游请求可能超过该上限，
+    上游请求本身仍受 ADZUNA_REQUEST_TIMEOUT 限制。结果写入缓存，offer 阶段通过
+    get_market_salary_data() 读取（命中缓存或等待进行中的同一请求）。
+    
+    Returns:
+        dict: {地点: 市场薪资数据或None}
+    """
+    locations = list(dict.fromkeys(locations or SALARY_LOCATIONS))
+    if SALARY_SOURCE == "offline":
+        return {location: get_salary_snapshot().lookup(position, location) for location in locations}
+    
+    cache = get_salary_cache()
+    results = await asyncio.gather(
+        *(cache.get_or_fetch(position, location, fetch_market_salary_data) for location in locations),
+        return_exceptions=True
+    )
+    warmed = {}
+    for location, result in zip(locations, results):
+        if isinstance(result, Exception):
+            print(f"预取{location}市场薪资数据失败: {result}")
+            result = None
+        warmed[location] = result
+    return warmed
+
+async def fetch_market_salary_data(position="Python Developer", location="London"):
+    """通过 Adzuna API 获取市场薪资数据（不经过缓存）
+    
+    熔断期间直接返回 None。只有上游故障（连接或 HTTP 错误、超过 ADZUNA_REQUEST_TIMEOUT）计入熔断器；
+    查询没有薪资数据（如冷门职位）是正常结果，返回 None 并记为成功；调用方取消时不计入。
+    """
+    if not _salary_breaker.allow():
         return None
-        
+    
+    try:
+        # 连接池启动受 ADZUNA_MCP_STARTUP_TIMEOUT 约束，不占用单次请求的超时
+        use_mcp = await start_mcp_pool()
+        market_data = await asyncio.wait_for(
+            _fetch_market_salary_data(position, location, use_mcp), ADZUNA_REQUEST_TIMEOUT
+        )
+    except asyncio.CancelledError:
+        # 调用方放弃等待，不代表上游故障
+        _salary_breaker.release()
+        raise
+    except asyncio.TimeoutError:
+        _salary_lookup_metrics["upstream_timeouts"] += 1
+        print(f"Adzuna 请求超过{ADZUNA_REQUEST_TIMEOUT:g}秒: {position} @ {location}")
+        _salary_breaker.record_failure()
+        return None
+    except SalaryUpstreamError as e:
+        print(f"获取市场薪资数据失败: {e}")
+        _salary_breaker.record_failure()
+        return None
+    
+    _salary_breaker.record_success()
+    return market_data
+
+async def start_mcp_pool():
+    """启动共享的 MCP 连接池，返回是否可以使用 MCP；启动失败时改用 HTTP"""
+    if not MCP_AVAILABLE:
+        return False
+    try:
+        await get_mcp_pool().start()
+        return True
     except Exception as e:
-        print(f"MCP 获取市场薪资数据失败: {e}")
+        print(f"MCP 连接池不可用，改用 HTTP 请求: {e}")
+        return False
+
+async def _fetch_market_salary_data(position, location, use_mcp=True):
+    """优先使用 MCP 协议，连接池调用失败（工具发现或会话异常）时改用直接 HTTP 调用
+    
+    Returns:
+        dict: 市场薪资数据，没有薪资数据时为 None；上游故障时抛出 SalaryUpstreamError
+    """
+    if use_mcp:
+        try:
+            return await get_market_salary_data_mcp(position, location)
+        except SalaryUpstreamError:
+            raise
+        except Exception as e:
+            print(f"MCP 获取市场薪资数据失败，改用 HTTP 请求: {e}")
+    return await _fetch_salary_data_http(position, location)
+
+async def get_market_salary_data_mcp(position="Python Developer", location="London"):
+    """通过 MCP 协议获取市场薪资数据（复用常驻的 MCP 连接池）
+    
+    没有薪资数据时返回 None；Adzuna 上游故障时抛出 SalaryUpstreamError；
+    连接池调用失败时抛出其他异常，由调用方改用 HTTP。
+    """
+    result = await get_mcp_pool().call_tool(
+        "get_market_salary_data",
+        {
+            "position": position,
+            "location": location,
+            "pages": ADZUNA_PAGES,
+            "min_samples": ADZUNA_MIN_SAMPLES
+        }
+    )
+    _raise_for_mcp_upstream_error(result)
+    return _market_data_from_mcp_result(result)
+
+def _raise_for_mcp_upstream_error(result):
+    """MCP 工具结果为上游故障（而不是没有薪资数据）时抛出 SalaryUpstreamError"""
+    if not result.get("success", True) and not result.get("no_data"):
+        raise SalaryUpstreamError(result.get("error") or "MCP 工具调用失败")
+
+def _market_data_from_mcp_result(result):
+    """将 MCP 工具返回的结果转换为市场薪资数据"""
+    if result.get("success", True):
+        return {
+            'average_salary': result.get('average_salary'),
+            'min_salary': result.get('min_salary'),
+            'max_salary': result.get('max_salary'),
+            'median_salary': result.get('median_salary'),
+            'sample_count': result.get('sample_count'),
+            'currency': result.get('currency', 'GBP'),
+            'quantiles': result.get('quantiles'),
+            'trimmed_mean_salary': result.get('trimmed_mean_salary'),
+            'histogram': result.get('histogram')
+        }
+    
+    if not result.get("no_data"):
+        print(f"MCP 调用失败: {result.get('error')}")
+    return None
+
+async def get_market_salary_data_batch(queries):
+    """批量获取市场薪资数据，MCP 可用时一次调用完成所有查询
+    
+    Args:
+        queries (list): (position, location) 元组列表
+        
+    Returns:
+        dict: {(position, location): 市场薪资数据或None}
+    """
+    unique_queries = list(dict.fromkeys(queries))
+    if not unique_queries:
+        return {}
+    if not _salary_breaker.allow():
+        print("Adzuna 熔断中，跳过批量薪资请求")
+        return {query: None for query in unique_queries}
+    
+    results = None
+    errors = 0
+    try:
+        use_mcp = await start_mcp_pool()
+    except asyncio.CancelledError:
+        _salary_breaker.release()
+        raise
+    if use_mcp:
+        try:
+            result = await get_mcp_pool().call_tool(
+                "get_market_salary_data_batch",
+                {
+                    "queries": [{"position": p, "location": l} for p, l in unique_queries],
+                    "pages": ADZUNA_PAGES,
+                    "min_samples": ADZUNA_MIN_SAMPLES
+                }
+            )
+            results = {}
+            for item in result.get("results", []):
+                if not item.get("success", True) and not item.get("no_data"):
+                    errors += 1
+                results[(item["position"], item["location"])] = _market_data_from_mcp_result(item)
+        except asyncio.CancelledError:
+            _salary_breaker.release()
+            raise
+        except Exception as e:
+            print(f"MCP 批量获取市场薪资数据失败，改用 HTTP 并发请求: {e}")
+    
+    if results is None:
+        try:
+            http_results = await asyncio.gather(
+                *(_fetch_salary_data_http(p, l) for p, l in unique_queries), return_exceptions=True
+            )
+        except asyncio.CancelledError:
+            _salary_breaker.release()
+            raise
+        results = {}
+        for query, result in zip(unique_queries, http_results):
+            if isinstance(result, Exception):
+                print(f"获取市场薪资数据失败: {result}")
+                errors += 1
+                result = None
+            results[query] = result
+    
+    # 全部查询都是上游故障才计入熔断器（没有薪资数据的查询算作正常响应）
+    if errors and errors >= len(results):
+        _salary_breaker.record_failure()
+    else:
+        _salary_breaker.record_success()
+    return results
+
+def adzuna_page_url(page):
+    """Adzuna 搜索接口指定页码的 URL（ADZUNA_BASE_URL 以页码结尾）"""
+    base_url = ADZUNA_BASE_URL.rstrip('/')
+    head, _, last = base_url.rpartition('/')
+    if last.isdigit():
+        return f"{head}/{page}"
+    return f"{base_url}/{page}"
+
+async def get_market_salary_data_http(position="Python Developer", location="London",
+                                      pages=ADZUNA_PAGES, min_samples=ADZUNA_MIN_SAMPLES):
+    """通过直接 HTTP 调用获取市场薪资数据（备用方案），失败时返回 None"""
+    try:
+        return await _fetch_salary_data_http(position, location, pages, min_samples)
+    except SalaryUpstreamError as e:
+        print(f"获取市场薪资数据失败: {e}")
         return None
 
-async def get_market_salary_data_http(position="Python Developer", location="London"):
-    """通过直接 HTTP 调用获取市场薪资数据（备用方案）"""
+async def _fetch_salary_data_http(position, location, pages=ADZUNA_PAGES, min_samples=ADZUNA_MIN_SAMPLES):
+    """通过直接 HTTP 调用获取市场薪资数据
+    
+    并发抓取多页结果，每页到达后立即折叠进运行统计；
+    样本数达到 min_samples 后取消剩余页面的请求。
+    
+    Returns:
+        dict: 市场薪资数据，没有薪资数据时为 None；连接失败、HTTP 错误
+            （且没有任何一页成功）或响应无法解析时抛出 SalaryUpstreamError
+    """
+    errors = []
     try:
-        # 构建 API URL
+        # 构建 API 参数
         params = {
             'app_id': ADZUNA_APP_ID,
             'app_key': ADZUNA_APP_KEY,
@@ -80,45 +413,94 @@ async def get_market_salary_data_http(position="Python Developer", location="Lon
             'where': location
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(ADZUNA_BASE_URL, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return analyze_salary_data(data)
-                else:
-                    print(f"Adzuna API 请求失败: {response.status}")
-                    return None
-    except Exception as e:
-        print(f"获取市场薪资数据失败: {e}")
-        return None
-
-def analyze_salary_data(api_data):
-    """分析 API 返回的薪资数据"""
-    try:
-        results = api_data.get('results', [])
-        if not results:
-            return None
+        accumulator = SalaryAccumulator()
+        semaphore = asyncio.Semaphore(max(1, ADZUNA_PAGE_CONCURRENCY))
+        
+        timeout = aiohttp.ClientTimeout(total=ADZUNA_REQUEST_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async def fetch_page(page):
+                async with semaphore:
+                    async with session.get(adzuna_page_url(page), params=params) as response:
+                        if response.status == 200:
+                            return await response.json()
+                        errors.append(f"Adzuna API 请求失败（第{page}页）: {response.status}")
+                        return None
             
-        salaries = []
-        for job in results:
+            tasks = [asyncio.create_task(fetch_page(page)) for page in range(1, max(1, pages) + 1)]
+            try:
+                for next_page in asyncio.as_completed(tasks):
+                    data = await next_page
+                    if data:
+                        # 折叠后不再保留原始职位数据
+                        accumulator.add_page(data)
+                    if min_samples and accumulator.count >= min_samples:
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        raise SalaryUpstreamError(str(e) or type(e).__name__) from e
+    
+    if not accumulator.count and errors:
+        raise SalaryUpstreamError(errors[0])
+    return accumulator.result()
+
+class SalaryAccumulator:
+    """薪资运行统计，逐页折叠 API 结果，不缓存原始职位数据
+    
+    样本进入可合并的分位数草图，多页或多来源的统计可以通过 merge() 合并。
+    """
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.sketch = QuantileSketch()
+    
+    def add(self, salary):
+        """加入一个薪资样本"""
+        self.count += 1
+        self.total += salary
+        self.sketch.add(salary)
+    
+    def add_page(self, api_data):
+        """折叠一页 API 结果，返回本页有效样本数"""
+        added = 0
+        for job in api_data.get('results', []):
             salary_min = job.get('salary_min')
             salary_max = job.get('salary_max')
             if salary_min and salary_max:
-                avg_salary = (salary_min + salary_max) / 2
-                salaries.append(avg_salary)
+                self.add((salary_min + salary_max) / 2)
+                added += 1
+        return added
+    
+    def merge(self, other):
+        """合并另一份运行统计"""
+        self.count += other.count
+        self.total += other.total
+        self.sketch.merge(other.sketch)
+        return self
+    
+    def result(self):
+        """当前统计结果（含分位数网格和直方图），没有样本时返回 None"""
+        if not self.count:
+            return None
         
-        if salaries:
-            avg_market_salary = sum(salaries) / len(salaries)
-            min_salary = min(salaries)
-            max_salary = max(salaries)
-            
-            return {
-                'average_salary': round(avg_market_salary, 2),
-                'min_salary': round(min_salary, 2),
-                'max_salary': round(max_salary, 2),
-                'sample_count': len(salaries),
-                'currency': 'GBP'
-            }
+        stats = self.sketch.statistics()
+        stats['average_salary'] = round(self.total / self.count, 2)
+        return stats
+
+def analyze_salary_data(api_data, accumulator=None):
+    """分析 API 返回的薪资数据
+    
+    Args:
+        api_data (dict): 一页 API 结果
+        accumulator (SalaryAccumulator): 多页抓取时的运行统计，为空时只统计本页
+    """
+    try:
+        accumulator = accumulator if accumulator is not None else SalaryAccumulator()
+        accumulator.add_page(api_data)
+        return accumulator.result()
     except Exception as e:
         print(f"分析薪资数据失败: {e}")
     
@@ -155,41 +537,24 @@ def create_hr_offer_agent():
     }
 
 def get_latest_interview_result():
-    """获取最新的面试结果JSON文件"""
+    """获取最新的面试结果（从面试结果存储中查询，不遍历目录）"""
     try:
-        # 查找面试结果文件（包括60分以上和以下的所有候选人文件夹）
         base_dir = Path("data/interview_results")
+        store = get_results_store()
         
-        if not base_dir.exists():
-            return None
-        
-        # 收集所有候选人文件夹中的JSON文件
-        json_files = []
+        # 首次使用时导入之前保存的 JSON 结果
+        store.ensure_indexed(base_dir)
         
-        # 检查60分以上的候选人文件夹
-        plus_dir = base_dir / "60plus"
-        if plus_dir.exists():
-            for candidate_dir in plus_dir.iterdir():
-                if candidate_dir.is_dir():
-                    json_files.extend(list(candidate_dir.glob("*.json")))
-        
-        # 检查60分以下的候选人文件夹
-        below_dir = base_dir / "below60"
-        if below_dir.exists():
-            for candidate_dir in below_dir.iterdir():
-                if candidate_dir.is_dir():
-                    json_files.extend(list(candidate_dir.glob("*.json")))
-        
-        # 如果没有找到文件，尝试旧格式
-        if not json_files:
-            json_files = list(base_dir.glob("*.json"))
+        record = store.latest()
+        if record is not None:
+            return load_indexed_result(record)
         
+        # 旧格式：结果直接保存在 data/interview_results 下
+        json_files = list(base_dir.glob("*.json")) if base_dir.exists() else []
         if not json_files:
             return None
-            
-        # 获取最新的文件
-        latest_file = max(json_files, key=lambda x: x.stat().st_mtime)
         
+        latest_file = max(json_files, key=lambda x: x.stat().st_mtime)
         with open(latest_file, 'r', encoding='utf-8') as f:
             return json.load(f)
             
@@ -197,166 +562,120 @@ def get_latest_interview_result():
         print(f"读取面试结果文件失败: {e}")
         return None
 
-async def generate_offer_letter_with_market_data(interview_data):
-    """根据面试数据和市场数据生成offer通知信"""
-    if not interview_data:
-        return "无法获取面试结果数据"
+# offer职位匹配使用的技能类别
+OFFER_SKILL_CATEGORIES = ["ai_ml", "backend_dev", "frontend_dev", "data_engineering",
+                          "cloud_devops", "mobile_dev", "security", "game_dev"]
+
+# 职位名称映射（中文到英文）
+POSITION_MAPPING = {
+    # 传统开发职位
+    "Python开发工程师": "Python Developer",
+    "Python工程师": "Python Developer",
+    "后端开发工程师": "Backend Developer",
+    "前端开发工程师": "Frontend Developer",
+    "全栈开发工程师": "Full Stack Developer",
+    "软件工程师": "Software Engineer",
+    "系统工程师": "Systems Engineer",
+    "DevOps工程师": "DevOps Engineer",
+    "云原生后端工程师": "Cloud Native Backend Engineer",
+    "数据后端工程师": "Data Backend Engineer",
     
-    # 提取面试信息
-    interview_scores = interview_data.get("interview_scores", {})
-    candidate_info = interview_data.get("candidate_profile", {})
+    # 数据科学和机器学习
+    "数据科学家": "Data Scientist",
+    "数据分析师": "Data Analyst",
+    "机器学习工程师": "Machine Learning Engineer",
+    "深度学习工程师": "Deep Learning Engineer",
+    "AI工程师": "AI Engineer",
+    "人工智能工程师": "AI Engineer",
+    "数据工程师": "Data Engineer",
+    "数据平台工程师": "Data Platform Engineer",
+    
+    # 算法和AI专业方向
+    "算法工程师": "Algorithm Engineer",
+    "大模型算法工程师": "LLM Algorithm Engineer",
+    "自然语言处理工程师": "NLP Engineer",
+    "计算机视觉工程师": "Computer Vision Engineer",
+    "推荐算法工程师": "Recommendation Algorithm Engineer",
+    "搜索算法工程师": "Search Algorithm Engineer",
+    "语音识别工程师": "Speech Recognition Engineer",
+    "知识图谱工程师": "Knowledge Graph Engineer",
+    "全栈AI工程师": "Full Stack AI Engineer",
+    
+    # 新兴AI职位
+    "Prompt工程师": "Prompt Engineer",
+    "AI产品经理": "AI Product Manager",
+    "机器学习研究员": "ML Researcher",
+    "AI架构师": "AI Architect",
+    "模型工程师": "Model Engineer",
+    "AI运维工程师": "AI Ops Engineer",
+    "大模型训练工程师": "LLM Training Engineer",
+    "AI推理优化工程师": "AI Inference Engineer",
+    
+    # 移动开发
+    "移动开发工程师": "Mobile Developer",
+    "Android开发工程师": "Android Developer",
+    "iOS开发工程师": "iOS Developer",
+    
+    # 安全相关
+    "安全工程师": "Security Engineer",
+    "网络安全工程师": "Cybersecurity Engineer",
+    
+    # 游戏开发
+    "游戏开发工程师": "Game Developer",
     
-    total_score = interview_scores.get("overall_score", 0)
-    technical_score = interview_scores.get("technical_score", 0)
-    hr_score = interview_scores.get("hr_score", 0)
-    boss_score = interview_scores.get("boss_score", 0)
+    # 前端相关
+    "前端开发工程师": "Frontend Developer",
+    "UI/UX工程师": "UI/UX Engineer"
+}
+
+# resolve_offer_position() 的 classified 默认值：关键词规则未命中时同步调用向量分类器
+_CLASSIFY = object()
+
+def resolve_offer_position(candidate_info, classified=_CLASSIFY):
+    """根据候选人技能和项目经验确定offer职位
     
-    candidate_name = candidate_info.get("name", "候选人")
-    if candidate_name == "未知":
-        candidate_name = "候选人"
+    Args:
+        candidate_info (dict): 候选人信息
+        classified (dict): 已有的向量分类结果（classify_positions() 的一项），
+            为 None 时不使用向量分类器；默认在关键词规则未命中时同步调用分类器
         
+    Returns:
+        dict: 包含 refined_position（中文职位）、english_position（英文职位）、
+            matched_by（rules / embedding / default，职位的确定方式）、
+            skill_scores（技能类别得分）和 project_analysis（项目经验分析）
+    """
     target_position = candidate_info.get("target_position", "Python开发工程师")  
     if target_position == "未知":
         target_position = "Python开发工程师"
     
-    # 职位名称映射（中文到英文）
-    position_mapping = {
-        # 传统开发职位
-        "Python开发工程师": "Python Developer",
-        "Python工程师": "Python Developer",
-        "后端开发工程师": "Backend Developer",
-        "前端开发工程师": "Frontend Developer",
-        "全栈开发工程师": "Full Stack Developer",
-        "软件工程师": "Software Engineer",
-        "系统工程师": "Systems Engineer",
-        "DevOps工程师": "DevOps Engineer",
-        "云原生后端工程师": "Cloud Native Backend Engineer",
-        "数据后端工程师": "Data Backend Engineer",
-        
-        # 数据科学和机器学习
-        "数据科学家": "Data Scientist",
-        "数据分析师": "Data Analyst",
-        "机器学习工程师": "Machine Learning Engineer",
-        "深度学习工程师": "Deep Learning Engineer",
-        "AI工程师": "AI Engineer",
-        "人工智能工程师": "AI Engineer",
-        "数据工程师": "Data Engineer",
-        "数据平台工程师": "Data Platform Engineer",
-        
-        # 算法和AI专业方向
-        "算法工程师": "Algorithm Engineer",
-        "大模型算法工程师": "LLM Algorithm Engineer",
-        "自然语言处理工程师": "NLP Engineer",
-        "计算机视觉工程师": "Computer Vision Engineer",
-        "推荐算法工程师": "Recommendation Algorithm Engineer",
-        "搜索算法工程师": "Search Algorithm Engineer",
-        "语音识别工程师": "Speech Recognition Engineer",
-        "知识图谱工程师": "Knowledge Graph Engineer",
-        "全栈AI工程师": "Full Stack AI Engineer",
-        
-        # 新兴AI职位
-        "Prompt工程师": "Prompt Engineer",
-        "AI产品经理": "AI Product Manager",
-        "机器学习研究员": "ML Researcher",
-        "AI架构师": "AI Architect",
-        "模型工程师": "Model Engineer",
-        "AI运维工程师": "AI Ops Engineer",
-        "大模型训练工程师": "LLM Training Engineer",
-        "AI推理优化工程师": "AI Inference Engineer",
-        
-        # 移动开发
-        "移动开发工程师": "Mobile Developer",
-        "Android开发工程师": "Android Developer",
-        "iOS开发工程师": "iOS Developer",
-        
-        # 安全相关
-        "安全工程师": "Security Engineer",
-        "网络安全工程师": "Cybersecurity Engineer",
-        
-        # 游戏开发
-        "游戏开发工程师": "Game Developer",
-        
-        # 前端相关
-        "前端开发工程师": "Frontend Developer",
-        "UI/UX工程师": "UI/UX Engineer"
-    }
-    
     # 根据候选人信息动态调整职位描述
     candidate_skills = candidate_info.get("technical_skills", [])
     candidate_projects = candidate_info.get("key_projects", [])
     
-    # 定义技能分类和权重
-    skill_categories = {
-        "ai_ml": {
-            "keywords": ["大模型", "LLM", "LoRA", "微调", "深度学习", "机器学习", "AI", "人工智能", "NLP", "自然语言处理", "计算机视觉", "推荐算法", "向量数据库", "FAISS", "Milvus", "LangChain", "RAG", "Prompt Engineering", "Transformer", "BERT", "GPT", "强化学习", "知识图谱"],
-            "weight": 1.5
-        },
-        "backend_dev": {
-            "keywords": ["Django", "Flask", "FastAPI", "MySQL", "PostgreSQL", "Redis", "Docker", "微服务", "高并发", "API", "后端", "Spring Boot", "Node.js", "Go", "微服务架构", "分布式系统"],
-            "weight": 1.0
-        },
-        "frontend_dev": {
-            "keywords": ["React", "Vue", "Angular", "JavaScript", "TypeScript", "前端", "UI/UX", "Web开发", "移动端", "小程序"],
-            "weight": 0.8
-        },
-        "data_engineering": {
-            "keywords": ["数据工程", "ETL", "数据仓库", "Spark", "Hadoop", "Kafka", "数据湖", "数据管道", "数据治理", "BI", "数据可视化"],
-            "weight": 1.2
-        },
-        "cloud_devops": {
-            "keywords": ["Kubernetes", "AWS", "Azure", "GCP", "云原生", "DevOps", "CI/CD", "Jenkins", "GitLab", "监控", "日志", "容器化"],
-            "weight": 1.1
-        },
-        "mobile_dev": {
-            "keywords": ["Android", "iOS", "移动开发", "React Native", "Flutter", "原生开发", "移动应用"],
-            "weight": 0.9
-        },
-        "security": {
-            "keywords": ["网络安全", "信息安全", "渗透测试", "安全开发", "加密", "认证", "授权", "安全架构"],
-            "weight": 1.3
-        },
-        "game_dev": {
-            "keywords": ["游戏开发", "Unity", "Unreal", "游戏引擎", "3D建模", "游戏设计"],
-            "weight": 0.7
-        }
-    }
-    
-    # 计算各技能类别的得分
-    skill_scores = {}
-    for category, config in skill_categories.items():
-        score = sum(1 for skill in candidate_skills if any(keyword in skill for keyword in config["keywords"]))
-        skill_scores[category] = score * config["weight"]
-    
-    # 分析项目经验
-    project_analysis = {
-        "ai_ml_projects": sum(1 for project in candidate_projects if any(keyword in str(project) for keyword in ["大模型", "LLM", "AI", "机器学习", "深度学习", "算法"])),
-        "backend_projects": sum(1 for project in candidate_projects if any(keyword in str(project) for keyword in ["后端", "API", "微服务", "数据库", "系统"])),
-        "data_projects": sum(1 for project in candidate_projects if any(keyword in str(project) for keyword in ["数据", "分析", "ETL", "仓库"])),
-        "cloud_projects": sum(1 for project in candidate_projects if any(keyword in str(project) for keyword in ["云", "容器", "部署", "运维"]))
-    }
+    # 一次扫描计算各技能类别得分和项目经验分析
+    analysis = analyze_candidate(candidate_skills, candidate_projects)
+    skill_scores = weighted_scores(analysis, OFFER_SKILL_CATEGORIES)
+    project_analysis = analysis["project_analysis"]
+    skill_signals = analysis["skill_signals"]
     
-    # 调试信息：输出技能得分
-    print("=== HR Offer Agent 技能分析调试 ===")
-    print(f"候选人技能: {candidate_skills}")
-    print(f"候选人项目: {candidate_projects}")
-    print(f"技能得分: {skill_scores}")
-    print(f"项目分析: {project_analysis}")
+    # 职位智能匹配逻辑（matched_by 记录职位的确定方式）
+    matched_by = "rules"
     
-    # 职位智能匹配逻辑
     def determine_position():
+        nonlocal matched_by
         # 获取最高分的技能类别
         top_skill = max(skill_scores.items(), key=lambda x: x[1])
         
         # 根据技能组合和项目经验确定职位
         if top_skill[0] == "ai_ml" and top_skill[1] >= 3:
             if project_analysis["ai_ml_projects"] >= 2:
-                if any("大模型" in skill or "LLM" in skill for skill in candidate_skills):
+                if "llm" in skill_signals:
                     return "大模型算法工程师"
-                elif any("推荐" in skill or "搜索" in skill for skill in candidate_skills):
+                elif "recommend_search" in skill_signals:
                     return "推荐算法工程师"
-                elif any("NLP" in skill or "自然语言" in skill for skill in candidate_skills):
+                elif "nlp" in skill_signals:
                     return "自然语言处理工程师"
-                elif any("计算机视觉" in skill or "CV" in skill for skill in candidate_skills):
+                elif "cv" in skill_signals:
                     return "计算机视觉工程师"
                 else:
                     return "机器学习工程师"
@@ -402,263 +721,401 @@ async def generate_offer_letter_with_market_data(interview_data):
         elif skill_scores["data_engineering"] >= 2 and skill_scores["backend_dev"] >= 1:
             return "数据平台工程师"
         
+        # 关键词规则未命中时，用向量分类器识别同义词和近似技能
+        result = classify_position(candidate_skills, candidate_projects) if classified is _CLASSIFY else classified
+        if result:
+            matched_by = "embedding"
+            return result["position"]
+        
         # 默认情况
-        else:
-            return target_position if target_position != "未知" else "软件工程师"
+        matched_by = "default"
+        return target_position if target_position != "未知" else "软件工程师"
     
     # 确定最终职位
     refined_position = determine_position()
     
-    # 转换为英文职位名称
-    english_position = position_mapping.get(refined_position, "Python Developer")
-    
-    # 更新英文职位名称
-    english_position = position_mapping.get(refined_position, english_position)
-    
-    # 获取实时市场薪资数据
-    market_data = await get_market_salary_data(english_position, "London")
-    
-    # 根据分数和市场数据确定薪资范围
-    if market_data:
-        min_market_salary = market_data['min_salary']
-        max_market_salary = market_data['max_salary']
-        avg_market_salary = market_data['average_salary']
-        
-        # 计算市场薪资区间的百分位数位置
-        if total_score >= 78:
-            # 高分：75-90百分位数（高于市场平均）
-            position_factor = 0.75 + (total_score - 78) / 22 * 0.15  # 78-100分映射到75%-90%
-            suggested_position = 0.82  # 82%位置
-        elif total_score >= 70:
-            # 中上分：60-75百分位数（接近市场平均）
-            position_factor = 0.60 + (total_score - 70) / 8 * 0.15   # 70-77分映射到60%-75%
-            suggested_position = 0.67  # 67%位置
-        else:
-            # 及格分：40-60百分位数（低于市场平均）
-            position_factor = 0.40 + (total_score - 60) / 10 * 0.20  # 60-69分映射到40%-60%
-            suggested_position = 0.50  # 50%位置（中位数）
-        
-        # 基于市场区间计算薪资
-        suggested_salary_value = min_market_salary + (max_market_salary - min_market_salary) * suggested_position
-        range_min = min_market_salary + (max_market_salary - min_market_salary) * (suggested_position - 0.05)
-        range_max = min_market_salary + (max_market_salary - min_market_salary) * (suggested_position + 0.05)
-        
-        salary_range = f"{round(range_min, 0):,.0f}-{round(range_max, 0):,.0f}英镑/年"
-        suggested_salary = f"{round(suggested_salary_value, 0):,.0f}英镑/年"
-        
-        # 根据候选人技能和职位生成个性化的市场分析
-        skill_analysis = ""
-        top_skills = sorted(skill_scores.items(), key=lambda x: x[1], reverse=True)[:3]
-        skill_names = []
-        for skill_type, score in top_skills:
-            if score > 0:
-                if skill_type == "ai_ml":
-                    skill_names.append("AI/机器学习")
-                elif skill_type == "backend_dev":
-                    skill_names.append("后端开发")
-                elif skill_type == "frontend_dev":
-                    skill_names.append("前端开发")
-                elif skill_type == "data_engineering":
-                    skill_names.append("数据工程")
-                elif skill_type == "cloud_devops":
-                    skill_names.append("云原生/DevOps")
-                elif skill_type == "mobile_dev":
-                    skill_names.append("移动开发")
-                elif skill_type == "security":
-                    skill_names.append("安全技术")
-                elif skill_type == "game_dev":
-                    skill_names.append("游戏开发")
-        
-        if skill_names:
-            skill_analysis = f"候选人主要技能方向：{', '.join(skill_names)}，技能匹配度：{top_skills[0][1]:.1f}分，符合{refined_position}岗位要求。"
-        else:
-            skill_analysis = f"候选人技能信息待完善，根据职位要求匹配{refined_position}岗位。"
-        
-        market_info = f"""
-**实时市场薪资数据（基于{market_data['sample_count']}个职位样本）：**
-- 目标职位：{refined_position}（{english_position}）
-- 市场平均薪资：{market_data['average_salary']:,.0f}英镑/年
-- 市场薪资范围：{market_data['min_salary']:,.0f} - {market_data['max_salary']:,.0f}英镑/年
-- 技能匹配分析：{skill_analysis}
-- 数据来源：Adzuna API（实时更新）
-"""
-    else:
-        # 如果无法获取市场数据，使用默认薪资
-        if total_score >= 78:
-            salary_range = "60,000-65,000英镑/年"
-            suggested_salary = "62,000英镑/年"
-        elif total_score >= 70:
-            salary_range = "55,000-60,000英镑/年"
-            suggested_salary = "57,000英镑/年"
-        else:
-            salary_range = "50,000-55,000英镑/年"
-            suggested_salary = "52,000英镑/年"
-        
-        # 根据候选人技能生成个性化的市场分析
-        skill_analysis = ""
-        # 重新计算技能得分（因为备用方案中没有skill_scores）
-        skill_categories = {
-            "ai_ml": ["大模型", "LLM", "LoRA", "微调", "深度学习", "机器学习", "AI", "人工智能", "NLP", "自然语言处理", "计算机视觉", "推荐算法", "向量数据库", "FAISS", "Milvus", "LangChain", "RAG", "Prompt Engineering"],
-            "backend_dev": ["Django", "Flask", "FastAPI", "MySQL", "PostgreSQL", "Redis", "Docker", "微服务", "高并发", "API", "后端"],
-            "frontend_dev": ["React", "Vue", "Angular", "JavaScript", "TypeScript", "前端", "UI/UX", "Web开发"],
-            "data_engineering": ["数据工程", "ETL", "数据仓库", "Spark", "Hadoop", "Kafka", "数据湖", "数据管道"],
-            "cloud_devops": ["Kubernetes", "AWS", "Azure", "GCP", "云原生", "DevOps", "CI/CD", "Jenkins", "GitLab", "监控", "日志", "容器化"]
-        }
-        
-        skill_scores = {}
-        for category, keywords in skill_categories.items():
-            score = sum(1 for skill in candidate_skills if any(keyword in skill for keyword in keywords))
-            skill_scores[category] = score
-        
-        top_skills = sorted(skill_scores.items(), key=lambda x: x[1], reverse=True)[:3]
-        skill_names = []
-        for skill_type, score in top_skills:
-            if score > 0:
-                if skill_type == "ai_ml":
-                    skill_names.append("AI/机器学习")
-                elif skill_type == "backend_dev":
-                    skill_names.append("后端开发")
-                elif skill_type == "frontend_dev":
-                    skill_names.append("前端开发")
-                elif skill_type == "data_engineering":
-                    skill_names.append("数据工程")
-                elif skill_type == "cloud_devops":
-                    skill_names.append("云原生/DevOps")
-        
-        if skill_names:
-            skill_analysis = f"候选人主要技能方向：{', '.join(skill_names)}，技能匹配度：{top_skills[0][1]}分，符合{refined_position}岗位要求。"
-        else:
-            skill_analysis = f"候选人技能信息待完善，根据职位要求匹配{refined_position}岗位。"
-        
-        market_info = f"""
-**市场薪资参考：**
-- 目标职位：{refined_position}
-- 基于伦敦{refined_position}市场薪资调研
-- 技能匹配分析：{skill_analysis}
-- 数据来源：行业标准参考
-"""
-    
-    # 生成offer信
-    current_date = datetime.now().strftime("%Y年%m月%d日")
-    entry_date = datetime.now().strftime("%Y年%m月%d日")
+    # 转换为英文职位名称（未映射的职位查翻译缓存；需要大模型翻译时请使用 resolve_english_position()）
+    english_position = lookup_english_position(refined_position) or DEFAULT_ENGLISH_POSITION
     
-    offer_letter = f"""
-### 候选人面试表现分析
-
-候选人：{candidate_name}
-应聘职位：{refined_position}
-面试总分：{total_score}分（技术面试{technical_score}分，HR面试{hr_score}分，Boss面试{boss_score}分）
-
-根据面试表现分析，该候选人在技术能力、沟通协作和团队合作方面表现良好，符合岗位要求。
-
-### 市场薪资参考
-
-{market_info}
+    return {
+        "refined_position": refined_position,
+        "english_position": english_position,
+        "matched_by": matched_by,
+        "skill_scores": skill_scores,
+        "project_analysis": project_analysis
+    }
 
-建议薪资范围为：{salary_range}
+async def resolve_offer_position_async(candidate_info):
+    """resolve_offer_position() 的异步版本：关键词规则未命中时，向量分类器在线程中加载和编码"""
+    position_info = resolve_offer_position(candidate_info, classified=None)
+    if position_info["matched_by"] == "default":
+        classified = await classify_position_async(
+            candidate_info.get("technical_skills", []), candidate_info.get("key_projects", [])
+        )
+        if classified:
+            position_info = resolve_offer_position(candidate_info, classified=classified)
+    return position_info
 
-### Offer通知信
+async def resolve_offer_positions(candidate_infos):
+    """批量确定offer职位：先按关键词规则匹配，未命中的候选人一次批量调用向量分类器（在线程中执行）"""
+    position_infos = [resolve_offer_position(info, classified=None) for info in candidate_infos]
+    pending = [i for i, position_info in enumerate(position_infos) if position_info["matched_by"] == "default"]
+    if pending:
+        classified = await classify_positions_async([
+            (candidate_infos[i].get("technical_skills", []), candidate_infos[i].get("key_projects", []))
+            for i in pending
+        ])
+        for i, result in zip(pending, classified):
+            if result:
+                position_infos[i] = resolve_offer_position(candidate_infos[i], classified=result)
+    return position_infos
 
-**[公司名称] 人力资源部**
+def top_skill_matches(skill_scores, limit=3):
+    """得分最高的技能类别 [(类别, 得分)]，只保留得分大于0的类别"""
+    top_skills = sorted(skill_scores.items(), key=lambda x: x[1], reverse=True)[:limit]
+    return [(skill_type, score) for skill_type, score in top_skills if score > 0]
 
-{current_date}
+def resolve_offer_locations(candidate_info, locations=None):
+    """确定offer的工作地点列表（第一个为主要工作地点）
+    
+    优先使用传入的 locations，其次是候选人信息中的 locations，最后是 SALARY_LOCATIONS；
+    去掉空白项后为空时（如 locations 为 " , "）也使用 SALARY_LOCATIONS。
+    """
+    locations = locations or (candidate_info or {}).get("locations") or SALARY_LOCATIONS
+    if isinstance(locations, str):
+        locations = locations.split(",")
+    resolved = list(dict.fromkeys(l.strip() for l in locations if isinstance(l, str) and l.strip()))
+    return resolved or list(SALARY_LOCATIONS)
 
-{candidate_name} 先生/女士：
+def location_display_name(location):
+    """地点的中文名称，未收录的地点保留原名"""
+    return LOCATION_NAMES.get(location.strip().lower(), location)
 
-我们很高兴地通知您，经过三轮面试的全面评估，您已成功通过我们的招聘流程。我们诚挚地邀请您加入我们的团队。
+def start_market_salary_prefetch(candidate_info, locations=None):
+    """在后台预取候选人offer职位在各工作地点的市场薪资数据
+    
+    需在事件循环中调用，面试进行期间即可开始请求。预取只预热薪资缓存（不设 SALARY_LOOKUP_TIMEOUT 上限），
+    offer 阶段仍通过 get_market_salary_data() 查询：命中缓存，或在时限内等待仍在进行的请求。
+    
+    Args:
+        candidate_info (dict): 候选人信息
+        locations (list): 工作地点列表，默认见 resolve_offer_locations()
+        
+    Returns:
+        tuple: (职位任务, 地点列表, 预取任务)，职位任务结果为 resolve_offer_position() 的结果，
+            预取任务结果为 {地点: 市场薪资数据或None}
+    """
+    position_task = asyncio.create_task(resolve_offer_position_async(candidate_info))
+    locations = resolve_offer_locations(candidate_info, locations)
+    
+    async def prefetch():
+        refined_position = (await position_task)["refined_position"]
+        english_position = await resolve_english_position(refined_position)
+        return await warm_market_salary_data(english_position, locations)
+    
+    task = asyncio.create_task(prefetch())
+    return position_task, locations, task
 
-**职位详情：**
-- 职位名称：{refined_position}
-- 工作地点：伦敦
-- 入职时间：{entry_date}（具体时间将另行通知）
+def _offer_basics(interview_data):
+    """offer 上下文中与薪资无关的部分：候选人、面试分数、评估和日期"""
+    interview_scores = interview_data.get("interview_scores", {})
+    candidate_info = interview_data.get("candidate_profile", {})
+    
+    candidate_name = candidate_info.get("name")
+    if candidate_name in ("未知", "候选人"):
+        candidate_name = None
+    
+    now = datetime.now()
+    return {
+        "candidate_name": candidate_name,
+        "total_score": interview_scores.get("overall_score", 0),
+        "technical_score": interview_scores.get("technical_score", 0),
+        "hr_score": interview_scores.get("hr_score", 0),
+        "boss_score": interview_scores.get("boss_score", 0),
+        "evaluation_summary": interview_scores.get("evaluation_summary"),
+        "improvement_suggestions": interview_scores.get("improvement_suggestions", []),
+        "current_date": now,
+        "entry_date": now
+    }
 
-**薪资福利：**
-- 基础年薪：{suggested_salary}
-- 市场参考：基于实时市场数据分析
-- 额外福利：包括但不限于医疗保险、养老金、年假等
+def _baseline_context(refined_position, total_score):
+    """职位基准薪资（没有市场数据时使用）"""
+    salary_info = get_baseline_salary(refined_position, total_score)
+    return {
+        "range_min": salary_info["range_min"],
+        "suggested_salary": salary_info["suggested_value"],
+        "range_max": salary_info["range_max"],
+        "market_avg": salary_info["market_avg_value"]
+    }
 
-**面试评估总结：**
-- 技术面试评分：{technical_score}/25
-- HR面试评分：{hr_score}/25
-- Boss面试评分：{boss_score}/25
-- 综合评分：{total_score}/25
+def build_offer_context(interview_data, position_info, english_position, locations, market_data_by_location):
+    """计算 offer 通知信的上下文（与语言无关，由 offer_templates.render_offer_letter() 渲染）
+    
+    Args:
+        interview_data (dict): 面试数据，包含 interview_scores 和 candidate_profile
+        position_info (dict): resolve_offer_position() 的结果
+        english_position (str): 英文职位名称
+        locations (list): 工作地点列表（第一个为主要工作地点）
+        market_data_by_location (dict): {地点: 市场薪资数据}
+        
+    Returns:
+        dict: offer 上下文
+    """
+    context = _offer_basics(interview_data)
+    refined_position = position_info["refined_position"]
+    context.update({
+        "refined_position": refined_position,
+        "english_position": english_position,
+        "top_skills": top_skill_matches(position_info["skill_scores"]),
+        "primary_location": locations[0],
+        "locations": [
+            {"location": l, "display_name": location_display_name(l), "market": market_data_by_location.get(l), "band": None}
+            for l in locations
+        ]
+    })
+    located = [l for l in context["locations"] if l["market"]]
+    
+    # 根据分数和市场数据确定薪资范围
+    if located:
+        # 面试分数映射到市场薪资百分位数，所有地点在分位数网格上一次查询建议薪资和区间
+        # 78分以上：75-90百分位数；70-77分：60-75百分位数；60-69分：40-60百分位数
+        suggestion = suggest_salaries([context["total_score"]] * len(located), [l["market"] for l in located])
+        for location, low, mid, high in zip(located, suggestion['range_min'], suggestion['suggested'], suggestion['range_max']):
+            location["band"] = {"range_min": float(low), "suggested": float(mid), "range_max": float(high)}
+        
+        # 主要工作地点没有数据时，以第一个有数据的地点为准
+        band = context["locations"][0] if context["locations"][0]["market"] else located[0]
+        context.update({
+            "salary_source": "market",
+            "band_location": band["location"],
+            "percentile_rank": float(suggestion['percentile'][0]) * 100,
+            "range_min": band["band"]["range_min"],
+            "suggested_salary": band["band"]["suggested"],
+            "range_max": band["band"]["range_max"]
+        })
+    else:
+        # 如果无法获取市场数据（超时、熔断或上游失败），使用职位基准薪资
+        _salary_lookup_metrics["baseline_fallbacks"] += 1
+        context["salary_source"] = "baseline"
+        context.update(_baseline_context(refined_position, context["total_score"]))
+    
+    return context
 
-**评估亮点：**
-{interview_scores.get('evaluation_summary', '候选人整体表现良好，符合岗位要求')}
+async def generate_offer_letter_with_market_data(interview_data, market_data=None, fetch_market_data=True,
+                                                 locations=None, market_data_by_location=None, locale=OFFER_LOCALE):
+    """根据面试数据和市场数据生成offer通知信，每个工作地点给出各自的薪资区间
+    
+    Args:
+        interview_data (dict): 面试数据，包含 interview_scores 和 candidate_profile
+        market_data (dict): 已获取的主要工作地点市场薪资数据
+        fetch_market_data (bool): 是否请求市场薪资数据；为False时直接使用已传入的数据
+        locations (list): 工作地点列表，默认见 resolve_offer_locations()
+        market_data_by_location (dict): 已获取（如预取）的 {地点: 市场薪资数据}
+        locale (str): offer 语言，见 offer_templates.OFFER_TEMPLATES
+    """
+    if not interview_data:
+        return "无法获取面试结果数据"
+    
+    candidate_info = interview_data.get("candidate_profile", {})
+    
+    # 根据候选人技能和项目经验确定职位
+    position_info = await resolve_offer_position_async(candidate_info)
+    english_position = await resolve_english_position(position_info["refined_position"])
+    
+    # 获取各工作地点的实时市场薪资数据（并发请求）
+    locations = resolve_offer_locations(candidate_info, locations)
+    if fetch_market_data:
+        market_data_by_location = await get_market_salary_data_by_location(english_position, locations)
+    elif market_data_by_location is None:
+        market_data_by_location = {locations[0]: market_data}
+    
+    context = build_offer_context(interview_data, position_info, english_position, locations, market_data_by_location)
+    return render_offer_letter(context, locale)
 
-**改进建议：**
-"""
+async def prepare_offer_batch(candidate_infos, locations=None):
+    """为一批候选人确定职位和工作地点，职位翻译和薪资查询按职位去重
+    
+    Args:
+        candidate_infos (list): 候选人信息列表
+        locations (list): 工作地点列表，默认按每位候选人的信息确定
+        
+    Returns:
+        tuple: (每位候选人的 (职位信息, 英文职位, 地点列表, {地点: 市场薪资数据}) 列表,
+            {英文职位: 查询的地点列表})
+    """
+    position_infos = await resolve_offer_positions(candidate_infos)
+    record_locations = [resolve_offer_locations(info, locations) for info in candidate_infos]
     
-    improvement_suggestions = interview_scores.get('improvement_suggestions', [])
-    for i, suggestion in enumerate(improvement_suggestions, 1):
-        offer_letter += f"- {suggestion}\n"
+    refined_positions = list(dict.fromkeys(p["refined_position"] for p in position_infos))
+    english_positions = dict(zip(refined_positions, await asyncio.gather(
+        *(resolve_english_position(p) for p in refined_positions)
+    )))
+    locations_by_position = {}
+    for position_info, locs in zip(position_infos, record_locations):
+        english_position = english_positions[position_info["refined_position"]]
+        locations_by_position.setdefault(english_position, {}).update(dict.fromkeys(locs))
+    locations_by_position = {position: list(locs) for position, locs in locations_by_position.items()}
+    market_data = await get_market_salary_data_for_queries(
+        [(position, l) for position, locs in locations_by_position.items() for l in locs]
+    )
     
-    offer_letter += f"""
-**下一步流程：**
-1. 请在本offer发出后7个工作日内回复是否接受
-2. 如接受，我们将安排入职前准备事项
-3. 如有疑问，请随时联系HR部门
+    prepared = []
+    for position_info, locs in zip(position_infos, record_locations):
+        english_position = english_positions[position_info["refined_position"]]
+        prepared.append((position_info, english_position, locs,
+                         {l: market_data[(english_position, l)] for l in locs}))
+    return prepared, locations_by_position
 
-**联系方式：**
-- 邮箱：hr@company.com
-- 电话：+44 20 1234 5678
+async def generate_offer_letters(records, locale=OFFER_LOCALE, locations=None):
+    """批量生成offer通知信
+    
+    先为所有记录确定职位和工作地点，每个 (职位, 地点) 只查询一次市场薪资数据，
+    再用预编译的模板逐个渲染；单条记录失败时使用备用方案。
+    
+    Args:
+        records (list): 面试数据列表，每项包含 interview_scores 和 candidate_profile
+        locale (str): offer 语言
+        locations (list): 工作地点列表，默认按每位候选人的信息确定
+        
+    Returns:
+        list: 与 records 一一对应的 offer 通知信
+    """
+    locale = resolve_offer_locale(locale)
+    prepared, locations_by_position = await prepare_offer_batch(
+        [(record or {}).get("candidate_profile", {}) for record in records], locations
+    )
+    
+    letters = []
+    for record, (position_info, english_position, locs, market_data_by_location) in zip(records, prepared):
+        if not record:
+            letters.append("无法获取面试结果数据")
+            continue
+        try:
+            context = build_offer_context(record, position_info, english_position, locs, market_data_by_location)
+            letters.append(render_offer_letter(context, locale))
+        except Exception as e:
+            print(f"生成offer失败，使用备用方案: {e}")
+            letters.append(generate_offer_letter_fallback(record, locale))
+    
+    print(f"✅ 批量生成offer完成：{len(letters)}封，{len(locations_by_position)}个职位，"
+          f"{sum(len(locs) for locs in locations_by_position.values())}次薪资查询")
+    return letters
 
-我们期待您的加入，相信您将为团队带来宝贵的贡献！
+async def generate_offer_letter_async(interview_data, market_data=None, fetch_market_data=True,
+                                      locations=None, market_data_by_location=None, locale=OFFER_LOCALE):
+    """异步版本的offer生成函数，直接在调用方的事件循环中获取市场数据
+    
+    Args:
+        interview_data (dict): 面试数据，包含 interview_scores 和 candidate_profile
+        market_data (dict): 已获取的主要工作地点市场薪资数据
+        fetch_market_data (bool): 是否请求市场薪资数据；为False时直接使用已传入的数据
+        locations (list): 工作地点列表，默认见 resolve_offer_locations()
+        market_data_by_location (dict): 已获取（如预取）的 {地点: 市场薪资数据}
+        locale (str): offer 语言
+    """
+    try:
+        return await generate_offer_letter_with_market_data(
+            interview_data,
+            market_data=market_data,
+            fetch_market_data=fetch_market_data,
+            locations=locations,
+            market_data_by_location=market_data_by_location,
+            locale=locale
+        )
+    except Exception as e:
+        print(f"使用市场数据生成offer失败，使用备用方案: {e}")
+        return generate_offer_letter_fallback(interview_data, locale)
 
-此致
-敬礼
+# 同步接口复用的事件循环（仅供脚本在主线程中使用）
+_sync_event_loop = None
 
-{current_date}
-公司名称
-HR部门
-"""
-    
-    return offer_letter
+def _get_sync_event_loop():
+    """获取同步接口复用的事件循环，首次调用时创建"""
+    global _sync_event_loop
+    if _sync_event_loop is None or _sync_event_loop.is_closed():
+        _sync_event_loop = asyncio.new_event_loop()
+    return _sync_event_loop
 
 def generate_offer_letter(interview_data):
-    """同步版本的offer生成函数，用于向后兼容"""
-    # 尝试使用实时市场数据
+    """同步版本的offer生成函数，仅供脚本使用
+    
+    已在事件循环中时请改用 await generate_offer_letter_async(interview_data)。
+    """
     try:
-        # 检查是否已经在事件循环中
-        try:
-            loop = asyncio.get_running_loop()
-            # 如果已经在事件循环中，使用备用方案
-            print("已在事件循环中，使用备用方案")
-            return generate_offer_letter_fallback(interview_data)
-        except RuntimeError:
-            # 没有运行中的事件循环，可以创建新的
-            pass
-        
-        # 创建新的事件循环
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(generate_offer_letter_with_market_data(interview_data))
-        finally:
-            loop.close()
-    except Exception as e:
-        print(f"使用市场数据生成offer失败，使用备用方案: {e}")
-        # 如果异步版本失败，使用原来的逻辑
-        return generate_offer_letter_fallback(interview_data)
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # 没有运行中的事件循环，复用同一个事件循环执行
+        return _get_sync_event_loop().run_until_complete(generate_offer_letter_async(interview_data))
+    
+    # 不能在运行中的事件循环里阻塞等待，使用备用方案
+    print("已在事件循环中，请使用 generate_offer_letter_async，当前使用备用方案")
+    return generate_offer_letter_fallback(interview_data)
+
+# 不同职位类型的薪资基准（英镑/年），没有市场数据时使用
+SALARY_BASELINES = {
+    "大模型算法工程师": {"base": 75000, "range": 15000},
+    "机器学习工程师": {"base": 70000, "range": 12000},
+    "AI工程师": {"base": 65000, "range": 10000},
+    "数据科学家": {"base": 68000, "range": 12000},
+    "数据工程师": {"base": 62000, "range": 10000},
+    "云原生后端工程师": {"base": 65000, "range": 10000},
+    "DevOps工程师": {"base": 63000, "range": 10000},
+    "后端开发工程师": {"base": 58000, "range": 8000},
+    "前端开发工程师": {"base": 55000, "range": 8000},
+    "全栈开发工程师": {"base": 62000, "range": 10000},
+    "移动开发工程师": {"base": 60000, "range": 10000},
+    "安全工程师": {"base": 65000, "range": 12000},
+    "游戏开发工程师": {"base": 52000, "range": 8000},
+    "软件工程师": {"base": 55000, "range": 8000}
+}
+
+def get_baseline_salary(position, score):
+    """根据职位类型和分数确定基准薪资范围（没有市场数据时使用）"""
+    # 获取职位基准薪资
+    baseline = SALARY_BASELINES.get(position, {"base": 55000, "range": 8000})
+    base_salary = baseline["base"]
+    salary_range = baseline["range"]
+    
+    # 根据分数调整薪资
+    if score >= 78:
+        # 高分：基准薪资 + 20%
+        adjusted_base = base_salary * 1.2
+        range_min = adjusted_base - salary_range * 0.8
+        range_max = adjusted_base + salary_range * 0.8
+        suggested = adjusted_base
+        market_avg = base_salary * 1.1
+    elif score >= 70:
+        # 中上分：基准薪资 + 10%
+        adjusted_base = base_salary * 1.1
+        range_min = adjusted_base - salary_range * 0.6
+        range_max = adjusted_base + salary_range * 0.6
+        suggested = adjusted_base
+        market_avg = base_salary * 1.05
+    else:
+        # 及格分：基准薪资
+        adjusted_base = base_salary
+        range_min = adjusted_base - salary_range * 0.5
+        range_max = adjusted_base + salary_range * 0.5
+        suggested = adjusted_base
+        market_avg = base_salary * 0.95
+    
+    return {
+        "range": f"{int(range_min):,}-{int(range_max):,}英镑/年",
+        "suggested": f"{int(suggested):,}英镑/年",
+        "market_avg": f"{int(market_avg):,}英镑/年",
+        "range_min": int(range_min),
+        "range_max": int(range_max),
+        "suggested_value": int(suggested),
+        "market_avg_value": int(market_avg)
+    }
 
-def generate_offer_letter_fallback(interview_data):
-    """原来的offer生成逻辑，作为备用"""
+def generate_offer_letter_fallback(interview_data, locale=OFFER_LOCALE):
+    """原来的offer生成逻辑，作为备用（只使用职位基准薪资）"""
     if not interview_data:
         return "无法获取面试结果数据"
     
-    # 提取面试信息
-    interview_scores = interview_data.get("interview_scores", {})
     candidate_info = interview_data.get("candidate_profile", {})
     
-    total_score = interview_scores.get("overall_score", 0)
-    technical_score = interview_scores.get("technical_score", 0)
-    hr_score = interview_scores.get("hr_score", 0)
-    boss_score = interview_scores.get("boss_score", 0)
-    
-    candidate_name = candidate_info.get("name", "候选人")
-    if candidate_name == "未知":
-        candidate_name = "候选人"
-        
     target_position = candidate_info.get("target_position", "Python开发工程师")  
     if target_position == "未知" or not target_position:
         # 如果职位信息缺失，尝试从候选人技能推断
@@ -672,13 +1129,10 @@ def generate_offer_letter_fallback(interview_data):
     candidate_skills = candidate_info.get("technical_skills", [])
     candidate_projects = candidate_info.get("key_projects", [])
     
-    # 分析候选人技能和项目，确定更精确的职位定位
-    ai_related_keywords = ["大模型", "LLM", "LoRA", "微调", "深度学习", "机器学习", "AI", "人工智能", "NLP", "自然语言处理", "计算机视觉", "推荐算法", "向量数据库", "FAISS", "Milvus", "LangChain", "RAG", "Prompt Engineering"]
-    backend_keywords = ["Django", "Flask", "FastAPI", "MySQL", "PostgreSQL", "Redis", "Docker", "微服务", "高并发", "API", "后端"]
-    
-    # 判断候选人主要方向
-    ai_skill_count = sum(1 for skill in candidate_skills if any(keyword in skill for keyword in ai_related_keywords))
-    backend_skill_count = sum(1 for skill in candidate_skills if any(keyword in skill for keyword in backend_keywords))
+    # 分析候选人技能，判断主要方向（AI/算法或传统开发）
+    skill_counts = score_skills(candidate_skills, categories=["ai_ml", "backend_dev"], weighted=False)
+    ai_skill_count = skill_counts["ai_ml"]
+    backend_skill_count = skill_counts["backend_dev"]
     
     # 根据技能分布调整职位描述
     if ai_skill_count > backend_skill_count:
@@ -695,140 +1149,20 @@ def generate_offer_letter_fallback(interview_data):
         # 传统开发方向
         refined_position = target_position
     
-    # 根据职位类型和分数确定薪资范围
-    def get_salary_by_position_and_score(position, score):
-        # 定义不同职位类型的薪资基准
-        salary_baselines = {
-            "大模型算法工程师": {"base": 75000, "range": 15000},
-            "机器学习工程师": {"base": 70000, "range": 12000},
-            "AI工程师": {"base": 65000, "range": 10000},
-            "数据科学家": {"base": 68000, "range": 12000},
-            "数据工程师": {"base": 62000, "range": 10000},
-            "云原生后端工程师": {"base": 65000, "range": 10000},
-            "DevOps工程师": {"base": 63000, "range": 10000},
-            "后端开发工程师": {"base": 58000, "range": 8000},
-            "前端开发工程师": {"base": 55000, "range": 8000},
-            "全栈开发工程师": {"base": 62000, "range": 10000},
-            "移动开发工程师": {"base": 60000, "range": 10000},
-            "安全工程师": {"base": 65000, "range": 12000},
-            "游戏开发工程师": {"base": 52000, "range": 8000},
-            "软件工程师": {"base": 55000, "range": 8000}
-        }
-        
-        # 获取职位基准薪资
-        baseline = salary_baselines.get(position, {"base": 55000, "range": 8000})
-        base_salary = baseline["base"]
-        salary_range = baseline["range"]
-        
-        # 根据分数调整薪资
-        if score >= 78:
-            # 高分：基准薪资 + 20%
-            adjusted_base = base_salary * 1.2
-            range_min = adjusted_base - salary_range * 0.8
-            range_max = adjusted_base + salary_range * 0.8
-            suggested = adjusted_base
-            market_avg = base_salary * 1.1
-        elif score >= 70:
-            # 中上分：基准薪资 + 10%
-            adjusted_base = base_salary * 1.1
-            range_min = adjusted_base - salary_range * 0.6
-            range_max = adjusted_base + salary_range * 0.6
-            suggested = adjusted_base
-            market_avg = base_salary * 1.05
-        else:
-            # 及格分：基准薪资
-            adjusted_base = base_salary
-            range_min = adjusted_base - salary_range * 0.5
-            range_max = adjusted_base + salary_range * 0.5
-            suggested = adjusted_base
-            market_avg = base_salary * 0.95
-        
-        return {
-            "range": f"{int(range_min):,}-{int(range_max):,}英镑/年",
-            "suggested": f"{int(suggested):,}英镑/年",
-            "market_avg": f"{int(market_avg):,}英镑/年"
-        }
-    
-    # 获取薪资信息
-    salary_info = get_salary_by_position_and_score(refined_position, total_score)
-    salary_range = salary_info["range"]
-    suggested_salary = salary_info["suggested"]
-    market_avg = salary_info["market_avg"]
-    
-    # 生成offer信
-    current_date = datetime.now().strftime("%Y年%m月%d日")
-    entry_date = datetime.now().strftime("%Y年%m月%d日")
-    
-    offer_letter = f"""
-### 候选人面试表现分析
-
-候选人：{candidate_name}
-应聘职位：{refined_position}
-面试总分：{total_score}分（技术面试{technical_score}分，HR面试{hr_score}分，Boss面试{boss_score}分）
-
-根据面试表现分析，该候选人在技术能力、沟通协作和团队合作方面表现良好，符合岗位要求。
-
-### 市场薪资参考
-
-根据伦敦{refined_position}市场薪资调研，结合候选人面试表现，建议薪资范围为：{salary_range}
-
-### Offer通知信
-
-**[公司名称] 人力资源部**
-
-{current_date}
-
-{candidate_name} 先生/女士：
-
-我们很高兴地通知您，经过三轮面试的全面评估，您已成功通过我们的招聘流程。我们诚挚地邀请您加入我们的团队。
-
-**职位详情：**
-- 职位名称：{refined_position}
-- 工作地点：伦敦
-- 入职时间：{entry_date}（具体时间将另行通知）
-
-**薪资福利：**
-- 基础年薪：{suggested_salary}
-- 市场参考：该职位在伦敦地区的平均薪资约为{market_avg}
-- 额外福利：包括但不限于医疗保险、养老金、年假等
-
-**面试评估总结：**
-- 技术面试评分：{technical_score}/100
-- HR面试评分：{hr_score}/100
-- Boss面试评分：{boss_score}/100
-- 综合评分：{total_score}/100
-
-**评估亮点：**
-{interview_scores.get('evaluation_summary', '候选人整体表现良好，符合岗位要求')}
-
-**改进建议：**
-"""
-    
-    improvement_suggestions = interview_scores.get('improvement_suggestions', [])
-    for i, suggestion in enumerate(improvement_suggestions, 1):
-        offer_letter += f"- {suggestion}\n"
-    
-    offer_letter += f"""
-**下一步流程：**
-1. 请在本offer发出后7个工作日内回复是否接受
-2. 如接受，我们将安排入职前准备事项
-3. 如有疑问，请随时联系HR部门
-
-**联系方式：**
-- 邮箱：hr@company.com
-- 电话：+44 20 1234 5678
-
-我们期待您的加入，相信您将为团队带来宝贵的贡献！
-
-此致
-敬礼
-
-{current_date}
-公司名称
-HR部门
-"""
+    # 工作地点（薪资基准按主要工作地点说明）
+    locations = resolve_offer_locations(candidate_info)
     
-    return offer_letter
+    context = _offer_basics(interview_data)
+    context.update({
+        "refined_position": refined_position,
+        "english_position": lookup_english_position(refined_position) or DEFAULT_ENGLISH_POSITION,
+        "top_skills": [],
+        "primary_location": locations[0],
+        "locations": [{"location": l, "display_name": location_display_name(l), "market": None, "band": None} for l in locations],
+        "salary_source": "fallback"
+    })
+    context.update(_baseline_context(refined_position, context["total_score"]))
+    return render_offer_letter(context, locale)
 
 def should_generate_offer(total_score):
     """判断是否应该生成offer（分数>=60）"""
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Adzuna MCP 连接池
+长期持有 MCP 服务器进程和会话，启动一次、发现一次工具，并发薪资请求复用已打开的会话
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+from pathlib import Path
+
+# MCP 协议相关导入
+try:
+    from autogen_ext.tools.mcp import StdioServerParams, create_mcp_server_session
+    MCP_AVAILABLE = True
+except ImportError:
+    MCP_AVAILABLE = False
+
+# 连接池配置（从环境变量读取）
+ADZUNA_MCP_POOL_SIZE = int(os.getenv("ADZUNA_MCP_POOL_SIZE", "2"))
+ADZUNA_MCP_HEALTH_INTERVAL = float(os.getenv("ADZUNA_MCP_HEALTH_INTERVAL", "30"))
+ADZUNA_MCP_STARTUP_TIMEOUT = float(os.getenv("ADZUNA_MCP_STARTUP_TIMEOUT", "20"))
+
+# MCP 服务器脚本路径（与当前工作目录无关）
+ADZUNA_MCP_SERVER_SCRIPT = Path(__file__).resolve().parent.parent / "mcp_servers" / "adzuna_mcp_server.py"
+
+def parse_tool_result(result):
+    """将 MCP 工具调用结果解析为字典"""
+    texts = [item.text for item in result.content if getattr(item, "text", None)]
+    if result.isError:
+        raise RuntimeError(texts[0] if texts else "MCP 工具调用失败")
+
+    for text in texts:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            continue
+
+    raise ValueError("MCP 工具未返回有效的JSON结果")
+
+class MCPServerSession:
+    """单个 MCP 服务器进程及其会话
+
+    会话的进入和退出都在专属任务中完成，避免跨任务关闭 stdio 连接。
+    """
+
+    def __init__(self, server_params, index):
+        self.server_params = server_params
+        self.index = index
+        self.session = None
+        self.tool_names = set()
+        self.in_flight = 0              # 正在进行的请求数
+        self.generation = 0             # 每次（重新）启动递增
+        self.restart_lock = asyncio.Lock()
+        self._ready = None
+        self._stop = None
+        self._task = None
+        self._error = None
+
+    @property
+    def alive(self):
+        """服务器进程和会话是否可用"""
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self):
+        """启动服务器进程，完成握手并发现工具"""
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._error = None
+        self._task = asyncio.create_task(self._run())
+
+        try:
+            await asyncio.wait_for(self._ready.wait(), ADZUNA_MCP_STARTUP_TIMEOUT)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise RuntimeError(f"MCP 服务器启动超时（{ADZUNA_MCP_STARTUP_TIMEOUT}秒）")
+        except BaseException:
+            # 调用方取消时同样结束服务器进程，避免遗留孤儿任务
+            await self.close()
+            raise
+
+        if self._error is not None:
+            await self.close()
+            raise RuntimeError(f"MCP 服务器启动失败: {self._error}")
+
+        self.generation += 1
+
+    async def _run(self):
+        """持有会话直到收到关闭信号"""
+        try:
+            async with create_mcp_server_session(self.server_params) as session:
+                await session.initialize()
+                tools = await session.list_tools()
+                self.tool_names = {tool.name for tool in tools.tools}
+                self.session = session
+                self._ready.set()
+                await self._stop.wait()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def call_tool(self, name, arguments):
+        """在当前会话上调用工具，多个请求可同时复用同一会话"""
+        if not self.alive:
+            raise RuntimeError(f"MCP 会话{self.index}不可用")
+        if name not in self.tool_names:
+            raise ValueError(f"MCP 服务器未提供工具: {name}")
+
+        self.in_flight += 1
+        try:
+            result = await self.session.call_tool(name, arguments)
+        finally:
+            self.in_flight -= 1
+
+        return parse_tool_result(result)
+
+    async def ping(self):
+        """健康检查"""
+        if not self.alive:
+            raise RuntimeError(f"MCP 会话{self.index}已断开")
+        await self.session.send_ping()
+
+    async def close(self):
+        """关闭会话并结束服务器进程"""
+        if self._stop is not None:
+            self._stop.set()
+        if self._task is not None and self._ready is not None and not self._ready.is_set():
+            # 仍在握手中，收不到关闭信号，直接取消
+            self._task.cancel()
+        if self._task is not None:
+            try:
+                await self._task
+            except (Exception, asyncio.CancelledError):
+                pass
+        self.session = None
+
+class AdzunaMCPPool:
+    """Adzuna MCP 服务器连接池"""
+
+    def __init__(self, size=ADZUNA_MCP_POOL_SIZE, health_interval=ADZUNA_MCP_HEALTH_INTERVAL):
+        self.server_params = StdioServerParams(
+            command=sys.executable,
+            args=[str(ADZUNA_MCP_SERVER_SCRIPT)]
+        )
+        self.size = max(1, size)
+        self.health_interval = health_interval
+        self.respawn_count = 0
+        self.loop = None
+        self._sessions = []
+        self._start_lock = asyncio.Lock()
+        self._health_task = None
+        self._start_failed_at = None
+
+    async def start(self):
+        """启动所有服务器进程（只执行一次）"""
+        if self._sessions:
+            return
+
+        async with self._start_lock:
+            if self._sessions:
+                return
+
+            # 启动失败后在一个健康检查周期内不再重试，避免每个请求都等待完整的启动超时
+            if self._start_failed_at is not None and \
+                    time.monotonic() - self._start_failed_at < self.health_interval:
+                raise RuntimeError("MCP 连接池启动失败，稍后重试")
+
+            self.loop = asyncio.get_running_loop()
+            sessions = [MCPServerSession(self.server_params, i) for i in range(self.size)]
+            try:
+                results = await asyncio.gather(*(s.start() for s in sessions), return_exceptions=True)
+            except BaseException:
+                # 启动途中被取消：关闭所有已启动的会话
+                await asyncio.gather(*(s.close() for s in sessions), return_exceptions=True)
+                raise
+
+            failures = [r for r in results if isinstance(r, Exception)]
+            if len(failures) == len(sessions):
+                self._start_failed_at = time.monotonic()
+                raise failures[0]
+            self._start_failed_at = None
+            for error in failures:
+                print(f"MCP 会话启动失败，将由健康检查重试: {error}")
+
+            self._sessions = sessions
+            self._health_task = asyncio.create_task(self._health_loop())
+            print(f"✅ MCP 连接池已启动：{len(sessions) - len(failures)}/{len(sessions)} 个会话可用")
+
+    async def _respawn(self, session, seen_generation):
+        """重启指定会话；并发的重启请求只执行一次"""
+        async with session.restart_lock:
+            if session.generation != seen_generation and session.alive:
+                return
+            await session.close()
+            await session.start()
+            self.respawn_count += 1
+            print(f"MCP 会话{session.index}已重启")
+
+    async def _acquire(self):
+        """选择当前负载最小的可用会话"""
+        alive = [s for s in self._sessions if s.alive]
+        if not alive:
+            session = self._sessions[0]
+            await self._respawn(session, session.generation)
+            alive = [session]
+        return min(alive, key=lambda s: s.in_flight)
+
+    async def call_tool(self, name, arguments):
+        """调用 MCP 工具，会话异常时重启后重试一次"""
+        await self.start()
+
+        for attempt in range(2):
+            session = await self._acquire()
+            generation = session.generation
+            try:
+                return await session.call_tool(name, arguments)
+            except ValueError:
+                raise
+            except Exception as e:
+                if attempt:
+                    raise
+                print(f"MCP 会话{session.index}调用失败，正在重启: {e}")
+                await self._respawn(session, generation)
+
+    async def _health_loop(self):
+        """定期检查会话健康状态，自动重启失效的会话"""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for session in self._sessions:
+                generation = session.generation
+                try:
+                    await asyncio.wait_for(session.ping(), timeout=self.health_interval)
+                except Exception as e:
+                    print(f"MCP 会话{session.index}健康检查失败，正在重启: {e}")
+                    try:
+                        await self._respawn(session, generation)
+                    except Exception as e:
+                        print(f"MCP 会话{session.index}重启失败: {e}")
+
+    def stats(self):
+        """连接池状态，用于监控"""
+        return {
+            "size": self.size,
+            "alive": sum(1 for s in self._sessions if s.alive),
+            "in_flight": sum(s.in_flight for s in self._sessions),
+            "respawn_count": self.respawn_count
+        }
+
+    async def close(self):
+        """关闭连接池"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+        await asyncio.gather(*(s.close() for s in self._sessions), return_exceptions=True)
+        self._sessions = []
+
+# 进程内共享的连接池（绑定到创建它的事件循环）
+_mcp_pool = None
+
+def get_mcp_pool():
+    """获取当前事件循环的共享连接池"""
+    global _mcp_pool
+    loop = asyncio.get_running_loop()
+    if _mcp_pool is None or _mcp_pool.loop not in (None, loop):
+        _mcp_pool = AdzunaMCPPool()
+    return _mcp_pool
+
+async def close_mcp_pool():
+    """关闭共享连接池"""
+    global _mcp_pool
+    if _mcp_pool is not None and _mcp_pool.loop in (None, asyncio.get_running_loop()):
+        await _mcp_pool.close()
+    _mcp_pool = None
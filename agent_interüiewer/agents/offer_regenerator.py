@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+批量重新生成 offer
+遍历已保存的面试结果（data/interview_results/60plus/*/interview_results_*，JSON 或压缩归档），
+按当前的薪资策略和模板重新生成 offer 通知信：
+解析和渲染分摊到多个进程，薪资数据在主进程按职位去重后批量查询，
+offer 文件原子替换为内容寻址存储中 blob 的硬链接，内容相同的 offer 只占一份空间
+"""
+
+import os
+import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .hr_offer_agent import build_offer_context, generate_offer_letter_fallback, prepare_offer_batch
+from .result_archive import find_result_files, load_result_file, result_stamp
+from .offer_templates import OFFER_LOCALE, render_offer_letter, resolve_offer_locale
+from .blob_store import blob_digest, get_blob_store
+from .position_classifier import save_position_cache
+from .results_store import get_results_store
+
+OFFER_RESULTS_DIR = "data/interview_results/60plus"
+
+def find_interview_results(base_dir=OFFER_RESULTS_DIR):
+    """已保存的面试结果文件（按路径排序）"""
+    return [str(p) for p in find_result_files(base_dir)]
+
+def offer_path_for(results_path):
+    """面试结果对应的 offer 文件：interview_results_<时间>.json(.gz) → offer_letter_<时间>.txt"""
+    return str(Path(results_path).with_name(f"offer_letter_{result_stamp(results_path)}.txt"))
+
+def _load_offer_inputs(paths):
+    """（工作进程）读取面试结果，只保留生成 offer 需要的部分"""
+    loaded = []
+    for path in paths:
+        try:
+            data = load_result_file(path)
+            loaded.append((path, {
+                "interview_scores": data.get("interview_scores", {}),
+                "candidate_profile": data.get("candidate_profile", {})
+            }, None))
+        except (OSError, ValueError, EOFError) as e:
+            loaded.append((path, None, str(e)))
+    return loaded
+
+def _render_offer_chunk(jobs, locale):
+    """（工作进程）渲染并原子写入一批 offer，返回 [(结果文件, offer文件, 通知信哈希, 职位, 错误)]"""
+    results = []
+    for path, interview_data, position_info, english_position, locations, market_data_by_location in jobs:
+        offer_path = offer_path_for(path)
+        try:
+            try:
+                context = build_offer_context(interview_data, position_info, english_position,
+                                              locations, market_data_by_location)
+                letter = render_offer_letter(context, locale)
+            except Exception as e:
+                print(f"⚠️ {path} 使用备用方案生成offer: {e}")
+                letter = generate_offer_letter_fallback(interview_data, locale)
+            digest = get_blob_store().write_linked(offer_path, letter)
+            results.append((path, offer_path, digest, position_info["refined_position"], None))
+        except Exception as e:
+            results.append((path, offer_path, None, None, str(e)))
+    return results
+
+def _chunks(items, count):
+    """将列表切成约 count 份"""
+    size = max(1, -(-len(items) // max(1, count)))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+async def regenerate_offers(base_dir=OFFER_RESULTS_DIR, workers=None, locale=OFFER_LOCALE, locations=None):
+    """重新生成 base_dir 下所有面试结果的 offer 通知信
+
+    Args:
+        base_dir (str): 面试结果目录（每位候选人一个子目录）
+        workers (int): 工作进程数，默认为 CPU 核数
+        locale (str): offer 语言
+        locations (list): 工作地点列表，默认按每位候选人的信息确定
+
+    Returns:
+        dict: 统计信息（files、regenerated、failed、positions、salary_lookups、elapsed）
+    """
+    started = time.perf_counter()
+    locale = resolve_offer_locale(locale)
+    workers = workers or os.cpu_count() or 1
+    paths = find_interview_results(base_dir)
+    stats = {"files": len(paths), "regenerated": 0, "failed": 0, "positions": 0, "salary_lookups": 0}
+    if not paths:
+        print(f"⚠️ {base_dir} 下没有面试结果")
+        return {**stats, "elapsed": 0.0}
+
+    print(f"正在重新生成 {len(paths)} 份offer（{workers} 个进程）...")
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # 第一步：多进程解析面试结果
+        loaded = []
+        for chunk in await asyncio.gather(*(
+            loop.run_in_executor(executor, _load_offer_inputs, chunk) for chunk in _chunks(paths, workers * 4)
+        )):
+            loaded.extend(chunk)
+
+        records = []
+        for path, interview_data, error in loaded:
+            if error:
+                stats["failed"] += 1
+                print(f"❌ 读取 {path} 失败: {error}")
+            else:
+                records.append((path, interview_data))
+
+        # 第二步：主进程确定职位和地点，薪资数据按职位去重后并发查询
+        prepared, locations_by_position = await prepare_offer_batch(
+            [interview_data["candidate_profile"] for _, interview_data in records], locations
+        )
+        stats["positions"] = len(locations_by_position)
+        stats["salary_lookups"] = sum(len(locs) for locs in locations_by_position.values())
+
+        # 第三步：多进程渲染并写入 offer
+        jobs = [(path, interview_data, *batch) for (path, interview_data), batch in zip(records, prepared)]
+        letters = []
+        for chunk in await asyncio.gather(*(
+            loop.run_in_executor(executor, _render_offer_chunk, chunk, locale) for chunk in _chunks(jobs, workers * 4)
+        )):
+            for path, offer_path, digest, refined_position, error in chunk:
+                if error:
+                    stats["failed"] += 1
+                    print(f"❌ 写入 {offer_path} 失败: {error}")
+                else:
+                    stats["regenerated"] += 1
+                    letters.append((path, offer_path, digest, refined_position))
+
+    # 面试结果存储中的 offer 记录指向新的通知信
+    if letters:
+        get_results_store().update_offer_letters(letters)
+    # 本次批量分类新编码的文本向量只写一次
+    save_position_cache()
+
+    stats["elapsed"] = round(time.perf_counter() - started, 2)
+    print(f"✅ offer重新生成完成：{stats['regenerated']}/{stats['files']}份，失败{stats['failed']}份，"
+          f"{stats['positions']}个职位，{stats['salary_lookups']}次薪资查询，耗时{stats['elapsed']}秒")
+    return stats
+
+def dedupe_offer_files(base_dir=OFFER_RESULTS_DIR):
+    """将 base_dir 下已有的 offer 文件改为 blob 的硬链接，内容相同的文件共用一份存储
+
+    Returns:
+        dict: 统计信息（files、linked、saved_bytes）
+    """
+    blobs = get_blob_store()
+    stats = {"files": 0, "linked": 0, "saved_bytes": 0}
+    for path in sorted(Path(base_dir).glob("*/offer_letter_*.txt")):
+        stats["files"] += 1
+        data = path.read_bytes()
+        digest = blob_digest(data)
+        if blobs.has(digest):
+            if os.path.samefile(blobs.path(digest), path):
+                continue
+            stats["saved_bytes"] += len(data)
+        else:
+            blobs.put(data)
+        blobs.link(digest, path)
+        stats["linked"] += 1
+    print(f"✅ offer去重完成：{stats['files']}份offer，{stats['linked']}份改为共享存储，节省{stats['saved_bytes']}字节")
+    return stats
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Offer 通知信模板
+模板在导入（或注册）时编译一次，渲染时只做字段替换和格式化；
+支持多语言（zh_CN、en_GB）和自定义模板，批量生成 offer 时共用编译结果
+"""
+
+import os
+from string import Formatter
+
+from .skill_taxonomy import SKILL_CATEGORIES
+
+# 默认 offer 语言（从环境变量读取）
+OFFER_LOCALE = os.getenv("OFFER_LOCALE", "zh_CN")
+
+class CompiledTemplate:
+    """预编译的模板
+
+    使用 str.format 语法（支持格式说明，如 {average_salary:,.0f}、{current_date:%Y年%m月%d日}），
+    编译时解析为 (文本, 字段, 格式, 转换) 片段列表，渲染时不再解析模板。
+    """
+
+    _formatter = Formatter()
+
+    def __init__(self, source):
+        self.source = source
+        self.segments = []
+        self.fields = set()
+        for literal, field, spec, conversion in self._formatter.parse(source):
+            if field is not None:
+                if not field.isidentifier():
+                    raise ValueError(f"模板字段只支持简单名称: {{{field}}}")
+                if spec and "{" in spec:
+                    raise ValueError(f"模板字段 {field} 不支持嵌套格式说明")
+                self.fields.add(field)
+            self.segments.append((literal, field, spec or "", conversion))
+
+    def render(self, values):
+        """用 values 中的字段渲染模板，缺少字段时抛出 KeyError"""
+        parts = []
+        for literal, field, spec, conversion in self.segments:
+            parts.append(literal)
+            if field is not None:
+                value = values[field]
+                if conversion == "r":
+                    value = repr(value)
+                elif conversion == "s":
+                    value = str(value)
+                parts.append(format(value, spec))
+        return "".join(parts)
+
+# 各语言的模板（letter 为通知信正文，其余为正文中引用的片段）
+OFFER_TEMPLATES = {
+    "zh_CN": {
+        "letter": """
+### 候选人面试表现分析
+
+候选人：{candidate_name}
+应聘职位：{position_name}
+面试总分：{total_score}分（技术面试{technical_score}分，HR面试{hr_score}分，Boss面试{boss_score}分）
+
+根据面试表现分析，该候选人在技术能力、沟通协作和团队合作方面表现良好，符合岗位要求。
+
+### 市场薪资参考
+
+{market_section}
+
+### Offer通知信
+
+**[公司名称] 人力资源部**
+
+{current_date:%Y年%m月%d日}
+
+{candidate_name} 先生/女士：
+
+我们很高兴地通知您，经过三轮面试的全面评估，您已成功通过我们的招聘流程。我们诚挚地邀请您加入我们的团队。
+
+**职位详情：**
+- 职位名称：{position_name}
+- 工作地点：{work_locations}
+- 入职时间：{entry_date:%Y年%m月%d日}（具体时间将另行通知）
+
+**薪资福利：**
+- 基础年薪：{suggested_salary}
+- 市场参考：{market_reference}
+- 额外福利：包括但不限于医疗保险、养老金、年假等
+
+**面试评估总结：**
+- 技术面试评分：{technical_score}/25
+- HR面试评分：{hr_score}/25
+- Boss面试评分：{boss_score}/25
+- 综合评分：{total_score}/100
+
+**评估亮点：**
+{evaluation_summary}
+
+**改进建议：**
+{improvement_lines}
+**下一步流程：**
+1. 请在本offer发出后7个工作日内回复是否接受
+2. 如接受，我们将安排入职前准备事项
+3. 如有疑问，请随时联系HR部门
+
+**联系方式：**
+- 邮箱：hr@company.com
+- 电话：+44 20 1234 5678
+
+我们期待您的加入，相信您将为团队带来宝贵的贡献！
+
+此致
+敬礼
+
+{current_date:%Y年%m月%d日}
+公司名称
+HR部门
+""",
+        "market_section": """
+**实时市场薪资数据（{band_location_name}，基于{sample_count}个职位样本）：**
+- 目标职位：{position_name}（{english_position}）
+- 市场平均薪资：{average_salary:,.0f}英镑/年
+- 市场薪资范围：{min_salary:,.0f} - {max_salary:,.0f}英镑/年
+- 建议薪资位于市场第{percentile_rank:.0f}百分位
+- 技能匹配分析：{skill_analysis}
+- 数据来源：Adzuna API（实时更新）
+
+**各工作地点薪资区间：**
+{location_summary}
+
+
+建议薪资范围为：{salary_range}""",
+        "baseline_section": """
+**市场薪资参考：**
+- 目标职位：{position_name}
+- 基于{primary_location_name}{position_name}市场薪资调研
+- 市场平均薪资参考：{market_avg:,.0f}英镑/年
+- 技能匹配分析：{skill_analysis}
+- 数据来源：职位薪资基准（实时市场数据暂不可用）
+
+
+建议薪资范围为：{salary_range}""",
+        "fallback_section": "根据{primary_location_name}{position_name}市场薪资调研，结合候选人面试表现，建议薪资范围为：{salary_range}",
+        "market_reference": "基于实时市场数据分析",
+        "baseline_reference": "该职位在{primary_location_name}地区的平均薪资约为{market_avg:,.0f}英镑/年",
+        "location_line": "- {location_name}（{sample_count}个职位样本）：市场平均{average_salary:,.0f}英镑/年，"
+                         "范围{min_salary:,.0f} - {max_salary:,.0f}英镑/年，"
+                         "建议{range_min:,.0f}-{range_max:,.0f}英镑/年（{suggested:,.0f}英镑/年）",
+        "location_missing": "- {location_name}：暂无市场数据",
+        "salary_range": "{range_min:,.0f}-{range_max:,.0f}英镑/年",
+        "salary": "{amount:,.0f}英镑/年",
+        "skill_match": "候选人主要技能方向：{skill_names}，技能匹配度：{top_score:.1f}分，符合{position_name}岗位要求。",
+        "skill_match_empty": "候选人技能信息待完善，根据职位要求匹配{position_name}岗位。",
+        "suggestion_line": "- {suggestion}\n"
+    },
+    "en_GB": {
+        "letter": """
+### Interview Performance
+
+Candidate: {candidate_name}
+Position: {position_name}
+Overall score: {total_score} (technical {technical_score}, HR {hr_score}, leadership {boss_score})
+
+The candidate performed well in technical ability, communication and teamwork, and meets the requirements of the role.
+
+### Market Salary Reference
+
+{market_section}
+
+### Offer Letter
+
+**[Company Name] Human Resources**
+
+{current_date:%d %B %Y}
+
+Dear {candidate_name},
+
+We are delighted to inform you that, following three rounds of interviews, you have successfully completed our recruitment process. We would like to invite you to join our team.
+
+**Position details:**
+- Job title: {position_name}
+- Work location: {work_locations}
+- Start date: {entry_date:%d %B %Y} (exact date to be confirmed)
+
+**Salary and benefits:**
+- Base salary: {suggested_salary}
+- Market reference: {market_reference}
+- Additional benefits: including but not limited to health insurance, pension and annual leave
+
+**Interview assessment:**
+- Technical interview: {technical_score}/25
+- HR interview: {hr_score}/25
+- Leadership interview: {boss_score}/25
+- Overall: {total_score}/100
+
+**Highlights:**
+{evaluation_summary}
+
+**Areas for development:**
+{improvement_lines}
+**Next steps:**
+1. Please let us know whether you accept this offer within 7 working days
+2. Once accepted, we will arrange your onboarding
+3. If you have any questions, please contact the HR team
+
+**Contact:**
+- Email: hr@company.com
+- Phone: +44 20 1234 5678
+
+We look forward to welcoming you to the team.
+
+Yours sincerely,
+
+{current_date:%d %B %Y}
+[Company Name]
+Human Resources
+""",
+        "market_section": """
+**Live market salary data ({band_location_name}, {sample_count} job samples):**
+- Target position: {english_position}
+- Market average: £{average_salary:,.0f} per year
+- Market range: £{min_salary:,.0f} - £{max_salary:,.0f} per year
+- Suggested salary percentile: P{percentile_rank:.0f}
+- Skill match: {skill_analysis}
+- Source: Adzuna API (live)
+
+**Salary bands by location:**
+{location_summary}
+
+
+Suggested salary range: {salary_range}""",
+        "baseline_section": """
+**Market salary reference:**
+- Target position: {english_position}
+- Based on {position_name} salary research in {primary_location_name}
+- Market average reference: £{market_avg:,.0f} per year
+- Skill match: {skill_analysis}
+- Source: position salary baselines (live market data unavailable)
+
+
+Suggested salary range: {salary_range}""",
+        "fallback_section": "Based on {position_name} salary research in {primary_location_name} and the interview results, the suggested salary range is {salary_range}",
+        "market_reference": "based on live market data",
+        "baseline_reference": "the average salary for this role in {primary_location_name} is about £{market_avg:,.0f} per year",
+        "location_line": "- {location_name} ({sample_count} job samples): market average £{average_salary:,.0f} per year, "
+                         "range £{min_salary:,.0f} - £{max_salary:,.0f} per year, "
+                         "suggested £{range_min:,.0f}-£{range_max:,.0f} per year (£{suggested:,.0f})",
+        "location_missing": "- {location_name}: no market data",
+        "salary_range": "£{range_min:,.0f}-£{range_max:,.0f} per year",
+        "salary": "£{amount:,.0f} per year",
+        "skill_match": "main skill areas are {skill_names} (match score {top_score:.1f}), which fits the {position_name} role.",
+        "skill_match_empty": "skill information is incomplete; matched to the {position_name} role by its requirements.",
+        "suggestion_line": "- {suggestion}\n"
+    }
+}
+
+# 各语言的默认值和名称规则
+OFFER_LOCALE_OPTIONS = {
+    "zh_CN": {
+        "candidate_name": "候选人",
+        "evaluation_summary": "候选人整体表现良好，符合岗位要求",
+        "position_field": "refined_position",
+        "skill_label": "label",
+        "location_name": lambda location: location["display_name"]
+    },
+    "en_GB": {
+        "candidate_name": "Candidate",
+        "evaluation_summary": "The candidate performed well overall and meets the requirements of the role",
+        "position_field": "english_position",
+        "skill_label": "label_en",
+        "location_name": lambda location: location["location"].title()
+    }
+}
+
+# 编译后的模板：{语言: {模板名: CompiledTemplate}}
+_compiled_templates = {}
+
+def register_offer_templates(locale, templates, options=None):
+    """注册（或覆盖）某个语言的 offer 模板并立即编译
+
+    Args:
+        locale (str): 语言，如 zh_CN
+        templates (dict): {模板名: 模板文本}，未提供的模板沿用已有语言的同名模板
+        options (dict): 默认值和名称规则，见 OFFER_LOCALE_OPTIONS
+    """
+    base = OFFER_TEMPLATES.get(locale) or OFFER_TEMPLATES["zh_CN"]
+    merged = {**base, **templates}
+    compiled = {name: CompiledTemplate(source) for name, source in merged.items()}
+    OFFER_TEMPLATES[locale] = merged
+    OFFER_LOCALE_OPTIONS[locale] = {**OFFER_LOCALE_OPTIONS.get(locale, OFFER_LOCALE_OPTIONS["zh_CN"]), **(options or {})}
+    _compiled_templates[locale] = compiled
+    return compiled
+
+def resolve_offer_locale(locale):
+    """已注册的语言，未知语言时使用 zh_CN"""
+    if locale not in _compiled_templates:
+        print(f"⚠️ 未知的 offer 语言 {locale}，使用 zh_CN")
+        return "zh_CN"
+    return locale
+
+def get_offer_templates(locale=OFFER_LOCALE):
+    """获取编译后的模板"""
+    return _compiled_templates[resolve_offer_locale(locale)]
+
+for _locale in list(OFFER_TEMPLATES):
+    register_offer_templates(_locale, {})
+
+def render_offer_letter(context, locale=OFFER_LOCALE):
+    """渲染 offer 通知信
+
+    Args:
+        context (dict): hr_offer_agent.build_offer_context() 生成的上下文
+        locale (str): 语言
+
+    Returns:
+        str: offer 通知信
+    """
+    locale = resolve_offer_locale(locale)
+    templates = _compiled_templates[locale]
+    options = OFFER_LOCALE_OPTIONS[locale]
+    location_name = options["location_name"]
+
+    position_name = context[options["position_field"]]
+    locations = context["locations"]
+    primary = locations[0]
+    values = {
+        **context,
+        "candidate_name": context.get("candidate_name") or options["candidate_name"],
+        "evaluation_summary": context.get("evaluation_summary") or options["evaluation_summary"],
+        "position_name": position_name,
+        "work_locations": " / ".join(location_name(l) for l in locations),
+        "primary_location_name": location_name(primary),
+        "salary_range": templates["salary_range"].render(context),
+        "suggested_salary": templates["salary"].render({"amount": context["suggested_salary"]})
+    }
+
+    # 技能匹配分析
+    top_skills = context.get("top_skills") or []
+    if top_skills:
+        values["skill_analysis"] = templates["skill_match"].render({
+            "skill_names": ", ".join(SKILL_CATEGORIES[c][options["skill_label"]] for c, _ in top_skills),
+            "top_score": top_skills[0][1],
+            "position_name": position_name
+        })
+    else:
+        values["skill_analysis"] = templates["skill_match_empty"].render(values)
+
+    # 市场薪资部分：实时市场数据 / 职位基准（查询失败）/ 备用方案
+    source = context["salary_source"]
+    if source == "market":
+        band = next(l for l in locations if l["location"] == context["band_location"])
+        lines = []
+        for location in locations:
+            name = location_name(location)
+            if location["market"]:
+                lines.append(templates["location_line"].render({**location["market"], **location["band"], "location_name": name}))
+            else:
+                lines.append(templates["location_missing"].render({"location_name": name}))
+        values = {**band["market"], **values}
+        values["band_location_name"] = location_name(band)
+        values["location_summary"] = "\n".join(lines)
+        values["market_section"] = templates["market_section"].render(values)
+        values["market_reference"] = templates["market_reference"].render(values)
+    else:
+        section = "baseline_section" if source == "baseline" else "fallback_section"
+        values["market_section"] = templates[section].render(values)
+        values["market_reference"] = templates["baseline_reference"].render(values)
+
+    suggestion_line = templates["suggestion_line"]
+    values["improvement_lines"] = "".join(
+        suggestion_line.render({"suggestion": s}) for s in context.get("improvement_suggestions") or []
+    )
+    return templates["letter"].render(values)
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+基于向量的职位分类器
+关键词规则匹配不到职位时，用句向量比较候选人技能/项目与职位目录的语义相似度，
+能识别同义词和中英文混写（如 PyTorch、各种 Transformer 变体）
+"""
+
+import os
+import atexit
+import asyncio
+import hashlib
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from .salary_snapshot import SALARY_SOURCE
+from .skill_taxonomy import SKILL_CATEGORIES
+
+# 句向量模型相关导入（可选依赖）
+try:
+    from sentence_transformers import SentenceTransformer
+    EMBEDDING_AVAILABLE = True
+except ImportError:
+    EMBEDDING_AVAILABLE = False
+
+# 分类器配置（从环境变量读取）
+POSITION_EMBEDDING_MODEL = os.getenv("POSITION_EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
+POSITION_EMBEDDING_DIR = os.getenv("POSITION_EMBEDDING_DIR", "data/position_embeddings")
+POSITION_EMBEDDING_BATCH_SIZE = int(os.getenv("POSITION_EMBEDDING_BATCH_SIZE", "64"))
+POSITION_CLASSIFIER_THRESHOLD = float(os.getenv("POSITION_CLASSIFIER_THRESHOLD", "0.35"))
+# embedding / off；auto（默认）在 SALARY_SOURCE=offline 时关闭，离线环境不尝试下载模型
+POSITION_CLASSIFIER = os.getenv("POSITION_CLASSIFIER", "auto").strip().lower()
+POSITION_CLASSIFIER_ENABLED = POSITION_CLASSIFIER != "off" and not (POSITION_CLASSIFIER == "auto" and SALARY_SOURCE == "offline")
+
+# 项目经验在候选人向量中的权重（技能为1）
+PROJECT_VECTOR_WEIGHT = 0.5
+
+def content_hash(*parts):
+    """内容哈希，用作向量缓存的键"""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+def build_position_catalogue(position_mapping):
+    """职位目录：每个职位一段描述文本（中英文职位名 + 相关技能关键词）
+
+    Args:
+        position_mapping (dict): 中文职位到英文职位的映射
+
+    Returns:
+        dict: {中文职位: 描述文本}
+    """
+    catalogue = {}
+    for position, english_position in position_mapping.items():
+        keywords = []
+        for config in SKILL_CATEGORIES.values():
+            if position in config["positions"]:
+                keywords.extend(config["keywords"])
+        text = f"{position} {english_position}"
+        if keywords:
+            text += ": " + ", ".join(dict.fromkeys(keywords))
+        catalogue[position] = text
+    return catalogue
+
+class PositionClassifier:
+    """职位向量分类器
+
+    - 职位目录只编码一次，按模型和目录内容的哈希持久化到 POSITION_EMBEDDING_DIR
+    - 候选人的技能和项目文本批量编码，每段文本的向量按内容哈希缓存，
+      相同的候选人资料直接返回缓存的分类结果
+    - 模型加载和编码在调用线程中执行（异步代码请使用 classify_positions_async），
+      多个线程同时调用时依次执行
+    - 模型加载失败后本进程不再重试（如无法联网下载模型），改用关键词规则
+    """
+
+    def __init__(self, position_mapping, model_name=POSITION_EMBEDDING_MODEL,
+                 cache_dir=POSITION_EMBEDDING_DIR, encoder=None):
+        self.position_mapping = position_mapping
+        self.model_name = model_name
+        self.cache_dir = Path(cache_dir)
+        self.threshold = POSITION_CLASSIFIER_THRESHOLD
+        self._encoder = encoder
+        self._positions = None
+        self._catalogue_vectors = None
+        self._text_vectors = {}         # 文本内容哈希 → 向量
+        self._profile_results = {}      # 候选人资料哈希 → 分类结果
+        self._text_cache_dirty = False
+        self._load_error = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        """模型是否可用（还没有加载过时视为可用）"""
+        return self._load_error is None
+
+    def _get_encoder(self):
+        """首次使用时加载句向量模型，失败时记住错误，不再重复加载"""
+        if self._encoder is None:
+            if self._load_error is not None:
+                raise RuntimeError(f"句向量模型不可用: {self._load_error}")
+            try:
+                if not EMBEDDING_AVAILABLE:
+                    raise RuntimeError("未安装 sentence-transformers")
+                self._encoder = SentenceTransformer(self.model_name, device="cpu")
+            except Exception as e:
+                self._load_error = e
+                print(f"⚠️ 句向量模型 {self.model_name} 加载失败，本进程改用关键词规则推断职位: {e}")
+                raise
+        return self._encoder
+
+    def _encode(self, texts):
+        """批量编码文本，返回单位化的 float32 向量矩阵"""
+        vectors = self._get_encoder().encode(
+            list(texts),
+            batch_size=POSITION_EMBEDDING_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _load_catalogue(self):
+        """加载职位目录向量，不存在时编码并持久化"""
+        if self._catalogue_vectors is not None:
+            return
+
+        catalogue = build_position_catalogue(self.position_mapping)
+        positions = list(catalogue)
+        fingerprint = content_hash(self.model_name, *(f"{p}\t{catalogue[p]}" for p in positions))[:16]
+        path = self.cache_dir / f"catalogue_{fingerprint}.npz"
+
+        if path.exists():
+            with np.load(path) as data:
+                vectors = data["vectors"]
+        else:
+            print(f"正在编码职位目录（{len(positions)}个职位）...")
+            vectors = self._encode(catalogue[p] for p in positions)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            np.savez(path, positions=np.array(positions), vectors=vectors)
+
+        self._positions = positions
+        self._catalogue_vectors = vectors
+        self._load_text_cache()
+
+    def _text_cache_path(self):
+        return self.cache_dir / f"texts_{content_hash(self.model_name)[:16]}.npz"
+
+    def _load_text_cache(self):
+        """加载已持久化的文本向量缓存"""
+        path = self._text_cache_path()
+        if path.exists():
+            with np.load(path) as data:
+                self._text_vectors.update(zip(data["keys"].tolist(), data["vectors"]))
+
+    def save_cache(self):
+        """持久化文本向量缓存（只在有新编码的向量时写入；批量任务结束和进程退出时调用）"""
+        with self._lock:
+            if not self._text_cache_dirty or not self._text_vectors:
+                return
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            keys = list(self._text_vectors)
+            path = self._text_cache_path()
+            tmp_path = path.with_name(path.stem + ".tmp.npz")
+            np.savez(tmp_path, keys=np.array(keys), vectors=np.stack([self._text_vectors[k] for k in keys]))
+            os.replace(tmp_path, path)
+            self._text_cache_dirty = False
+
+    def _ensure_text_vectors(self, texts):
+        """批量编码缓存中没有的文本"""
+        missing = {}
+        for text in texts:
+            key = content_hash(text)
+            if key not in self._text_vectors and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = self._encode(missing.values())
+            self._text_vectors.update(zip(missing.keys(), vectors))
+            self._text_cache_dirty = True
+
+    @staticmethod
+    def _profile_key(skills, projects):
+        return content_hash("skills", *skills, "projects", *projects)
+
+    def classify_batch(self, profiles):
+        """批量分类候选人资料
+
+        Args:
+            profiles (list): (技能列表, 项目列表) 元组列表
+
+        Returns:
+            list: 每个资料的分类结果 {position, english_position, score}，相似度低于阈值时为 None
+        """
+        with self._lock:
+            return self._classify_batch(profiles)
+
+    def _classify_batch(self, profiles):
+        """classify_batch() 的实现（调用方持有锁）"""
+        self._load_catalogue()
+        profiles = [([str(s) for s in skills or []], [str(p) for p in projects or []]) for skills, projects in profiles]
+        keys = [self._profile_key(skills, projects) for skills, projects in profiles]
+
+        # 只处理缓存中没有的资料，所有文本一次批量编码
+        pending = {key: profile for key, profile in zip(keys, profiles)
+                   if key not in self._profile_results and (profile[0] or profile[1])}
+        if pending:
+            self._ensure_text_vectors(text for skills, projects in pending.values() for text in skills + projects)
+
+            profile_vectors = []
+            for skills, projects in pending.values():
+                texts = skills + projects
+                weights = np.array([1.0] * len(skills) + [PROJECT_VECTOR_WEIGHT] * len(projects), dtype=np.float32)
+                vectors = np.stack([self._text_vectors[content_hash(t)] for t in texts])
+                vector = weights @ vectors
+                profile_vectors.append(vector / (np.linalg.norm(vector) or 1.0))
+
+            # 余弦相似度：(资料数, 维度) × (维度, 职位数)
+            similarity = np.stack(profile_vectors) @ self._catalogue_vectors.T
+            best = similarity.argmax(axis=1)
+            for key, index, row in zip(pending, best, similarity):
+                score = float(row[index])
+                position = self._positions[index]
+                self._profile_results[key] = {
+                    "position": position,
+                    "english_position": self.position_mapping[position],
+                    "score": round(score, 4)
+                } if score >= self.threshold else None
+
+        return [self._profile_results.get(key) for key in keys]
+
+    def classify(self, skills, projects=()):
+        """分类单个候选人资料"""
+        return self.classify_batch([(skills, projects)])[0]
+
+# 进程内共享的分类器实例（异步接口会在工作线程中创建）
+_position_classifier = None
+_position_classifier_lock = threading.Lock()
+
+def get_position_classifier():
+    """获取共享的职位分类器实例（职位目录见 hr_offer_agent.POSITION_MAPPING）"""
+    global _position_classifier
+    with _position_classifier_lock:
+        if _position_classifier is None:
+            from .hr_offer_agent import POSITION_MAPPING
+            _position_classifier = PositionClassifier(POSITION_MAPPING)
+            # 进程退出时持久化新编码的文本向量
+            atexit.register(_position_classifier.save_cache)
+    return _position_classifier
+
+def classifier_enabled():
+    """是否使用向量分类器：已关闭、未安装依赖或本进程模型加载失败时为 False"""
+    if not POSITION_CLASSIFIER_ENABLED or not EMBEDDING_AVAILABLE:
+        return False
+    return _position_classifier is None or _position_classifier.available
+
+def save_position_cache():
+    """持久化共享分类器新编码的文本向量（批量任务结束后调用）"""
+    if _position_classifier is not None:
+        _position_classifier.save_cache()
+
+def classify_positions(profiles):
+    """批量推断职位，分类器不可用时全部返回 None
+
+    Args:
+        profiles (list): (技能列表, 项目列表) 元组列表
+
+    Returns:
+        list: 每个资料的分类结果 {position, english_position, score} 或 None
+    """
+    if not classifier_enabled():
+        return [None] * len(profiles)
+    try:
+        return get_position_classifier().classify_batch(profiles)
+    except Exception as e:
+        print(f"向量职位分类失败: {e}")
+        return [None] * len(profiles)
+
+def classify_position(skills, projects=()):
+    """用向量分类器推断单个候选人的职位，分类器不可用或相似度不足时返回 None"""
+    if not classifier_enabled():
+        return None
+    try:
+        return get_position_classifier().classify(skills, projects)
+    except Exception as e:
+        print(f"向量职位分类失败: {e}")
+        return None
+
+async def classify_positions_async(profiles):
+    """classify_positions() 的异步版本：模型加载和编码在线程中执行，不阻塞事件循环"""
+    if not classifier_enabled():
+        return [None] * len(profiles)
+    return await asyncio.to_thread(classify_positions, profiles)
+
+async def classify_position_async(skills, projects=()):
+    """classify_position() 的异步版本：模型加载和编码在线程中执行，不阻塞事件循环"""
+    if not classifier_enabled():
+        return None
+    return await asyncio.to_thread(classify_position, skills, projects)
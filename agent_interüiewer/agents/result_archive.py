@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+面试结果归档格式
+每份面试结果中重复的固定内容（各轮面试官、考察方向、总结、面试流程等）
+提取到按版本登记的模板中，与其他字段重复的值（如总分、评价总结）记为引用，
+文件只保存与模板不同的部分，紧凑 JSON 再用 gzip 压缩（interview_results_<时间>.json.gz）。
+读取时自动识别旧的 JSON 文件和归档文件
+"""
+
+import os
+import gzip
+import json
+from pathlib import Path
+
+from .storage_utils import atomic_write_bytes, atomic_write_json
+
+# 新保存的面试结果格式：json（缩进 JSON，默认，兼容读取结果文件的旧工具）或 archive（压缩归档）
+RESULTS_EXPORT_FORMAT = os.getenv("RESULTS_EXPORT_FORMAT", "json").strip().lower()
+
+RESULTS_FILE_PREFIX = "interview_results_"
+JSON_SUFFIX = ".json"
+ARCHIVE_SUFFIX = ".json.gz"
+ARCHIVE_FORMAT = "interview_results"
+
+class SchemaRef:
+    """模板中的引用：值与结果中另一字段相同（引用的字段本身不能在模板中）"""
+
+    def __init__(self, path):
+        self.path = path.split(".")
+
+# 归档模板（按版本登记，已有版本不能修改，变化时新增版本）
+RESULT_ARCHIVE_SCHEMAS = {
+    1: {
+        "interview_info": {
+            "total_score": SchemaRef("interview_scores.overall_score")
+        },
+        "interview_rounds": {
+            "technical_interview": {
+                "interviewer": "技术面试官",
+                "focus_areas": ["技术能力评估", "项目经验探讨", "问题解决能力测试", "技术发展趋势讨论"],
+                "status": "completed",
+                "score": SchemaRef("interview_scores.technical_score"),
+                "conversation": [],
+                "summary": "技术面试已完成，评估了候选人的技术能力、项目经验和问题解决能力"
+            },
+            "hr_interview": {
+                "interviewer": "HR面试官",
+                "focus_areas": ["个人背景了解", "职业规划评估", "团队协作能力", "企业文化匹配", "薪资期望沟通"],
+                "status": "completed",
+                "score": SchemaRef("interview_scores.hr_score"),
+                "conversation": [],
+                "summary": "HR面试已完成，了解了候选人的个人背景、职业规划和团队协作能力"
+            },
+            "boss_interview": {
+                "interviewer": "技术总监/CTO",
+                "focus_areas": ["综合能力评估", "技术战略匹配", "团队融入能力", "发展潜力评估", "最终录用决策"],
+                "status": "completed",
+                "score": SchemaRef("interview_scores.boss_score"),
+                "conversation": [],
+                "summary": "Boss面试已完成，基于前两轮面试结果进行综合评估和最终决策"
+            }
+        },
+        "interview_flow": {
+            "total_rounds": 3,
+            "interview_sequence": ["技术面试 → HR面试 → Boss面试"],
+            "boss_evaluation_basis": [
+                "基于技术面试的技术能力评估",
+                "基于HR面试的沟通协作能力评估",
+                "综合两轮面试的学习能力和发展潜力评估"
+            ]
+        },
+        "interview_summary": {
+            "total_rounds": 3,
+            "interview_duration": "约30-45分钟",
+            "overall_assessment": SchemaRef("interview_scores.evaluation_summary"),
+            "boss_final_evaluation": "基于前两轮面试结果，Boss进行了综合评估和最终决策",
+            "final_recommendation": SchemaRef("interview_scores.recommendation"),
+            "improvement_suggestions": SchemaRef("interview_scores.improvement_suggestions"),
+            "recommendations": ["等待面试结果通知", "可继续使用career_agent工具进行技能评估", "制定个人发展计划"]
+        }
+    }
+}
+RESULT_ARCHIVE_SCHEMA = max(RESULT_ARCHIVE_SCHEMAS)
+
+_MISSING = object()
+
+def _lookup(data, path):
+    """按路径取值，不存在时返回 _MISSING"""
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return _MISSING
+        data = data[key]
+    return data
+
+def _copy(value):
+    """复制模板中的值（只含 JSON 类型，比 copy.deepcopy 快得多）"""
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    return value
+
+def _strip(data, template, root, path, absent):
+    """去掉与模板相同的字段；模板中有而结果中没有的字段记入 absent"""
+    packed = {}
+    for key, value in data.items():
+        expected = template.get(key, _MISSING)
+        if isinstance(expected, SchemaRef):
+            expected = _lookup(root, expected.path)
+        if isinstance(expected, dict) and isinstance(value, dict):
+            nested = _strip(value, expected, root, path + [key], absent)
+            if nested:
+                packed[key] = nested
+        elif expected is _MISSING or value != expected:
+            packed[key] = value
+    absent.extend(path + [key] for key in template if key not in data)
+    return packed
+
+def _restore(packed, template, root):
+    """按模板补回被去掉的字段"""
+    for key, expected in template.items():
+        if key in packed:
+            if isinstance(expected, dict) and isinstance(packed[key], dict):
+                _restore(packed[key], expected, root)
+        elif isinstance(expected, SchemaRef):
+            value = _lookup(root, expected.path)
+            if value is not _MISSING:
+                packed[key] = _copy(value)
+        elif isinstance(expected, dict):
+            packed[key] = {}
+            _restore(packed[key], expected, root)
+        else:
+            packed[key] = _copy(expected)
+
+def pack_result(interview_results):
+    """面试结果 → 归档内容（gzip 压缩的紧凑 JSON，相同结果的字节完全相同）"""
+    absent = []
+    data = _strip(interview_results, RESULT_ARCHIVE_SCHEMAS[RESULT_ARCHIVE_SCHEMA], interview_results, [], absent)
+    archive = {"format": ARCHIVE_FORMAT, "schema": RESULT_ARCHIVE_SCHEMA, "data": data}
+    if absent:
+        archive["absent"] = absent
+    text = json.dumps(archive, ensure_ascii=False, separators=(",", ":"))
+    return gzip.compress(text.encode("utf-8"), compresslevel=6, mtime=0)
+
+def unpack_result(blob):
+    """归档内容 → 面试结果"""
+    archive = json.loads(gzip.decompress(blob))
+    if archive.get("format") != ARCHIVE_FORMAT or archive.get("schema") not in RESULT_ARCHIVE_SCHEMAS:
+        raise ValueError(f"不支持的面试结果归档: format={archive.get('format')} schema={archive.get('schema')}")
+    data = archive["data"]
+    _restore(data, RESULT_ARCHIVE_SCHEMAS[archive["schema"]], data)
+    for path in archive.get("absent", []):
+        parent = _lookup(data, path[:-1])
+        if isinstance(parent, dict):
+            parent.pop(path[-1], None)
+    return data
+
+def pack_transcript(contents):
+    """一轮对话的消息内容 → gzip 压缩的紧凑 JSON（相同内容的字节完全相同，用作内容寻址的 blob）"""
+    text = json.dumps(contents, ensure_ascii=False, separators=(",", ":"))
+    return gzip.compress(text.encode("utf-8"), compresslevel=6, mtime=0)
+
+def unpack_transcript(blob):
+    """blob → 一轮对话的消息内容列表"""
+    return json.loads(gzip.decompress(blob))
+
+def is_archive(path):
+    """是否为归档格式的结果文件"""
+    return str(path).endswith(ARCHIVE_SUFFIX)
+
+def result_stamp(path):
+    """结果文件名中的时间戳：interview_results_<时间>.json(.gz) → <时间>"""
+    name = Path(path).name
+    suffix = ARCHIVE_SUFFIX if is_archive(name) else JSON_SUFFIX
+    return name[len(RESULTS_FILE_PREFIX):-len(suffix)]
+
+def result_path_for(folder, stamp, export_format=None):
+    """新结果文件的路径"""
+    export_format = export_format or RESULTS_EXPORT_FORMAT
+    suffix = JSON_SUFFIX if export_format == "json" else ARCHIVE_SUFFIX
+    return str(Path(folder) / f"{RESULTS_FILE_PREFIX}{stamp}{suffix}")
+
+def find_result_files(base_dir, pattern="*"):
+    """base_dir 下匹配 pattern（子目录）的结果文件，两种格式都有时只取归档（按路径排序）"""
+    found = {}
+    for suffix in (JSON_SUFFIX, ARCHIVE_SUFFIX):
+        for path in Path(base_dir).glob(f"{pattern}/{RESULTS_FILE_PREFIX}*{suffix}"):
+            found[(path.parent, result_stamp(path))] = path
+    return sorted(found.values())
+
+def load_result_file(path):
+    """读取结果文件（自动识别 JSON 和归档格式）"""
+    if is_archive(path):
+        with open(path, "rb") as f:
+            return unpack_result(f.read())
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def write_result_file(path, interview_results):
+    """原子写入结果文件（按扩展名选择格式）"""
+    if is_archive(path):
+        atomic_write_bytes(path, pack_result(interview_results))
+    else:
+        atomic_write_json(path, interview_results)
+
+def migrate_results(base_dir="data/interview_results", keep_json=False):
+    """将 base_dir 下的 JSON 结果转换为归档格式
+
+    每个文件写入归档后先读回校验与原文件一致，再删除原文件（keep_json 为 True 时保留），
+    面试结果存储中的文件路径随之更新。
+
+    Returns:
+        dict: 统计信息（files、migrated、failed、json_bytes、archive_bytes）
+    """
+    from .results_store import get_results_store
+
+    paths = [p for p in find_result_files(base_dir, "**") if not is_archive(p)]
+    stats = {"files": len(paths), "migrated": 0, "failed": 0, "json_bytes": 0, "archive_bytes": 0}
+    moved = []
+    for path in paths:
+        try:
+            interview_results = load_result_file(path)
+            archive_path = path.with_name(f"{RESULTS_FILE_PREFIX}{result_stamp(path)}{ARCHIVE_SUFFIX}")
+            write_result_file(archive_path, interview_results)
+            if load_result_file(archive_path) != interview_results:
+                os.unlink(archive_path)
+                raise ValueError("归档校验不一致")
+        except (OSError, ValueError, EOFError) as e:
+            stats["failed"] += 1
+            print(f"❌ 转换 {path} 失败: {e}")
+            continue
+        stats["migrated"] += 1
+        stats["json_bytes"] += path.stat().st_size
+        stats["archive_bytes"] += archive_path.stat().st_size
+        if not keep_json:
+            path.unlink()
+            moved.append((str(path), str(archive_path)))
+
+    if moved:
+        get_results_store().relocate(moved)
+    ratio = stats["json_bytes"] / stats["archive_bytes"] if stats["archive_bytes"] else 0
+    print(f"✅ 面试结果转换完成：{stats['migrated']}/{stats['files']}个文件，失败{stats['failed']}个，"
+          f"{stats['json_bytes']}字节 → {stats['archive_bytes']}字节（{ratio:.1f}倍）")
+    return stats
@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+"""
+面试结果存储
+面试结果保存在 SQLite（DATABASE_URL）中：运行记录、评分明细、候选人资料、技能标签和 offer 分表存放并建立索引，
+对话记录单独存放在 transcripts 表；每次保存在一个事务中完成。
+offer 通知信和每轮对话的消息内容保存在内容寻址存储（data/blobs）中，表里只记录哈希
+按候选人保存的结果文件（60plus/<姓名>/、below60/<姓名>/，JSON 或压缩归档）作为可选导出保留
+"""
+
+import os
+import json
+import time
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from .blob_store import blob_digest, get_blob_store
+from .result_archive import (
+    find_result_files,
+    load_result_file,
+    pack_result,
+    pack_transcript,
+    result_stamp,
+    unpack_result,
+    unpack_transcript
+)
+from .skill_taxonomy import match_labels
+
+# 存储配置（从环境变量读取）
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./career_agent.db")
+# 是否同时导出结果文件（off 时面试结果只保存在数据库中）
+RESULTS_JSON_EXPORT = os.getenv("RESULTS_JSON_EXPORT", "on").strip().lower() != "off"
+INTERVIEW_RESULTS_DIR = "data/interview_results"
+
+# 表结构版本
+RESULTS_SCHEMA_VERSION = 1
+
+# 分数段（与结果目录名一致）
+SCORE_BANDS = ("60plus", "below60")
+
+# 重建索引时每个事务写入的结果数
+REBUILD_BATCH_SIZE = 500
+
+RESULTS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS interview_results (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        interview_id TEXT,
+        candidate_name TEXT,
+        position TEXT,
+        total_score REAL,
+        score_band TEXT,
+        interview_date TEXT,
+        results_path TEXT UNIQUE,
+        offer_path TEXT,
+        payload BLOB NOT NULL,
+        indexed_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_results_date ON interview_results (interview_date, id);
+    CREATE INDEX IF NOT EXISTS idx_results_candidate ON interview_results (candidate_name, interview_date);
+    CREATE INDEX IF NOT EXISTS idx_results_band ON interview_results (score_band, interview_date);
+    CREATE INDEX IF NOT EXISTS idx_results_position ON interview_results (position, interview_date);
+    CREATE INDEX IF NOT EXISTS idx_results_score ON interview_results (total_score);
+    CREATE INDEX IF NOT EXISTS idx_results_interview_id ON interview_results (interview_id);
+
+    CREATE TABLE IF NOT EXISTS score_details (
+        result_id INTEGER PRIMARY KEY,
+        technical_score REAL,
+        hr_score REAL,
+        boss_score REAL,
+        overall_score REAL,
+        recommendation TEXT,
+        evaluation_summary TEXT,
+        improvement_suggestions TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS candidate_profiles (
+        result_id INTEGER PRIMARY KEY,
+        name TEXT,
+        age TEXT,
+        education TEXT,
+        experience_years TEXT,
+        current_position TEXT,
+        target_position TEXT,
+        career_goals TEXT,
+        salary_expectation TEXT,
+        technical_skills TEXT,
+        key_projects TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS skill_tags (
+        result_id INTEGER NOT NULL,
+        tag TEXT NOT NULL,
+        PRIMARY KEY (result_id, tag)
+    );
+    CREATE INDEX IF NOT EXISTS idx_skill_tags_tag ON skill_tags (tag, result_id);
+
+    CREATE TABLE IF NOT EXISTS offers (
+        result_id INTEGER PRIMARY KEY,
+        refined_position TEXT,
+        offer_path TEXT,
+        created_at TEXT,
+        letter_blob TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS transcripts (
+        result_id INTEGER NOT NULL,
+        round TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        role TEXT,
+        content TEXT,
+        timestamp TEXT,
+        name TEXT,
+        latency_ms INTEGER,
+        PRIMARY KEY (result_id, round, seq)
+    );
+
+    CREATE TABLE IF NOT EXISTS transcript_blobs (
+        result_id INTEGER NOT NULL,
+        round TEXT NOT NULL,
+        digest TEXT NOT NULL,
+        PRIMARY KEY (result_id, round)
+    );
+    CREATE INDEX IF NOT EXISTS idx_transcript_blobs_digest ON transcript_blobs (digest);
+
+    CREATE TABLE IF NOT EXISTS store_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+"""
+
+# store_meta 中记录已导入结果目录的键（值为导入时间）
+HISTORY_IMPORTED_KEY = "history_imported"
+
+# 与 interview_results 关联的子表
+CHILD_TABLES = ("score_details", "candidate_profiles", "skill_tags", "offers", "transcripts", "transcript_blobs")
+
+def database_path(url=DATABASE_URL):
+    """从 DATABASE_URL 解析 SQLite 文件路径（sqlite:///相对路径 或 sqlite:////绝对路径）"""
+    if not url.startswith("sqlite:///"):
+        print(f"⚠️ 面试结果存储只支持 SQLite，DATABASE_URL={url} 无效，使用 ./career_agent.db")
+        return "career_agent.db"
+    return url[len("sqlite:///"):] or "career_agent.db"
+
+def score_band(score):
+    """分数段：60分及以上为 60plus，否则为 below60"""
+    return "60plus" if (score or 0) >= 60 else "below60"
+
+def skill_tags(candidate_profile):
+    """候选人的技能标签：技能分类体系中匹配到的技能类别（如 ai_ml）和技能信号（如 llm）"""
+    tags = set()
+    texts = list(candidate_profile.get("technical_skills") or [])
+    for project in candidate_profile.get("key_projects") or []:
+        texts.append(json.dumps(project, ensure_ascii=False) if isinstance(project, dict) else project)
+    for text in texts:
+        for kind, name in match_labels(str(text)):
+            if kind != "project":
+                tags.add(name)
+    return sorted(tags)
+
+def month_range(day=None):
+    """某天所在月份的 (起始日期, 截止日期)，默认本月"""
+    start = (day or datetime.now()).replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+class ResultsStore:
+    """面试结果存储
+
+    interview_results 表每次面试一行（payload 为去掉对话记录的结果，压缩归档格式），
+    评分、资料、技能标签、offer 和对话记录分表存放，按 result_id 关联。
+    """
+
+    def __init__(self, path=None, blobs=None):
+        self.path = path or database_path()
+        self.blobs = blobs or get_blob_store()
+        self._conn = None
+
+    def _connect(self):
+        """打开数据库连接并建表（首次调用时）"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(RESULTS_SCHEMA)
+            self._conn.execute(f"PRAGMA user_version = {RESULTS_SCHEMA_VERSION}")
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _split_result(interview_results):
+        """拆分面试结果：去掉对话记录的 payload 和 [(轮次, 序号, 消息)]"""
+        payload = dict(interview_results)
+        rounds = {}
+        messages = []
+        for name, round_data in (interview_results.get("interview_rounds") or {}).items():
+            round_data = dict(round_data)
+            for seq, message in enumerate(round_data.pop("conversation", None) or []):
+                messages.append((name, seq, message))
+            rounds[name] = round_data
+        payload["interview_rounds"] = rounds
+        return payload, messages
+
+    def _insert(self, conn, interview_results, results_path=None):
+        """在当前事务中写入一次面试结果的所有表，返回 result_id"""
+        info = interview_results.get("interview_info", {})
+        scores = interview_results.get("interview_scores", {})
+        profile = interview_results.get("candidate_profile", {}) or {}
+        total_score = info.get("total_score", scores.get("overall_score"))
+        payload, messages = self._split_result(interview_results)
+
+        row = {
+            "interview_id": info.get("interview_id"),
+            "candidate_name": info.get("candidate_name"),
+            "position": info.get("position"),
+            "total_score": total_score,
+            "score_band": score_band(total_score),
+            "interview_date": info.get("interview_date"),
+            "results_path": str(results_path) if results_path else None,
+            "payload": pack_result(payload),
+            "indexed_at": time.time()
+        }
+        existing = None
+        if results_path:
+            existing = conn.execute("SELECT id FROM interview_results WHERE results_path = ?", (row["results_path"],)).fetchone()
+        if existing:
+            result_id = existing[0]
+            conn.execute("""
+                UPDATE interview_results SET interview_id = :interview_id, candidate_name = :candidate_name,
+                    position = :position, total_score = :total_score, score_band = :score_band,
+                    interview_date = :interview_date, payload = :payload, indexed_at = :indexed_at
+                WHERE id = :id
+            """, {**row, "id": result_id})
+            for table in ("score_details", "candidate_profiles", "skill_tags", "transcripts", "transcript_blobs"):
+                conn.execute(f"DELETE FROM {table} WHERE result_id = ?", (result_id,))
+        else:
+            result_id = conn.execute("""
+                INSERT INTO interview_results
+                    (interview_id, candidate_name, position, total_score, score_band, interview_date, results_path, payload, indexed_at)
+                VALUES (:interview_id, :candidate_name, :position, :total_score, :score_band, :interview_date, :results_path, :payload, :indexed_at)
+            """, row).lastrowid
+
+        conn.execute("INSERT INTO score_details VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (
+            result_id,
+            scores.get("technical_score"),
+            scores.get("hr_score"),
+            scores.get("boss_score"),
+            scores.get("overall_score"),
+            scores.get("recommendation"),
+            scores.get("evaluation_summary"),
+            json.dumps(scores.get("improvement_suggestions", []), ensure_ascii=False)
+        ))
+        conn.execute("INSERT INTO candidate_profiles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+            result_id,
+            *(str(profile.get(key)) if profile.get(key) is not None else None
+              for key in ("name", "age", "education", "experience_years", "current_position",
+                          "target_position", "career_goals", "salary_expectation")),
+            json.dumps(profile.get("technical_skills", []), ensure_ascii=False),
+            json.dumps(profile.get("key_projects", []), ensure_ascii=False)
+        ))
+        conn.executemany("INSERT INTO skill_tags VALUES (?, ?)", [(result_id, tag) for tag in skill_tags(profile)])
+        # 每轮的消息内容按内容寻址保存（相同的对话只存一份），表里保留角色、时间等运行信息
+        contents = {}
+        for name, seq, message in messages:
+            contents.setdefault(name, []).append(message.get("content"))
+        conn.executemany("INSERT INTO transcript_blobs VALUES (?, ?, ?)", [
+            (result_id, name, self.blobs.put(pack_transcript(round_contents)))
+            for name, round_contents in contents.items()
+        ])
+        conn.executemany("INSERT INTO transcripts VALUES (?, ?, ?, ?, NULL, ?, ?, ?)", [
+            (result_id, name, seq, message.get("role"), message.get("timestamp"), message.get("name"), message.get("latency_ms"))
+            for name, seq, message in messages
+        ])
+        return result_id
+
+    def save_result(self, interview_results, results_path=None):
+        """保存一次面试结果（单个事务），返回 result_id
+
+        Args:
+            interview_results (dict): 面试结果（与导出的 JSON 结构相同）
+            results_path (str): 导出的 JSON 文件路径，未导出时为 None
+        """
+        conn = self._connect()
+        with conn:
+            return self._insert(conn, interview_results, results_path)
+
+    def save_results(self, items):
+        """批量保存 [(面试结果, JSON文件路径)]（单个事务），返回 result_id 列表"""
+        conn = self._connect()
+        with conn:
+            return [self._insert(conn, interview_results, results_path) for interview_results, results_path in items]
+
+    def record_result(self, results_path, interview_results):
+        """记录（或更新）一个已导出的面试结果文件，返回 result_id"""
+        return self.save_result(interview_results, results_path)
+
+    def record_offer(self, result_id, offer_path=None, letter=None, refined_position=None):
+        """记录面试结果对应的 offer（通知信保存在内容寻址存储中）"""
+        letter_blob = self.blobs.put_text(letter) if letter is not None else None
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO offers VALUES (?, ?, ?, ?, ?)", (
+                result_id, refined_position, str(offer_path) if offer_path else None,
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S"), letter_blob
+            ))
+            conn.execute("UPDATE interview_results SET offer_path = ? WHERE id = ?",
+                         (str(offer_path) if offer_path else None, result_id))
+
+    def update_offer_letters(self, letters):
+        """重新生成 offer 后更新通知信记录，letters 为 [(结果文件, offer文件, 通知信哈希, 职位)]，按结果文件匹配
+
+        Returns:
+            int: 更新的记录数
+        """
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        updated = 0
+        conn = self._connect()
+        with conn:
+            for results_path, offer_path, digest, refined_position in letters:
+                row = conn.execute("SELECT id FROM interview_results WHERE results_path = ?", (str(results_path),)).fetchone()
+                if row is None:
+                    continue
+                conn.execute("""
+                    INSERT INTO offers (result_id, refined_position, offer_path, created_at, letter_blob) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (result_id) DO UPDATE SET
+                        refined_position = excluded.refined_position, offer_path = excluded.offer_path,
+                        created_at = excluded.created_at, letter_blob = excluded.letter_blob
+                """, (row[0], refined_position, str(offer_path), created_at, digest))
+                conn.execute("UPDATE interview_results SET offer_path = ? WHERE id = ?", (str(offer_path), row[0]))
+                updated += 1
+        return updated
+
+    def offer_letter(self, result_id):
+        """某次面试的 offer 通知信，没有时返回 None"""
+        row = self._connect().execute(
+            "SELECT letter_blob, offer_path FROM offers WHERE result_id = ?", (result_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row["letter_blob"]:
+            return self.blobs.get_text(row["letter_blob"])
+        try:
+            with open(row["offer_path"], "r", encoding="utf-8") as f:
+                return f.read()
+        except (TypeError, OSError):
+            return None
+
+    def referenced_blobs(self):
+        """仍被引用的 blob 哈希（offer 通知信和对话内容）"""
+        return {row[0] for row in self._connect().execute(
+            "SELECT letter_blob FROM offers WHERE letter_blob IS NOT NULL UNION SELECT digest FROM transcript_blobs"
+        )}
+
+    def refresh_offer_blobs(self, dry_run=False):
+        """按 offer 文件的当前内容重新计算通知信哈希，返回这些哈希
+
+        offer 文件是复制而不是硬链接时（如重建索引、跨设备保存），blob 只靠数据库引用保护；
+        文件内容与记录不一致时写入 blob 并更新记录（dry_run 时只计算哈希）。
+        """
+        conn = self._connect()
+        digests, updated = set(), []
+        for row in conn.execute("SELECT result_id, offer_path, letter_blob FROM offers WHERE offer_path IS NOT NULL").fetchall():
+            try:
+                text = Path(row["offer_path"]).read_text(encoding="utf-8")
+            except OSError:
+                continue
+            digest = blob_digest(text.encode("utf-8")) if dry_run else self.blobs.put_text(text)
+            digests.add(digest)
+            if digest != row["letter_blob"]:
+                updated.append((digest, row["result_id"]))
+        if updated and not dry_run:
+            with conn:
+                conn.executemany("UPDATE offers SET letter_blob = ? WHERE result_id = ?", updated)
+        return digests
+
+    def gc_blobs(self, grace=None, dry_run=False):
+        """删除内容寻址存储中不再被引用的 blob，返回统计信息
+
+        先导入还没有导入过的结果目录，并按 offer 文件内容刷新通知信引用，再清理。
+        """
+        self.ensure_indexed()
+        referenced = self.refresh_offer_blobs(dry_run) | self.referenced_blobs()
+        kwargs = {} if grace is None else {"grace": grace}
+        stats = self.blobs.gc(referenced, dry_run=dry_run, **kwargs)
+        action = "可删除" if dry_run else "已删除"
+        print(f"✅ blob 清理完成：共{stats['blobs']}个，{action}{stats['removed']}个（{stats['freed_bytes']}字节）")
+        return stats
+
+    def _round_contents(self, result_id, round_name=None):
+        """从内容寻址存储读取各轮的消息内容 {轮次: [内容]}"""
+        sql = "SELECT round, digest FROM transcript_blobs WHERE result_id = ?"
+        params = [result_id]
+        if round_name:
+            sql += " AND round = ?"
+            params.append(round_name)
+        return {name: unpack_transcript(self.blobs.get(digest)) for name, digest in self._connect().execute(sql, params)}
+
+    def relocate(self, moved):
+        """结果文件改名或转换格式后更新路径，moved 为 [(原路径, 新路径)]"""
+        with self._connect() as conn:
+            conn.executemany("UPDATE interview_results SET results_path = ? WHERE results_path = ?",
+                             [(str(new), str(old)) for old, new in moved])
+
+    def remove(self, result_id):
+        """删除一次面试结果及其关联记录"""
+        conn = self._connect()
+        with conn:
+            for table in CHILD_TABLES:
+                conn.execute(f"DELETE FROM {table} WHERE result_id = ?", (result_id,))
+            conn.execute("DELETE FROM interview_results WHERE id = ?", (result_id,))
+
+    def get_meta(self, key):
+        """读取存储元数据，没有时返回 None"""
+        row = self._connect().execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        """写入存储元数据"""
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO store_meta VALUES (?, ?)", (key, str(value)))
+
+    def count(self):
+        """已保存的面试结果数"""
+        return self._connect().execute("SELECT COUNT(*) FROM interview_results").fetchone()[0]
+
+    def latest(self, score_band=None):
+        """最新的面试结果记录（按面试时间），没有时返回 None"""
+        rows = self.query(score_band=score_band, limit=1)
+        return rows[0] if rows else None
+
+    def query(self, candidate=None, score_band=None, position=None, date_from=None, date_to=None,
+              min_score=None, max_score=None, tags=None, limit=100):
+        """按条件查询面试结果（按面试时间倒序）
+
+        Args:
+            candidate (str): 候选人姓名
+            score_band (str): 分数段（60plus / below60）
+            position (str): 应聘职位
+            date_from (str): 起始日期（含），如 2025-01-01
+            date_to (str): 截止日期（含），如 2025-01-31
+            min_score (float): 最低总分
+            max_score (float): 最高总分
+            tags (list): 技能标签（技能类别如 ai_ml，或技能信号如 llm），需全部匹配
+            limit (int): 最多返回条数，None 表示不限
+
+        Returns:
+            list: 面试结果记录（dict，含评分明细，不含 payload）
+        """
+        conditions, params = [], []
+        for column, value in (("r.candidate_name", candidate), ("r.score_band", score_band), ("r.position", position)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if date_from:
+            conditions.append("r.interview_date >= ?")
+            params.append(date_from)
+        if date_to:
+            # 只有日期时包含当天全部记录
+            conditions.append("r.interview_date <= ?")
+            params.append(date_to if len(date_to) > 10 else f"{date_to} 23:59:59")
+        if min_score is not None:
+            conditions.append("r.total_score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            conditions.append("r.total_score <= ?")
+            params.append(max_score)
+        for tag in tags or []:
+            conditions.append("r.id IN (SELECT result_id FROM skill_tags WHERE tag = ?)")
+            params.append(tag)
+
+        sql = """
+            SELECT r.id, r.interview_id, r.candidate_name, r.position, r.total_score, r.score_band,
+                   r.interview_date, r.results_path, r.offer_path,
+                   s.technical_score, s.hr_score, s.boss_score, s.recommendation
+            FROM interview_results r LEFT JOIN score_details s ON s.result_id = r.id
+        """
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY r.interview_date DESC, r.id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self._connect().execute(sql, params)]
+
+    def load_result(self, result_id):
+        """从数据库还原面试结果（与导出的 JSON 结构相同），不存在时返回 None"""
+        conn = self._connect()
+        row = conn.execute("SELECT payload FROM interview_results WHERE id = ?", (result_id,)).fetchone()
+        if row is None:
+            return None
+        result = unpack_result(row[0])
+        rounds = result.get("interview_rounds", {})
+        for round_data in rounds.values():
+            round_data["conversation"] = []
+        contents = self._round_contents(result_id)
+        for row in conn.execute(
+            "SELECT round, seq, role, name, content, timestamp, latency_ms FROM transcripts WHERE result_id = ? ORDER BY round, seq",
+            (result_id,)
+        ):
+            message = {key: row[key] for key in ("role", "name", "content", "timestamp", "latency_ms")}
+            if row["round"] in contents:
+                message["content"] = contents[row["round"]][row["seq"]]
+            if message["name"] is None and message["latency_ms"] is None:
+                # 对话日志之前保存的结果没有这两项
+                del message["name"], message["latency_ms"]
+            rounds.setdefault(row["round"], {"conversation": []})["conversation"].append(message)
+        return result
+
+    def transcript(self, result_id, round_name=None):
+        """某次面试的对话记录 [{round, role, name, content, timestamp, latency_ms}]"""
+        sql = "SELECT round, seq, role, name, content, timestamp, latency_ms FROM transcripts WHERE result_id = ?"
+        params = [result_id]
+        if round_name:
+            sql += " AND round = ?"
+            params.append(round_name)
+        contents = self._round_contents(result_id, round_name)
+        messages = []
+        for row in self._connect().execute(sql + " ORDER BY round, seq", params):
+            message = dict(row)
+            if message["round"] in contents:
+                message["content"] = contents[message["round"]][message.pop("seq")]
+            else:
+                message.pop("seq")
+            messages.append(message)
+        return messages
+
+    def _index_offer_file(self, conn, result_id, offer):
+        """在当前事务中记录结果目录中的 offer 文件，通知信按文件内容重新计算哈希（已有的职位和生成时间保留）"""
+        letter_blob = self.blobs.put_text(offer.read_text(encoding="utf-8"))
+        created_at = datetime.fromtimestamp(offer.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+        conn.execute("""
+            INSERT INTO offers (result_id, offer_path, created_at, letter_blob) VALUES (?, ?, ?, ?)
+            ON CONFLICT (result_id) DO UPDATE SET
+                offer_path = excluded.offer_path, letter_blob = excluded.letter_blob,
+                created_at = COALESCE(offers.created_at, excluded.created_at)
+        """, (result_id, str(offer), created_at, letter_blob))
+        conn.execute("UPDATE interview_results SET offer_path = ? WHERE id = ?", (str(offer), result_id))
+
+    def rebuild(self, base_dir=INTERVIEW_RESULTS_DIR):
+        """扫描结果目录重新导入已导出的结果文件，返回导入的文件数
+
+        按结果文件路径更新已有记录（result_id 不变，offer 记录保留），
+        结果文件已不存在的记录删除，只保存在数据库中的结果保留。
+        """
+        base_dir = Path(base_dir)
+        files = [p for band in SCORE_BANDS for p in find_result_files(base_dir / band)]
+        conn = self._connect()
+
+        indexed = 0
+        for start in range(0, len(files), REBUILD_BATCH_SIZE):
+            items = []
+            for path in files[start:start + REBUILD_BATCH_SIZE]:
+                try:
+                    items.append((load_result_file(path), path))
+                except (OSError, ValueError, EOFError) as e:
+                    print(f"⚠️ 跳过无法读取的结果文件 {path}: {e}")
+            with conn:
+                for interview_results, path in items:
+                    result_id = self._insert(conn, interview_results, path)
+                    offer = path.parent / f"offer_letter_{result_stamp(path)}.txt"
+                    if offer.exists():
+                        self._index_offer_file(conn, result_id, offer)
+            indexed += len(items)
+
+        # 结果文件已删除的记录
+        found = {str(path) for path in files}
+        stale = [(row[0],) for row in conn.execute("SELECT id, results_path FROM interview_results WHERE results_path IS NOT NULL")
+                 if row[1] not in found]
+        with conn:
+            for table in CHILD_TABLES:
+                conn.executemany(f"DELETE FROM {table} WHERE result_id = ?", stale)
+            conn.executemany("DELETE FROM interview_results WHERE id = ?", stale)
+
+        self.set_meta(HISTORY_IMPORTED_KEY, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        print(f"✅ 面试结果已重新导入：{indexed}个结果文件")
+        return indexed
+
+    def ensure_indexed(self, base_dir=INTERVIEW_RESULTS_DIR):
+        """结果目录还没有导入过时导入之前保存的结果文件（之前已保存过新面试时也会导入）"""
+        if self.get_meta(HISTORY_IMPORTED_KEY) is not None:
+            return
+        if Path(base_dir).exists():
+            self.rebuild(base_dir)
+        else:
+            self.set_meta(HISTORY_IMPORTED_KEY, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+    def close(self):
+        """关闭数据库连接"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+# 进程内共享的存储实例
+_results_store = None
+
+def get_results_store():
+    """获取共享的面试结果存储实例"""
+    global _results_store
+    if _results_store is None:
+        _results_store = ResultsStore()
+    return _results_store
+
+def load_indexed_result(record):
+    """读取面试结果：优先读取导出的 JSON 文件，未导出或文件已删除时从数据库还原"""
+    if record.get("results_path"):
+        try:
+            return load_result_file(record["results_path"])
+        except FileNotFoundError:
+            pass
+    return get_results_store().load_result(record["id"])
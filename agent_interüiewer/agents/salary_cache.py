@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+市场薪资数据缓存
+SQLite 持久化缓存，支持 TTL、过期数据先返回再后台刷新，以及相同查询共享一次上游请求
+"""
+
+import os
+import json
+import time
+import sqlite3
+import asyncio
+
+# 缓存配置（从环境变量读取）
+SALARY_CACHE_PATH = os.getenv("SALARY_CACHE_PATH", "data/salary_cache.db")
+SALARY_CACHE_TTL = float(os.getenv("SALARY_CACHE_TTL", "86400"))             # 新鲜期（秒）
+SALARY_CACHE_STALE_TTL = float(os.getenv("SALARY_CACHE_STALE_TTL", "604800"))  # 过期后仍可返回的时长（秒）
+
+class SalaryCache:
+    """市场薪资数据缓存
+
+    - 新鲜期内直接返回缓存
+    - 过期但在可用期内：立即返回旧数据，同时在后台刷新
+    - 未命中：同一 (职位, 地点) 的并发请求共享一次上游请求
+    """
+
+    def __init__(self, path=SALARY_CACHE_PATH, ttl=SALARY_CACHE_TTL, stale_ttl=SALARY_CACHE_STALE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "upstream_calls": 0}
+        self._conn = None
+        self._inflight = {}             # 进行中的上游请求
+        self._refresh_tasks = set()     # 后台刷新任务（保持引用）
+
+    def _connect(self):
+        """打开数据库连接并建表（首次调用时）"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS salary_cache (
+                    position TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (position, location)
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def make_key(position, location):
+        """缓存键：忽略大小写和首尾空白"""
+        return (position.strip().lower(), location.strip().lower())
+
+    def get_entry(self, position, location):
+        """读取缓存条目
+
+        Returns:
+            tuple: (薪资数据, 缓存时长秒数)，不存在时返回 None
+        """
+        row = self._connect().execute(
+            "SELECT data, fetched_at FROM salary_cache WHERE position = ? AND location = ?",
+            self.make_key(position, location)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), time.time() - row[1]
+
+    def put(self, position, location, data):
+        """写入缓存条目"""
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO salary_cache (position, location, data, fetched_at) VALUES (?, ?, ?, ?)",
+            (*self.make_key(position, location), json.dumps(data, ensure_ascii=False), time.time())
+        )
+        conn.commit()
+
+    async def get_or_fetch(self, position, location, fetcher):
+        """读取缓存，必要时通过 fetcher(position, location) 请求上游
+
+        Args:
+            position (str): 英文职位名称
+            location (str): 地点
+            fetcher: 上游请求协程函数，返回薪资数据或 None
+        """
+        entry = self.get_entry(position, location)
+        if entry is not None:
+            data, age = entry
+            if age < self.ttl:
+                self.stats["hits"] += 1
+                return data
+            if age < self.ttl + self.stale_ttl:
+                self.stats["stale_hits"] += 1
+                self._refresh_in_background(position, location, fetcher)
+                return data
+
+        self.stats["misses"] += 1
+        return await asyncio.shield(self._fetch_shared(position, location, fetcher))
+
+    async def refresh(self, position, location, fetcher):
+        """强制请求上游并更新缓存"""
+        return await asyncio.shield(self._fetch_shared(position, location, fetcher))
+
+    def _fetch_shared(self, position, location, fetcher):
+        """同一缓存键的并发请求共享一个上游请求任务"""
+        key = self.make_key(position, location)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_store(position, location, fetcher))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _fetch_and_store(self, position, location, fetcher):
+        """请求上游，成功时写入缓存（失败结果不缓存）"""
+        self.stats["upstream_calls"] += 1
+        data = await fetcher(position, location)
+        if data:
+            self.put(position, location, data)
+        return data
+
+    def _refresh_in_background(self, position, location, fetcher):
+        """后台刷新过期条目"""
+        if self.make_key(position, location) in self._inflight:
+            return
+        task = self._fetch_shared(position, location, fetcher)
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._on_refresh_done)
+
+    def _on_refresh_done(self, task):
+        """后台刷新结束，记录失败原因"""
+        self._refresh_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"后台刷新薪资缓存失败: {task.exception()}")
+
+    def close(self):
+        """关闭数据库连接"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+# 进程内共享的缓存实例
+_salary_cache = None
+
+def get_salary_cache():
+    """获取共享的薪资缓存实例"""
+    global _salary_cache
+    if _salary_cache is None:
+        _salary_cache = SalaryCache()
+    return _salary_cache
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+离线薪资快照
+将 Adzuna 原始结果页批量导入本地列式存储（内存映射的 NumPy 数组），按规范化的职位和地点建立索引，
+无网络环境下也能即时、确定地查询市场薪资数据
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from .salary_stats import compute_salary_statistics
+
+# 快照配置（从环境变量读取）
+SALARY_SNAPSHOT_DIR = os.getenv("SALARY_SNAPSHOT_DIR", "data/salary_snapshot")
+# 薪资数据来源：online（缓存 + Adzuna API，失败时使用快照）或 offline（只使用快照，不访问网络）
+SALARY_SOURCE = os.getenv("SALARY_SOURCE", "online").strip().lower()
+
+SNAPSHOT_VERSION = 1
+
+# 快照中的列（文件名 → dtype）
+SNAPSHOT_COLUMNS = {
+    "salaries": np.float64,
+    "title_ids": np.int32,
+    "location_ids": np.int32,
+    "job_ids": np.int64,
+    "group_keys": np.int64,
+    "group_offsets": np.int64
+}
+
+def normalize_key(text):
+    """规范化职位或地点：忽略大小写和多余空白"""
+    return " ".join(str(text).lower().split())
+
+def job_id_hash(job_id):
+    """职位ID转换为64位整数，用于去重"""
+    text = str(job_id)
+    if text.isdigit() and int(text) < 2 ** 63:
+        return int(text)
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little") >> 1
+
+def iter_dump_pages(paths):
+    """逐页读取 Adzuna 原始结果（.json 文件、.jsonl 文件或包含它们的目录）"""
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            files = sorted(p for p in path.rglob("*") if p.suffix in (".json", ".jsonl"))
+        else:
+            files = [path]
+
+        for file in files:
+            with open(file, "r", encoding="utf-8") as f:
+                if file.suffix == ".jsonl":
+                    for line in f:
+                        if line.strip():
+                            yield json.loads(line)
+                else:
+                    data = json.load(f)
+                    yield from (data if isinstance(data, list) else [data])
+
+class SalarySnapshot:
+    """只读的离线薪资快照
+
+    同一 (职位, 地点) 的样本在数组中连续存放并按薪资排序，
+    查询只需一次二分查找和一次切片，数组以内存映射方式打开。
+    """
+
+    def __init__(self, path=SALARY_SNAPSHOT_DIR):
+        self.path = Path(path)
+        self.vocab = None
+        self.columns = {}
+        self._title_index = {}
+        self._location_index = {}
+        self._results = {}
+
+    @property
+    def exists(self):
+        """快照是否已导入"""
+        return (self.path / "vocab.json").exists()
+
+    def _load(self):
+        """首次查询时打开快照，返回是否可用"""
+        if self.vocab is not None:
+            return True
+        if not self.exists:
+            return False
+
+        with open(self.path / "vocab.json", "r", encoding="utf-8") as f:
+            vocab = json.load(f)
+        if vocab.get("version") != SNAPSHOT_VERSION:
+            print(f"⚠️ 薪资快照版本不兼容（{vocab.get('version')}），请重新导入")
+            return False
+
+        self.columns = {name: np.load(self.path / f"{name}.npy", mmap_mode="r") for name in SNAPSHOT_COLUMNS}
+        self._title_index = {title: i for i, title in enumerate(vocab["titles"])}
+        self._location_index = {location: i for i, location in enumerate(vocab["locations"])}
+        self.vocab = vocab
+        return True
+
+    def reload(self):
+        """重新打开快照（导入新数据后调用）"""
+        self.vocab = None
+        self.columns = {}
+        self._results = {}
+
+    def load_samples(self):
+        """将全部样本读入内存（导入时与新数据合并）"""
+        if not self._load():
+            return None
+        return (
+            list(self.vocab["titles"]),
+            list(self.vocab["locations"]),
+            {name: np.array(self.columns[name]) for name in ("salaries", "title_ids", "location_ids", "job_ids")}
+        )
+
+    def lookup(self, position, location):
+        """查询职位和地点的市场薪资数据，快照中没有时返回 None"""
+        key = (normalize_key(position), normalize_key(location))
+        if key in self._results:
+            return self._results[key]
+        if not self._load():
+            return None
+
+        title_id = self._title_index.get(key[0])
+        location_id = self._location_index.get(key[1])
+        result = None
+        if title_id is not None and location_id is not None:
+            group_key = title_id * len(self.vocab["locations"]) + location_id
+            group_keys = self.columns["group_keys"]
+            index = int(np.searchsorted(group_keys, group_key))
+            if index < len(group_keys) and group_keys[index] == group_key:
+                offsets = self.columns["group_offsets"]
+                result = compute_salary_statistics(self.columns["salaries"][offsets[index]:offsets[index + 1]])
+
+        self._results[key] = result
+        return result
+
+def _write_snapshot(snapshot_dir, titles, locations, salaries, title_ids, location_ids, job_ids):
+    """按 (职位, 地点, 薪资) 排序并写入快照目录（先写临时目录再整体替换）"""
+    order = np.lexsort((salaries, location_ids, title_ids))
+    salaries, title_ids, location_ids, job_ids = salaries[order], title_ids[order], location_ids[order], job_ids[order]
+
+    combined = title_ids.astype(np.int64) * max(1, len(locations)) + location_ids
+    starts = np.flatnonzero(np.r_[True, combined[1:] != combined[:-1]]) if combined.size else np.empty(0, dtype=np.int64)
+    columns = {
+        "salaries": salaries,
+        "title_ids": title_ids,
+        "location_ids": location_ids,
+        "job_ids": job_ids,
+        "group_keys": combined[starts],
+        "group_offsets": np.r_[starts, combined.size]
+    }
+
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging_dir = snapshot_dir.with_name(f"{snapshot_dir.name}.tmp-{os.getpid()}")
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    staging_dir.mkdir()
+
+    for name, dtype in SNAPSHOT_COLUMNS.items():
+        np.save(staging_dir / f"{name}.npy", np.ascontiguousarray(columns[name], dtype=dtype))
+    with open(staging_dir / "vocab.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "version": SNAPSHOT_VERSION,
+            "created_at": datetime.now().isoformat(),
+            "sample_count": int(salaries.size),
+            "titles": titles,
+            "locations": locations
+        }, f, ensure_ascii=False, indent=2)
+
+    backup_dir = snapshot_dir.with_name(f"{snapshot_dir.name}.old-{os.getpid()}")
+    if snapshot_dir.exists():
+        os.replace(snapshot_dir, backup_dir)
+    os.replace(staging_dir, snapshot_dir)
+    shutil.rmtree(backup_dir, ignore_errors=True)
+
+    return int(salaries.size), int(starts.size)
+
+def import_salary_dumps(paths, position=None, location=None, snapshot_dir=SALARY_SNAPSHOT_DIR):
+    """批量导入 Adzuna 原始结果页，与已有快照合并（同一职位/地点组合内按职位ID去重，新数据优先）
+
+    每页的职位和地点取自页面中的 what/where 字段（导出时记录的查询参数），
+    没有时使用 position/location 参数。
+
+    Args:
+        paths (list): .json/.jsonl 文件或目录
+        position (str): 默认职位（英文）
+        location (str): 默认地点
+        snapshot_dir (str): 快照目录
+
+    Returns:
+        dict: 导入统计（pages、imported、skipped_pages、sample_count、groups）
+    """
+    snapshot = SalarySnapshot(snapshot_dir)
+    existing = snapshot.load_samples()
+    if existing is None:
+        titles, locations, old = [], [], None
+    else:
+        titles, locations, old = existing
+    title_index = {title: i for i, title in enumerate(titles)}
+    location_index = {loc: i for i, loc in enumerate(locations)}
+
+    salaries, title_ids, location_ids, job_ids = [], [], [], []
+    pages = skipped_pages = 0
+    for page in iter_dump_pages(paths):
+        pages += 1
+        page_position = page.get("what") or position
+        page_location = page.get("where") or location
+        if not page_position or not page_location:
+            skipped_pages += 1
+            continue
+
+        title = normalize_key(page_position)
+        loc = normalize_key(page_location)
+        title_id = title_index.setdefault(title, len(title_index))
+        location_id = location_index.setdefault(loc, len(location_index))
+        if title_id == len(titles):
+            titles.append(title)
+        if location_id == len(locations):
+            locations.append(loc)
+
+        for job in page.get("results", []):
+            salary_min = job.get("salary_min")
+            salary_max = job.get("salary_max")
+            if salary_min and salary_max:
+                salaries.append((salary_min + salary_max) / 2)
+                title_ids.append(title_id)
+                location_ids.append(location_id)
+                # 没有职位ID时按内容去重
+                job_id = job.get("id") or json.dumps(job, sort_keys=True, ensure_ascii=False)
+                job_ids.append(job_id_hash(job_id))
+
+    imported = len(salaries)
+    salaries = np.asarray(salaries, dtype=np.float64)
+    title_ids = np.asarray(title_ids, dtype=np.int32)
+    location_ids = np.asarray(location_ids, dtype=np.int32)
+    job_ids = np.asarray(job_ids, dtype=np.int64)
+    if old is not None:
+        salaries = np.concatenate([old["salaries"], salaries])
+        title_ids = np.concatenate([old["title_ids"], title_ids])
+        location_ids = np.concatenate([old["location_ids"], location_ids])
+        job_ids = np.concatenate([old["job_ids"], job_ids])
+
+    # 同一职位/地点组合中的同一职位ID保留最后导入的记录（同一职位可以出现在多个查询结果中）
+    keys = np.stack([title_ids.astype(np.int64), location_ids.astype(np.int64), job_ids], axis=1)
+    _, last = np.unique(keys[::-1], axis=0, return_index=True)
+    keep = np.sort(job_ids.size - 1 - last)
+    sample_count, groups = _write_snapshot(
+        snapshot_dir, titles, locations,
+        salaries[keep], title_ids[keep], location_ids[keep], job_ids[keep]
+    )
+
+    if _salary_snapshot is not None and _salary_snapshot.path == Path(snapshot_dir):
+        _salary_snapshot.reload()
+
+    stats = {
+        "pages": pages,
+        "imported": imported,
+        "skipped_pages": skipped_pages,
+        "sample_count": sample_count,
+        "groups": groups
+    }
+    print(f"✅ 薪资快照导入完成：{pages}页，导入{imported}个样本，"
+          f"快照共{sample_count}个样本、{groups}个职位/地点组合")
+    if skipped_pages:
+        print(f"⚠️ {skipped_pages}页缺少职位或地点信息，已跳过（可通过 --position/--location 指定）")
+    return stats
+
+# 进程内共享的快照实例
+_salary_snapshot = None
+
+def get_salary_snapshot():
+    """获取共享的薪资快照实例"""
+    global _salary_snapshot
+    if _salary_snapshot is None:
+        _salary_snapshot = SalarySnapshot()
+    return _salary_snapshot
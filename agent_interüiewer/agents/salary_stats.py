@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+薪资统计引擎
+基于 NumPy 的精确分位数、直方图和截尾均值，多页/多来源数据使用可合并的流式分位数草图，
+面试分数到市场百分位数的映射为一次向量化查表
+"""
+
+import numpy as np
+
+# 存储的分位数网格：0%、1%、...、100%
+QUANTILE_GRID = np.linspace(0.0, 1.0, 101)
+
+# 面试分数到市场薪资百分位数的映射断点
+# 60-69分 → 40-60百分位，70-77分 → 60-75百分位，78-100分 → 75-90百分位
+SCORE_BREAKPOINTS = np.array([60.0, 70.0, 78.0, 100.0])
+PERCENTILE_BREAKPOINTS = np.array([0.40, 0.60, 0.75, 0.90])
+
+# 建议薪资区间：建议百分位上下各浮动的百分位数
+SALARY_RANGE_SPREAD = 0.05
+
+def _build_statistics(quantiles, mean, trimmed_mean, histogram_counts, histogram_edges, count, currency):
+    """组装统一格式的薪资统计结果"""
+    return {
+        'average_salary': round(float(mean), 2),
+        'min_salary': round(float(quantiles[0]), 2),
+        'max_salary': round(float(quantiles[-1]), 2),
+        'median_salary': round(float(quantiles[50]), 2),
+        'trimmed_mean_salary': round(float(trimmed_mean), 2),
+        'sample_count': int(count),
+        'currency': currency,
+        'quantiles': [round(float(q), 2) for q in quantiles],
+        'histogram': {
+            'counts': [int(round(float(c))) for c in histogram_counts],
+            'edges': [round(float(e), 2) for e in histogram_edges]
+        }
+    }
+
+def compute_salary_statistics(salaries, bins=10, trim=0.1, currency='GBP'):
+    """精确计算一组薪资样本的统计数据
+
+    Args:
+        salaries: 薪资样本（可迭代对象或 NumPy 数组）
+        bins (int): 直方图分箱数
+        trim (float): 截尾均值两端各去掉的比例
+
+    Returns:
+        dict: 包含平均值、最值、中位数、截尾均值、101点分位数网格和直方图；没有样本时返回 None
+    """
+    values = np.asarray(salaries, dtype=float)
+    values = np.sort(values[np.isfinite(values)])
+    if values.size == 0:
+        return None
+
+    cut = int(values.size * trim)
+    trimmed = values[cut:values.size - cut] if values.size > 2 * cut else values
+    counts, edges = np.histogram(values, bins=bins)
+
+    return _build_statistics(
+        np.quantile(values, QUANTILE_GRID),
+        values.mean(),
+        trimmed.mean(),
+        counts,
+        edges,
+        values.size,
+        currency
+    )
+
+class QuantileSketch:
+    """可合并的流式分位数草图（简化版 t-digest）
+
+    样本数不超过 max_centroids 时保留全部样本，分位数是精确的；
+    超过后按 t-digest 尺度函数压缩质心，两端保留更高精度。
+    """
+
+    def __init__(self, compression=200, max_centroids=1000):
+        self.compression = compression
+        self.max_centroids = max_centroids
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self._buffer = []
+
+    @property
+    def count(self):
+        """样本总数"""
+        return float(self.weights.sum()) + len(self._buffer)
+
+    def add(self, value):
+        """加入一个样本"""
+        self._buffer.append(float(value))
+        if len(self._buffer) >= self.max_centroids:
+            self._flush()
+
+    def extend(self, values):
+        """加入一批样本"""
+        self._buffer.extend(float(v) for v in values)
+        if len(self._buffer) >= self.max_centroids:
+            self._flush()
+
+    def merge(self, other):
+        """合并另一个草图（用于多页、多来源数据）"""
+        other._flush()
+        self._flush()
+        self._set_centroids(
+            np.concatenate([self.means, other.means]),
+            np.concatenate([self.weights, other.weights])
+        )
+        return self
+
+    def _flush(self):
+        """将缓冲样本并入质心"""
+        if self._buffer:
+            buffered = np.asarray(self._buffer)
+            self._buffer = []
+            self._set_centroids(
+                np.concatenate([self.means, buffered]),
+                np.concatenate([self.weights, np.ones(buffered.size)])
+            )
+
+    def _set_centroids(self, means, weights):
+        """排序质心，数量超限时压缩"""
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        if means.size > self.max_centroids:
+            total = weights.sum()
+            q = (np.cumsum(weights) - weights / 2) / total
+            # t-digest k1 尺度函数：两端的分组更细
+            k = np.floor(self.compression * (np.arcsin(2 * q - 1) / np.pi + 0.5))
+            _, group = np.unique(k, return_inverse=True)
+            merged_weights = np.bincount(group, weights=weights)
+            # 保留真实的最小值和最大值
+            minimum, maximum = means[0], means[-1]
+            means = np.bincount(group, weights=means * weights) / merged_weights
+            means[0], means[-1] = minimum, maximum
+            weights = merged_weights
+
+        self.means, self.weights = means, weights
+
+    def quantile(self, qs):
+        """计算分位数（qs 为 0-1 之间的数或数组）"""
+        self._flush()
+        qs = np.asarray(qs, dtype=float)
+        if self.means.size == 0:
+            return np.full(qs.shape, np.nan)
+        if np.all(self.weights == 1):
+            return np.quantile(self.means, qs)
+
+        total = self.weights.sum()
+        centers = (np.cumsum(self.weights) - self.weights / 2) / total
+        positions = np.concatenate([[0.0], centers, [1.0]])
+        values = np.concatenate([[self.means[0]], self.means, [self.means[-1]]])
+        return np.interp(qs, positions, values)
+
+    def statistics(self, bins=10, trim=0.1, currency='GBP'):
+        """按草图计算统计数据，格式同 compute_salary_statistics()"""
+        self._flush()
+        if self.means.size == 0:
+            return None
+
+        total = self.weights.sum()
+        q = (np.cumsum(self.weights) - self.weights / 2) / total
+        kept = (q >= trim) & (q <= 1 - trim)
+        if not kept.any():
+            kept = np.ones_like(kept)
+        counts, edges = np.histogram(self.means, bins=bins, weights=self.weights)
+
+        return _build_statistics(
+            self.quantile(QUANTILE_GRID),
+            np.average(self.means, weights=self.weights),
+            np.average(self.means[kept], weights=self.weights[kept]),
+            counts,
+            edges,
+            total,
+            currency
+        )
+
+    @classmethod
+    def from_quantiles(cls, quantiles, count):
+        """由分位数网格近似还原草图（用于合并已汇总的数据）"""
+        sketch = cls()
+        quantiles = np.asarray(quantiles, dtype=float)
+        if quantiles.size and count:
+            sketch._set_centroids(quantiles, np.full(quantiles.size, count / quantiles.size))
+        return sketch
+
+def quantile_grid(market_data):
+    """市场数据的101点分位数网格；旧格式数据在最小值和最大值之间线性插值"""
+    grid = market_data.get('quantiles')
+    if grid and len(grid) == QUANTILE_GRID.size:
+        return np.asarray(grid, dtype=float)
+    return market_data['min_salary'] + (market_data['max_salary'] - market_data['min_salary']) * QUANTILE_GRID
+
+def merge_market_data(items, currency='GBP'):
+    """合并多份市场数据（多来源或多地点）为一份统计结果"""
+    sketch = QuantileSketch()
+    for item in items:
+        if item:
+            sketch.merge(QuantileSketch.from_quantiles(quantile_grid(item), item.get('sample_count') or 1))
+    return sketch.statistics(currency=currency)
+
+def score_to_percentile(scores):
+    """面试分数映射到市场薪资百分位数（0-1），支持标量或数组"""
+    return np.interp(np.asarray(scores, dtype=float), SCORE_BREAKPOINTS, PERCENTILE_BREAKPOINTS)
+
+def lookup_percentiles(grids, percentiles):
+    """在分位数网格上批量查询百分位数对应的薪资
+
+    Args:
+        grids: 形状为 (101,) 或 (n, 101) 的分位数网格
+        percentiles: 形状为 () 或 (n,) 的百分位数（0-1）
+
+    Returns:
+        np.ndarray: 每个百分位数对应的薪资
+    """
+    grids = np.atleast_2d(np.asarray(grids, dtype=float))
+    percentiles = np.clip(np.asarray(percentiles, dtype=float), 0.0, 1.0)
+    positions = percentiles * (QUANTILE_GRID.size - 1)
+    lower = np.minimum(np.floor(positions).astype(int), QUANTILE_GRID.size - 2)
+    fraction = positions - lower
+    rows = np.arange(grids.shape[0]) if grids.shape[0] > 1 else 0
+    return grids[rows, lower] + (grids[rows, lower + 1] - grids[rows, lower]) * fraction
+
+def suggest_salaries(scores, market_data, spread=SALARY_RANGE_SPREAD):
+    """根据面试分数批量计算建议薪资和区间
+
+    Args:
+        scores: 一个或一批候选人的面试总分
+        market_data: 一份市场数据（所有候选人共用），或与 scores 等长的市场数据列表
+        spread (float): 区间上下浮动的百分位数
+
+    Returns:
+        dict: percentile、suggested、range_min、range_max（NumPy 数组）
+    """
+    if isinstance(market_data, dict):
+        grids = quantile_grid(market_data)
+    else:
+        grids = np.stack([quantile_grid(item) for item in market_data])
+
+    percentiles = score_to_percentile(scores)
+    return {
+        'percentile': percentiles,
+        'suggested': lookup_percentiles(grids, percentiles),
+        'range_min': lookup_percentiles(grids, percentiles - spread),
+        'range_max': lookup_percentiles(grids, percentiles + spread)
+    }
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+市场薪资缓存预热
+提前为所有已映射职位和配置的地点拉取薪资数据，offer 生成时直接命中本地缓存
+"""
+
+import os
+import asyncio
+
+from .hr_offer_agent import POSITION_MAPPING, SALARY_LOCATIONS, get_market_salary_data_batch
+from .salary_cache import get_salary_cache
+from .salary_snapshot import SALARY_SOURCE
+
+# 预热配置（从环境变量读取）
+SALARY_WARM_INTERVAL = float(os.getenv("SALARY_WARM_INTERVAL", "21600"))     # 定时预热间隔（秒）
+SALARY_WARM_BATCH_SIZE = int(os.getenv("SALARY_WARM_BATCH_SIZE", "16"))      # 每次批量请求的查询数
+
+def get_mapped_positions():
+    """所有已映射的英文职位名称（去重）"""
+    return sorted(set(POSITION_MAPPING.values()))
+
+async def warm_salary_cache(locations=None, max_age=None):
+    """为所有已映射职位预取市场薪资数据并写入缓存
+
+    Args:
+        locations (list): 地点列表，默认使用 SALARY_LOCATIONS
+        max_age (float): 缓存时长小于该秒数的条目视为足够新，跳过；默认为缓存 TTL 的一半
+
+    Returns:
+        dict: 预热统计（total、skipped、refreshed、failed）
+    """
+    if SALARY_SOURCE == "offline":
+        print("离线模式（SALARY_SOURCE=offline）使用本地薪资快照，跳过缓存预热")
+        return {"total": 0, "skipped": 0, "refreshed": 0, "failed": 0}
+    
+    cache = get_salary_cache()
+    locations = locations or SALARY_LOCATIONS
+    if max_age is None:
+        max_age = cache.ttl / 2
+
+    queries = [(position, location) for position in get_mapped_positions() for location in locations]
+
+    # 只刷新缺失或即将过期的条目
+    pending = []
+    for position, location in queries:
+        entry = cache.get_entry(position, location)
+        if entry is None or entry[1] >= max_age:
+            pending.append((position, location))
+
+    refreshed = 0
+    failed = []
+    for start in range(0, len(pending), SALARY_WARM_BATCH_SIZE):
+        chunk = pending[start:start + SALARY_WARM_BATCH_SIZE]
+        results = await get_market_salary_data_batch(chunk)
+        for position, location in chunk:
+            data = results.get((position, location))
+            if data:
+                cache.put(position, location, data)
+                refreshed += 1
+            else:
+                failed.append((position, location))
+
+    stats = {
+        "total": len(queries),
+        "skipped": len(queries) - len(pending),
+        "refreshed": refreshed,
+        "failed": len(failed)
+    }
+    print(f"薪资缓存预热完成：共{stats['total']}项，跳过{stats['skipped']}项，"
+          f"刷新{stats['refreshed']}项，失败{stats['failed']}项")
+    for position, location in failed:
+        print(f"  - 预热失败: {position} @ {location}")
+
+    return stats
+
+class SalaryCacheWarmer:
+    """进程内定时预热薪资缓存"""
+
+    def __init__(self, locations=None, interval=SALARY_WARM_INTERVAL):
+        self.locations = locations or SALARY_LOCATIONS
+        self.interval = interval
+        self._task = None
+
+    def start(self):
+        """在当前事件循环中启动定时预热"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await warm_salary_cache(self.locations)
+            except Exception as e:
+                print(f"薪资缓存预热失败: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def stop(self):
+        """停止定时预热"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
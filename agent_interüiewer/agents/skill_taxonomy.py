@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+技能分类体系
+所有技能类别、项目类别和技能信号的关键词在导入时编译成一个 Aho-Corasick 多模式自动机，
+每个技能或项目字符串只需扫描一遍即可得到全部匹配的类别（子串匹配，区分大小写）
+"""
+
+from collections import deque
+from functools import lru_cache
+
+# 技能类别：中英文名称、权重、关键词和对应职位（顺序即得分相同时的优先顺序）
+SKILL_CATEGORIES = {
+    "ai_ml": {
+        "label": "AI/机器学习",
+        "label_en": "AI/Machine Learning",
+        "weight": 1.5,
+        "keywords": ["大模型", "LLM", "LoRA", "微调", "深度学习", "机器学习", "AI", "人工智能", "NLP", "自然语言处理", "计算机视觉", "推荐算法", "向量数据库", "FAISS", "Milvus", "LangChain", "RAG", "Prompt Engineering", "Transformer", "BERT", "GPT", "强化学习", "知识图谱"],
+        "positions": ["大模型算法工程师", "机器学习工程师", "AI工程师", "算法工程师", "NLP工程师"]
+    },
+    "data_science": {
+        "label": "数据科学",
+        "label_en": "Data Science",
+        "weight": 1.3,
+        "keywords": ["数据分析", "数据挖掘", "数据可视化", "统计建模", "数据科学", "BI", "Tableau", "PowerBI", "数据建模"],
+        "positions": ["数据科学家", "数据分析师", "数据工程师"]
+    },
+    "backend_dev": {
+        "label": "后端开发",
+        "label_en": "Backend Development",
+        "weight": 1.0,
+        "keywords": ["Django", "Flask", "FastAPI", "MySQL", "PostgreSQL", "Redis", "Docker", "微服务", "高并发", "API", "后端", "Spring Boot", "Node.js", "Go", "微服务架构", "分布式系统", "Saga", "TCC", "Seata"],
+        "positions": ["Python开发工程师", "后端开发工程师", "云原生后端工程师", "系统工程师"]
+    },
+    "frontend_dev": {
+        "label": "前端开发",
+        "label_en": "Frontend Development",
+        "weight": 0.8,
+        "keywords": ["React", "Vue", "Angular", "JavaScript", "TypeScript", "前端", "UI/UX", "Web开发", "移动端", "小程序", "HTML", "CSS"],
+        "positions": ["前端开发工程师", "UI/UX工程师", "全栈开发工程师"]
+    },
+    "data_engineering": {
+        "label": "数据工程",
+        "label_en": "Data Engineering",
+        "weight": 1.2,
+        "keywords": ["数据工程", "ETL", "数据仓库", "Spark", "Hadoop", "Kafka", "数据湖", "数据管道", "数据治理", "数据平台", "BI", "数据可视化"],
+        "positions": ["数据工程师", "数据平台工程师", "大数据工程师"]
+    },
+    "cloud_devops": {
+        "label": "云原生/DevOps",
+        "label_en": "Cloud Native/DevOps",
+        "weight": 1.1,
+        "keywords": ["Kubernetes", "AWS", "Azure", "GCP", "云原生", "DevOps", "CI/CD", "Jenkins", "GitLab", "监控", "日志", "容器化", "阿里云", "腾讯云"],
+        "positions": ["DevOps工程师", "云原生工程师", "运维工程师"]
+    },
+    "mobile_dev": {
+        "label": "移动开发",
+        "label_en": "Mobile Development",
+        "weight": 0.9,
+        "keywords": ["Android", "iOS", "移动开发", "React Native", "Flutter", "原生开发", "移动应用", "移动端"],
+        "positions": ["移动开发工程师", "Android开发工程师", "iOS开发工程师"]
+    },
+    "security": {
+        "label": "安全技术",
+        "label_en": "Security",
+        "weight": 1.3,
+        "keywords": ["网络安全", "信息安全", "渗透测试", "安全开发", "加密", "认证", "授权", "安全架构"],
+        "positions": ["安全工程师", "网络安全工程师"]
+    },
+    "game_dev": {
+        "label": "游戏开发",
+        "label_en": "Game Development",
+        "weight": 0.7,
+        "keywords": ["游戏开发", "Unity", "Unreal", "游戏引擎", "3D建模", "游戏设计"],
+        "positions": ["游戏开发工程师"]
+    }
+}
+
+# 项目经验类别（按项目描述统计项目数）
+PROJECT_CATEGORIES = {
+    "ai_ml_projects": ["大模型", "LLM", "AI", "机器学习", "深度学习", "算法"],
+    "backend_projects": ["后端", "API", "微服务", "数据库", "系统"],
+    "data_projects": ["数据", "分析", "ETL", "仓库"],
+    "cloud_projects": ["云", "容器", "部署", "运维"]
+}
+
+# 技能信号：用于细分职位方向的关键词组
+SKILL_SIGNALS = {
+    "llm": ["大模型", "LLM"],
+    "lora": ["LoRA"],
+    "ml": ["机器学习", "深度学习"],
+    "recommend_search": ["推荐", "搜索"],
+    "nlp": ["NLP", "自然语言"],
+    "cv": ["计算机视觉", "CV"],
+    "cloud_native": ["云原生", "微服务"]
+}
+
+class KeywordAutomaton:
+    """Aho-Corasick 多模式匹配自动机
+
+    每个关键词可对应多个标签，labels(text) 一次扫描返回文本中出现的所有关键词的标签。
+    """
+
+    def __init__(self, keyword_labels):
+        self._goto = [{}]
+        self._fail = [0]
+        outputs = [set()]
+
+        # 构建关键词字典树
+        for keyword, labels in keyword_labels.items():
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append(set())
+                state = next_state
+            outputs[state].update(labels)
+
+        # 按层序计算失败指针，并合并后缀关键词的输出
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                outputs[next_state] |= outputs[self._fail[next_state]]
+                queue.append(next_state)
+
+        self._outputs = [frozenset(labels) for labels in outputs]
+
+    def labels(self, text):
+        """文本中出现的所有关键词的标签"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        found = set()
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        return frozenset(found)
+
+def _build_automaton():
+    """将技能类别、项目类别和技能信号编译为一个自动机"""
+    keyword_labels = {}
+    for category, config in SKILL_CATEGORIES.items():
+        for keyword in config["keywords"]:
+            keyword_labels.setdefault(keyword, set()).add(("skill", category))
+    for category, keywords in PROJECT_CATEGORIES.items():
+        for keyword in keywords:
+            keyword_labels.setdefault(keyword, set()).add(("project", category))
+    for signal, keywords in SKILL_SIGNALS.items():
+        for keyword in keywords:
+            keyword_labels.setdefault(keyword, set()).add(("signal", signal))
+    return KeywordAutomaton(keyword_labels)
+
+# 导入时编译一次
+TAXONOMY_AUTOMATON = _build_automaton()
+
+@lru_cache(maxsize=4096)
+def match_labels(text):
+    """单个字符串匹配到的全部标签（("skill"|"project"|"signal", 名称)），结果按字符串缓存"""
+    return TAXONOMY_AUTOMATON.labels(text)
+
+def analyze_candidate(skills, projects=()):
+    """一次扫描分析候选人的技能和项目
+
+    Args:
+        skills (list): 技能列表
+        projects (list): 项目经验列表
+
+    Returns:
+        dict: skill_counts（每个技能类别匹配的技能数）、project_counts（每个技能类别匹配的项目数）、
+            project_analysis（每个项目类别的项目数）、skill_signals / project_signals（出现的技能信号）
+    """
+    skill_counts = dict.fromkeys(SKILL_CATEGORIES, 0)
+    project_counts = dict.fromkeys(SKILL_CATEGORIES, 0)
+    project_analysis = dict.fromkeys(PROJECT_CATEGORIES, 0)
+    skill_signals = set()
+    project_signals = set()
+
+    for skill in skills or []:
+        for kind, name in match_labels(str(skill)):
+            if kind == "skill":
+                skill_counts[name] += 1
+            elif kind == "signal":
+                skill_signals.add(name)
+
+    for project in projects or []:
+        # 项目可能是字符串或结构化的 dict（名称、技术栈、职责等），按字符串整体匹配
+        for kind, name in match_labels(str(project)):
+            if kind == "skill":
+                project_counts[name] += 1
+            elif kind == "project":
+                project_analysis[name] += 1
+            else:
+                project_signals.add(name)
+
+    return {
+        "skill_counts": skill_counts,
+        "project_counts": project_counts,
+        "project_analysis": project_analysis,
+        "skill_signals": skill_signals,
+        "project_signals": project_signals
+    }
+
+def weighted_scores(analysis, categories=None, project_weight=0.0, weighted=True):
+    """按类别权重计算技能得分
+
+    Args:
+        analysis (dict): analyze_candidate() 的结果
+        categories (list): 参与计算的类别，默认全部（保持 SKILL_CATEGORIES 中的顺序）
+        project_weight (float): 每个匹配项目折算的技能数
+        weighted (bool): 是否乘以类别权重
+
+    Returns:
+        dict: {类别: 得分}
+    """
+    selected = [c for c in SKILL_CATEGORIES if categories is None or c in categories]
+    return {
+        category: (analysis["skill_counts"][category] + analysis["project_counts"][category] * project_weight)
+                  * (SKILL_CATEGORIES[category]["weight"] if weighted else 1)
+        for category in selected
+    }
+
+def score_skills(skills, projects=(), categories=None, project_weight=0.0, weighted=True):
+    """技能类别得分（analyze_candidate() + weighted_scores() 的简写）"""
+    return weighted_scores(analyze_candidate(skills, projects), categories, project_weight, weighted)
+
+def category_label(category):
+    """技能类别的中文名称"""
+    return SKILL_CATEGORIES[category]["label"]
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+文件存储工具
+原子写入：先写同目录下的临时文件并刷盘，再用 os.replace 替换目标文件，
+读者只会看到完整的旧文件或新文件；
+唯一时间戳：用于面试ID和结果文件名，同一秒内并发保存也不会互相覆盖
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+from datetime import datetime
+
+# 本进程上一次生成的时间戳（微秒），保证单调递增
+_last_stamp_us = 0
+_stamp_lock = threading.Lock()
+
+def unique_stamp():
+    """唯一且单调递增的时间戳：YYYYMMDD_HHMMSS_微秒_进程号
+
+    同一进程内严格递增（同一微秒内顺延），进程号区分并行运行的多个进程，
+    按字符串排序即按时间排序。
+    """
+    global _last_stamp_us
+    with _stamp_lock:
+        stamp_us = max(time.time_ns() // 1000, _last_stamp_us + 1)
+        _last_stamp_us = stamp_us
+    seconds, micros = divmod(stamp_us, 1_000_000)
+    return f"{datetime.fromtimestamp(seconds):%Y%m%d_%H%M%S}_{micros:06d}_{os.getpid()}"
+
+def new_interview_id():
+    """生成面试ID（INT_ 加唯一时间戳），同时用作对话日志、结果和 offer 文件名"""
+    return f"INT_{unique_stamp()}"
+
+def interview_stamp(interview_id):
+    """面试ID中的时间戳部分（结果和 offer 文件名使用）"""
+    return interview_id[len("INT_"):] if interview_id.startswith("INT_") else interview_id
+
+def atomic_write_bytes(path, data):
+    """原子写入二进制文件（自动创建父目录）"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+def atomic_write_text(path, text, encoding="utf-8"):
+    """原子写入文本文件（自动创建父目录）"""
+    atomic_write_bytes(path, text.encode(encoding))
+
+def atomic_write_json(path, data, indent=2):
+    """原子写入JSON文件"""
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False, indent=indent))
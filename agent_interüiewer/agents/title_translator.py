@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+职位名称翻译
+POSITION_MAPPING 中没有的中文职位先按规则翻译，规则无法覆盖时再调用大模型，
+翻译结果写入带版本号的本地缓存，之后的 offer 直接从内存读取
+"""
+
+import os
+import re
+import json
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from autogen import ConversableAgent
+
+from .salary_snapshot import SALARY_SOURCE
+
+# 翻译缓存配置（从环境变量读取）
+TITLE_TRANSLATION_CACHE = os.getenv("TITLE_TRANSLATION_CACHE", "data/title_translations.json")
+TITLE_TRANSLATION_BATCH_SIZE = int(os.getenv("TITLE_TRANSLATION_BATCH_SIZE", "20"))
+TITLE_TRANSLATION_LLM = os.getenv("TITLE_TRANSLATION_LLM", "on").strip().lower() != "off"
+# 单次大模型翻译的超时（秒）
+TITLE_TRANSLATION_TIMEOUT = float(os.getenv("TITLE_TRANSLATION_TIMEOUT", "20"))
+# 翻译失败的职位在这段时间内不再调用大模型（秒）
+TITLE_TRANSLATION_RETRY_AFTER = int(os.getenv("TITLE_TRANSLATION_RETRY_AFTER", "86400"))
+
+# 翻译规则或缓存格式变化时递增，旧缓存自动失效
+TITLE_TRANSLATION_VERSION = 1
+
+# 无法翻译时使用的默认英文职位
+DEFAULT_ENGLISH_POSITION = "Python Developer"
+
+# 职位角色词（译文中至少要有一个）
+TITLE_ROLE_TERMS = {
+    "开发工程师": "Developer",
+    "测试工程师": "QA Engineer",
+    "研发工程师": "R&D Engineer",
+    "工程师": "Engineer",
+    "开发": "Developer",
+    "架构师": "Architect",
+    "产品经理": "Product Manager",
+    "项目经理": "Project Manager",
+    "经理": "Manager",
+    "技术总监": "Technical Director",
+    "总监": "Director",
+    "主管": "Lead",
+    "负责人": "Lead",
+    "分析师": "Analyst",
+    "科学家": "Scientist",
+    "设计师": "Designer",
+    "研究员": "Researcher",
+    "专家": "Specialist",
+    "顾问": "Consultant",
+    "实习生": "Intern"
+}
+
+# 修饰词：级别和技术方向
+TITLE_MODIFIER_TERMS = {
+    "高级": "Senior",
+    "资深": "Senior",
+    "初级": "Junior",
+    "中级": "",
+    "首席": "Principal",
+    "前端": "Frontend",
+    "后端": "Backend",
+    "服务端": "Backend",
+    "客户端": "Client",
+    "全栈": "Full Stack",
+    "移动端": "Mobile",
+    "移动": "Mobile",
+    "嵌入式": "Embedded",
+    "算法": "Algorithm",
+    "大数据": "Big Data",
+    "数据库": "Database",
+    "数据": "Data",
+    "机器学习": "Machine Learning",
+    "深度学习": "Deep Learning",
+    "人工智能": "AI",
+    "大模型": "LLM",
+    "自然语言处理": "NLP",
+    "计算机视觉": "Computer Vision",
+    "推荐": "Recommendation",
+    "搜索": "Search",
+    "安全": "Security",
+    "网络": "Network",
+    "云原生": "Cloud Native",
+    "云": "Cloud",
+    "运维": "Operations",
+    "测试": "QA",
+    "游戏": "Game",
+    "硬件": "Hardware",
+    "软件": "Software",
+    "系统": "Systems",
+    "平台": "Platform",
+    "基础架构": "Infrastructure",
+    "区块链": "Blockchain",
+    "芯片": "Chip",
+    "产品": "Product",
+    "运营": "Operations",
+    "交互": "Interaction",
+    "视觉": "Visual",
+    "技术": "Technical"
+}
+
+# 翻译时忽略的分隔符
+TITLE_SEPARATORS = set(" /、,，-·()（）")
+
+_TITLE_TERMS = {**TITLE_MODIFIER_TERMS, **TITLE_ROLE_TERMS}
+_MAX_TERM_LENGTH = max(len(term) for term in _TITLE_TERMS)
+
+def normalize_title(title):
+    """规范化职位名称：去掉首尾和多余空白"""
+    return " ".join(str(title).split())
+
+def translate_title_by_rules(title):
+    """按词表翻译职位名称（最长匹配），有无法识别的中文或没有角色词时返回 None
+
+    英文部分（如 Java、iOS、C++）原样保留，例如 "高级Java开发工程师" → "Senior Java Developer"。
+    """
+    words = []
+    has_role = False
+    i = 0
+    while i < len(title):
+        char = title[i]
+        if char in TITLE_SEPARATORS:
+            i += 1
+            continue
+        if char.isascii():
+            j = i
+            while j < len(title) and title[j].isascii() and title[j] not in TITLE_SEPARATORS:
+                j += 1
+            words.append(title[i:j])
+            i = j
+            continue
+
+        for length in range(min(_MAX_TERM_LENGTH, len(title) - i), 0, -1):
+            term = title[i:i + length]
+            if term in _TITLE_TERMS:
+                if _TITLE_TERMS[term]:
+                    words.append(_TITLE_TERMS[term])
+                has_role = has_role or term in TITLE_ROLE_TERMS
+                i += length
+                break
+        else:
+            return None
+
+    if not has_role:
+        return None
+    # 去掉相邻的重复词（如 "运维" + "运营"）
+    words = [w for k, w in enumerate(words) if k == 0 or w != words[k - 1]]
+    return " ".join(words)
+
+def create_title_translator():
+    """创建职位名称翻译智能体"""
+    return ConversableAgent(
+        "title_translator",
+        system_message="""你是一位专业的招聘翻译，负责将中文职位名称翻译为招聘网站上通用的英文职位名称。
+
+要求：
+1. 使用英国/国际招聘网站上最常见的职位说法（如 "Backend Developer"、"Data Scientist"）
+2. 保留级别（Senior、Junior 等）和技术栈（Java、Go 等）
+3. 只翻译职位名称，不要添加解释
+
+请严格按照以下JSON格式返回，键为原中文职位名称，值为英文职位名称：
+
+{
+    "中文职位1": "English Title 1",
+    "中文职位2": "English Title 2"
+}
+
+请确保返回的是有效的JSON格式，不要包含其他文字说明。""",
+        llm_config={
+            "config_list": [{
+                "model": "Qwen/QwQ-32B",
+                "api_key": os.environ.get("SILICONFLOW_API_KEY"),
+                "base_url": "https://api.siliconflow.cn/v1"
+            }]
+        },
+        human_input_mode="NEVER",
+        max_consecutive_auto_reply=1
+    )
+
+# 推理模型（如 QwQ-32B）在回复前输出的思考过程
+_THINK_BLOCK = re.compile(r"<think>.*?</think>", re.DOTALL)
+
+def _parse_llm_translations(response, titles):
+    """从大模型回复中提取 {中文职位: 英文职位}，过滤无效译文"""
+    text = response.get("content", "") if isinstance(response, dict) else str(response or "")
+    # 先去掉思考过程（其中可能含有大括号），只有结束标签时取其后的内容
+    text = _THINK_BLOCK.sub("", text).rsplit("</think>", 1)[-1]
+    start_idx = text.find('{')
+    end_idx = text.rfind('}') + 1
+    if start_idx == -1 or end_idx == 0:
+        return {}
+    try:
+        data = json.loads(text[start_idx:end_idx])
+    except json.JSONDecodeError:
+        return {}
+
+    translations = {}
+    for title in titles:
+        english = data.get(title)
+        if isinstance(english, str):
+            english = " ".join(english.split())
+            if english and english.isascii() and len(english) <= 80:
+                translations[title] = english
+    return translations
+
+class TitleTranslationCache:
+    """持久化的职位翻译缓存
+
+    缓存文件：{"version": 版本号, "translations": {中文职位: {english, source, created_at}}}，
+    版本号不一致时忽略旧缓存。同一职位的并发翻译只调用一次大模型。
+    大模型翻译失败的职位记为 {"english": None, "source": "failed"}，TITLE_TRANSLATION_RETRY_AFTER 秒内不再重试。
+    """
+
+    def __init__(self, path=TITLE_TRANSLATION_CACHE):
+        self.path = Path(path)
+        self._translations = None
+        self._inflight = {}
+        self._agent = None
+        self.stats = {"hits": 0, "rule_translations": 0, "llm_translations": 0, "failures": 0}
+
+    def _load(self):
+        """首次使用时读取缓存文件"""
+        if self._translations is not None:
+            return self._translations
+
+        self._translations = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == TITLE_TRANSLATION_VERSION:
+                    self._translations = data.get("translations", {})
+                else:
+                    print(f"⚠️ 职位翻译缓存版本已变化（{data.get('version')}），将重新翻译")
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ 读取职位翻译缓存失败: {e}")
+        return self._translations
+
+    def save(self):
+        """写入缓存文件（先写临时文件再替换）"""
+        translations = self._load()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp-{os.getpid()}")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": TITLE_TRANSLATION_VERSION,
+                "updated_at": datetime.now().isoformat(),
+                "translations": translations
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _store(self, title, english, source):
+        self._load()[title] = {
+            "english": english,
+            "source": source,
+            "created_at": datetime.now().isoformat()
+        }
+        if source == "failed":
+            self.stats["failures"] += 1
+        else:
+            self.stats["llm_translations" if source == "llm" else "rule_translations"] += 1
+
+    def failed_recently(self, title):
+        """该职位最近是否翻译失败过（重试间隔内不再调用大模型）"""
+        entry = self._load().get(normalize_title(title))
+        if not entry or entry.get("source") != "failed":
+            return False
+        try:
+            failed_at = datetime.fromisoformat(entry["created_at"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return datetime.now() - failed_at < timedelta(seconds=TITLE_TRANSLATION_RETRY_AFTER)
+
+    def get(self, title):
+        """查询缓存或按规则翻译（不调用大模型），无法翻译时返回 None"""
+        title = normalize_title(title)
+        entry = self._load().get(title)
+        if entry and entry.get("english"):
+            self.stats["hits"] += 1
+            return entry["english"]
+
+        english = translate_title_by_rules(title)
+        if english:
+            # 规则翻译同样写入缓存，随下次保存落盘
+            self._store(title, english, "rules")
+        return english
+
+    @property
+    def llm_enabled(self):
+        """是否调用大模型（离线模式下不访问网络）"""
+        return TITLE_TRANSLATION_LLM and SALARY_SOURCE != "offline" and bool(os.environ.get("SILICONFLOW_API_KEY"))
+
+    async def _translate_with_llm(self, titles):
+        """调用大模型翻译一批职位名称"""
+        if self._agent is None:
+            self._agent = create_title_translator()
+        response = await self._agent.a_generate_reply(
+            messages=[{"role": "user", "content": "请翻译以下职位名称：\n" + "\n".join(titles)}]
+        )
+        return _parse_llm_translations(response, titles)
+
+    async def _translate_batch(self, titles):
+        """大模型翻译一批职位并写入缓存（失败的职位同样记录，重试间隔内不再调用大模型）"""
+        try:
+            translations = await asyncio.wait_for(self._translate_with_llm(titles), TITLE_TRANSLATION_TIMEOUT)
+        except asyncio.TimeoutError:
+            print(f"❌ 大模型翻译职位超时（{TITLE_TRANSLATION_TIMEOUT:g}秒）")
+            translations = {}
+        except Exception as e:
+            print(f"❌ 大模型翻译职位失败: {e}")
+            translations = {}
+
+        for title in titles:
+            if title in translations:
+                self._store(title, translations[title], "llm")
+            else:
+                self._store(title, None, "failed")
+        self.save()
+        return translations
+
+    async def translate(self, title):
+        """翻译单个职位：缓存 → 规则 → 大模型，都失败时返回 None"""
+        title = normalize_title(title)
+        english = self.get(title)
+        if english or not self.llm_enabled or self.failed_recently(title):
+            return english
+
+        task = self._inflight.get(title)
+        if task is None:
+            task = asyncio.ensure_future(self._translate_batch([title]))
+            self._inflight[title] = task
+            task.add_done_callback(lambda _: self._inflight.pop(title, None))
+        translations = await asyncio.shield(task)
+        return translations.get(title)
+
+    async def warm(self, titles, batch_size=TITLE_TRANSLATION_BATCH_SIZE):
+        """批量预热：缓存和规则无法翻译的职位按批调用大模型
+
+        Returns:
+            dict: {中文职位: 英文职位或 None}
+        """
+        titles = list(dict.fromkeys(normalize_title(t) for t in titles if normalize_title(t)))
+        results = {title: self.get(title) for title in titles}
+        pending = [title for title, english in results.items() if not english and not self.failed_recently(title)]
+
+        if pending and self.llm_enabled:
+            print(f"正在调用大模型翻译{len(pending)}个职位...")
+            batches = [pending[i:i + batch_size] for i in range(0, len(pending), max(1, batch_size))]
+            for translations in await asyncio.gather(*(self._translate_batch(batch) for batch in batches)):
+                results.update(translations)
+        elif pending:
+            print("⚠️ 未配置 SILICONFLOW_API_KEY、离线模式或已关闭大模型翻译，跳过规则无法翻译的职位")
+
+        # 预热结果（包括规则翻译）全部落盘，下次启动直接读取
+        self.save()
+        return results
+
+# 进程内共享的翻译缓存实例
+_title_translation_cache = None
+
+def get_title_translation_cache():
+    """获取共享的职位翻译缓存实例"""
+    global _title_translation_cache
+    if _title_translation_cache is None:
+        _title_translation_cache = TitleTranslationCache()
+    return _title_translation_cache
+
+def _position_mapping():
+    from .hr_offer_agent import POSITION_MAPPING
+    return POSITION_MAPPING
+
+def lookup_english_position(position):
+    """不调用大模型的英文职位查询：POSITION_MAPPING → 翻译缓存 → 规则，无法翻译时返回 None"""
+    return _position_mapping().get(position) or get_title_translation_cache().get(position)
+
+async def resolve_english_position(position):
+    """英文职位名称：POSITION_MAPPING → 翻译缓存 → 规则 → 大模型，都失败时使用 DEFAULT_ENGLISH_POSITION"""
+    english = _position_mapping().get(position) or await get_title_translation_cache().translate(position)
+    if not english:
+        print(f"⚠️ 无法翻译职位「{position}」，使用默认职位 {DEFAULT_ENGLISH_POSITION}")
+        return DEFAULT_ENGLISH_POSITION
+    return english
+
+async def warm_title_translations(titles):
+    """批量预热职位翻译缓存（跳过 POSITION_MAPPING 中已有的职位）
+
+    Returns:
+        dict: {中文职位: 英文职位或 None}
+    """
+    mapping = _position_mapping()
+    unmapped = [t for t in titles if normalize_title(t) not in mapping]
+    results = await get_title_translation_cache().warm(unmapped)
+    translated = sum(1 for english in results.values() if english)
+    print(f"✅ 职位翻译预热完成：{len(titles)}个职位，{len(titles) - len(unmapped)}个已映射，"
+          f"翻译{translated}个，失败{len(results) - translated}个")
+    for title, english in results.items():
+        print(f"  {title} → {english or '（未翻译）'}")
+    return results
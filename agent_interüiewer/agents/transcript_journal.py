@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+面试对话日志
+每条消息在发送时追加一行 JSON（JSONL）到 data/transcripts/<面试ID>.jsonl，
+记录真实时间和本轮回复耗时：进程中断也不会丢失已完成的对话，
+长时间的面试不在内存中累积消息，其他程序可以实时跟踪（tail -f）
+"""
+
+import os
+import json
+import time
+from datetime import datetime
+
+TRANSCRIPT_DIR = os.getenv("TRANSCRIPT_DIR", "data/transcripts")
+
+def journal_path(interview_id, directory=TRANSCRIPT_DIR):
+    """面试对话日志文件路径"""
+    return os.path.join(directory, f"{interview_id}.jsonl")
+
+def read_journal(path):
+    """逐行读取对话日志（跳过中断时写了一半的最后一行）"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+def follow_journal(path, poll_interval=0.5, stop_event="interview_end"):
+    """实时跟踪对话日志：先输出已有记录，再等待新追加的记录，读到 stop_event 时结束"""
+    while not os.path.exists(path):
+        time.sleep(poll_interval)
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        while True:
+            line = f.readline()
+            if not line:
+                time.sleep(poll_interval)
+                continue
+            buffer += line
+            if not buffer.endswith("\n"):
+                # 写入方还没写完这一行
+                continue
+            try:
+                entry = json.loads(buffer)
+            except json.JSONDecodeError:
+                entry = None
+            buffer = ""
+            if entry is None:
+                continue
+            yield entry
+            if entry.get("event") == stop_event:
+                return
+
+class TranscriptJournal:
+    """面试对话日志（追加写入，每条记录写完立即刷新）
+
+    用 attach() 给参与面试的智能体注册 process_message_before_send 钩子，
+    每轮面试开始前调用 begin_round()，之后智能体发出的每条消息都会写入日志。
+    """
+
+    def __init__(self, interview_id, directory=TRANSCRIPT_DIR):
+        self.interview_id = interview_id
+        self.path = journal_path(interview_id, directory)
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self.round = None
+        self._initiator = None
+        self._seq = 0
+        self._last_time = None
+
+    def _write(self, event, **fields):
+        """追加一条记录"""
+        if self._file is None:
+            return
+        entry = {
+            "interview_id": self.interview_id,
+            "event": event,
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+            **fields
+        }
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def attach(self, *agents):
+        """给智能体注册发送消息的钩子"""
+        for agent in agents:
+            agent.register_hook("process_message_before_send", self._on_send)
+
+    def begin_round(self, round_name, initiator):
+        """开始新一轮面试（initiator 为发起对话的面试官）"""
+        self.round = round_name
+        self._initiator = initiator
+        self._seq = 0
+        self._last_time = time.perf_counter()
+        self._write("round_start", round=round_name, interviewer=getattr(initiator, "name", None))
+
+    def end_round(self, status="completed"):
+        """结束当前轮次"""
+        if self.round is None:
+            return
+        self._write("round_end", round=self.round, status=status, messages=self._seq)
+        self.round = None
+        self._initiator = None
+
+    def _on_send(self, sender, message, recipient, silent):
+        """process_message_before_send 钩子：记录消息后原样返回"""
+        if self.round is not None:
+            now = time.perf_counter()
+            content = message.get("content", "") if isinstance(message, dict) else message
+            self._seq += 1
+            self._write(
+                "message",
+                round=self.round,
+                seq=self._seq,
+                # 与 ChatResult.chat_history 一致：发起方为 assistant，对方为 user
+                role="assistant" if sender is self._initiator else "user",
+                name=getattr(sender, "name", None),
+                content=content if isinstance(content, str) else json.dumps(content, ensure_ascii=False),
+                latency_ms=round((now - self._last_time) * 1000)
+            )
+            self._last_time = now
+        return message
+
+    def conversation(self, round_name):
+        """从日志读取某轮的对话记录 [{role, name, content, timestamp, latency_ms}]"""
+        if self._file is not None:
+            self._file.flush()
+        return [
+            {key: entry.get(key) for key in ("role", "name", "content", "timestamp", "latency_ms")}
+            for entry in read_journal(self.path)
+            if entry.get("event") == "message" and entry.get("round") == round_name
+        ]
+
+    def close(self, status="completed"):
+        """结束面试并关闭日志文件"""
+        if self._file is None:
+            return
+        self.end_round()
+        self._write("interview_end", status=status)
+        self._file.close()
+        self._file = None
@@ -6,11 +6,19 @@ Adzuna API MCP 服务器
 
 import asyncio
 import json
+import sys
 import aiohttp
-from typing import Optional, Dict, Any
+from pathlib import Path
+from typing import Optional, Dict, Any, List
 from mcp.server import Server
 from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
+from mcp.types import TextContent, Tool
+
+# 与客户端共用的薪资统计引擎：只导入模块本身，不导入 agents 包
+# （包初始化会加载 autogen 并向 stdout 输出，干扰 stdio 协议）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "agents"))
+from salary_stats import QuantileSketch
 
 # Adzuna API 配置（从环境变量读取，避免明文）
 import os
@@ -25,123 +33,338 @@ ADZUNA_APP_ID = os.getenv("ADZUNA_APP_ID", "")
 ADZUNA_APP_KEY = os.getenv("ADZUNA_APP_KEY", "")
 ADZUNA_BASE_URL = os.getenv("ADZUNA_BASE_URL", "https://api.adzuna.com/v1/api/jobs/gb/search/1")
 
+# HTTP 连接池配置（总连接数、单主机连接数、空闲连接保活秒数）
+ADZUNA_HTTP_LIMIT = int(os.getenv("ADZUNA_HTTP_LIMIT", "32"))
+ADZUNA_HTTP_LIMIT_PER_HOST = int(os.getenv("ADZUNA_HTTP_LIMIT_PER_HOST", "16"))
+ADZUNA_HTTP_KEEPALIVE = float(os.getenv("ADZUNA_HTTP_KEEPALIVE", "60"))
+# 单次 Adzuna 请求的超时秒数
+ADZUNA_REQUEST_TIMEOUT = float(os.getenv("ADZUNA_REQUEST_TIMEOUT", "15"))
+
+# 批量查询的最大并发请求数
+ADZUNA_BATCH_CONCURRENCY = int(os.getenv("ADZUNA_BATCH_CONCURRENCY", "8"))
+
+# 多页抓取时单个查询的最大并发页数
+ADZUNA_PAGE_CONCURRENCY = int(os.getenv("ADZUNA_PAGE_CONCURRENCY", "4"))
+
+# 工具参数（JSON Schema）
+_PAGING_PROPERTIES = {
+    "results_per_page": {"type": "integer", "description": "每页返回结果数量", "default": 50},
+    "pages": {"type": "integer", "description": "并发抓取的页数", "default": 1},
+    "min_samples": {"type": "integer", "description": "样本数达到后提前结束（0表示抓取全部页面）", "default": 0}
+}
+
+TOOL_SCHEMAS = [
+    {
+        "name": "get_market_salary_data",
+        "description": "获取指定职位和地点的市场薪资数据",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "position": {"type": "string", "description": "职位名称", "default": "Python Developer"},
+                "location": {"type": "string", "description": "地点", "default": "London"},
+                **_PAGING_PROPERTIES
+            }
+        }
+    },
+    {
+        "name": "get_market_salary_data_batch",
+        "description": "批量获取多个职位和地点的市场薪资数据（一次调用，并发请求）",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "queries": {
+                    "type": "array",
+                    "description": "查询列表，每项包含 position 和 location",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "position": {"type": "string"},
+                            "location": {"type": "string"}
+                        }
+                    }
+                },
+                **_PAGING_PROPERTIES
+            },
+            "required": ["queries"]
+        }
+    },
+    {
+        "name": "get_salary_statistics",
+        "description": "获取薪资统计信息",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "position": {"type": "string", "description": "职位名称", "default": "Python Developer"},
+                "location": {"type": "string", "description": "地点", "default": "London"}
+            }
+        }
+    }
+]
+
+def adzuna_page_url(page: int) -> str:
+    """Adzuna 搜索接口指定页码的 URL（ADZUNA_BASE_URL 以页码结尾）"""
+    base_url = ADZUNA_BASE_URL.rstrip('/')
+    head, _, last = base_url.rpartition('/')
+    if last.isdigit():
+        return f"{head}/{page}"
+    return f"{base_url}/{page}"
+
 class AdzunaMCPServer:
     def __init__(self):
         self.server = Server("adzuna-api", version="1.0.0")
+        self.http_session = None
         self.setup_tools()
     
-    def setup_tools(self):
-        """设置 MCP 工具"""
+    async def get_http_session(self) -> aiohttp.ClientSession:
+        """获取服务器生命周期内共享的 HTTP 会话（复用连接和 TLS 会话）"""
+        if self.http_session is None or self.http_session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=ADZUNA_HTTP_LIMIT,
+                limit_per_host=ADZUNA_HTTP_LIMIT_PER_HOST,
+                keepalive_timeout=ADZUNA_HTTP_KEEPALIVE,
+                ttl_dns_cache=300
+            )
+            self.http_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=ADZUNA_REQUEST_TIMEOUT)
+            )
+        return self.http_session
+    
+    async def close(self):
+        """关闭共享的 HTTP 会话"""
+        if self.http_session is not None and not self.http_session.closed:
+            await self.http_session.close()
+    
+    async def fetch_salary_data(
+        self,
+        position: str,
+        location: str,
+        results_per_page: int = 50,
+        pages: int = 1,
+        min_samples: int = 0
+    ) -> Dict[str, Any]:
+        """请求 Adzuna API 并分析薪资数据
         
-        @self.server.call_tool()
-        async def get_market_salary_data(
-            position: str = "Python Developer",
-            location: str = "London",
-            results_per_page: int = 50
-        ) -> Dict[str, Any]:
-            """
-            获取指定职位和地点的市场薪资数据
+        并发抓取多页结果，每页到达后立即折叠进运行统计；
+        样本数达到 min_samples（大于0时）后取消剩余页面的请求。
+        """
+        try:
+            # 构建 API 参数
+            params = {
+                'app_id': ADZUNA_APP_ID,
+                'app_key': ADZUNA_APP_KEY,
+                'results_per_page': results_per_page,
+                'what': position,
+                'where': location
+            }
             
-            Args:
-                position: 职位名称
-                location: 地点
-                results_per_page: 返回结果数量
+            session = await self.get_http_session()
+            semaphore = asyncio.Semaphore(max(1, ADZUNA_PAGE_CONCURRENCY))
+            stats = self.new_salary_stats()
+            errors = []
             
-            Returns:
-                包含市场薪资数据的字典
-            """
-            try:
-                # 构建 API 参数
-                params = {
-                    'app_id': ADZUNA_APP_ID,
-                    'app_key': ADZUNA_APP_KEY,
-                    'results_per_page': results_per_page,
-                    'what': position,
-                    'where': location
-                }
-                
-                # 调用 Adzuna API
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(ADZUNA_BASE_URL, params=params) as response:
+            async def fetch_page(page: int) -> Optional[Dict[str, Any]]:
+                async with semaphore:
+                    async with session.get(adzuna_page_url(page), params=params) as response:
                         if response.status == 200:
-                            data = await response.json()
-                            return self.analyze_salary_data(data)
-                        else:
-                            return {
-                                "error": f"API 请求失败: {response.status}",
-                                "success": False
-                            }
-            except Exception as e:
+                            return await response.json()
+                        errors.append(f"API 请求失败: {response.status}")
+                        return None
+            
+            # 调用 Adzuna API
+            tasks = [asyncio.create_task(fetch_page(page)) for page in range(1, max(1, pages) + 1)]
+            try:
+                for next_page in asyncio.as_completed(tasks):
+                    data = await next_page
+                    if data:
+                        # 折叠后不再保留原始职位数据
+                        self.fold_salary_page(stats, data)
+                    if min_samples and stats["count"] >= min_samples:
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            
+            if not stats["count"] and errors:
                 return {
-                    "error": f"获取市场薪资数据失败: {str(e)}",
+                    "error": errors[0],
                     "success": False
                 }
+            return self.salary_stats_result(stats)
+        except Exception as e:
+            return {
+                "error": f"获取市场薪资数据失败: {str(e)}",
+                "success": False
+            }
+    
+    async def get_market_salary_data(
+        self,
+        position: str = "Python Developer",
+        location: str = "London",
+        results_per_page: int = 50,
+        pages: int = 1,
+        min_samples: int = 0
+    ) -> Dict[str, Any]:
+        """
+        获取指定职位和地点的市场薪资数据
+        
+        Args:
+            position: 职位名称
+            location: 地点
+            results_per_page: 每页返回结果数量
+            pages: 并发抓取的页数
+            min_samples: 样本数达到后提前结束（0表示抓取全部页面）
+        
+        Returns:
+            包含市场薪资数据的字典
+        """
+        return await self.fetch_salary_data(position, location, results_per_page, pages, min_samples)
+    
+    async def get_market_salary_data_batch(
+        self,
+        queries: List[Dict[str, str]],
+        results_per_page: int = 50,
+        pages: int = 1,
+        min_samples: int = 0
+    ) -> Dict[str, Any]:
+        """
+        批量获取多个职位和地点的市场薪资数据（一次调用，并发请求）
+        
+        Args:
+            queries: 查询列表，每项包含 position 和 location
+            results_per_page: 每页返回结果数量
+            pages: 每个查询并发抓取的页数
+            min_samples: 样本数达到后提前结束（0表示抓取全部页面）
+        
+        Returns:
+            results 列表，顺序与 queries 一致，每项包含 position、location 和薪资数据
+        """
+        semaphore = asyncio.Semaphore(ADZUNA_BATCH_CONCURRENCY)
+        
+        async def fetch_one(position: str, location: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.fetch_salary_data(position, location, results_per_page, pages, min_samples)
+        
+        # 相同的职位和地点只请求一次
+        pairs = [
+            (query.get("position", "Python Developer"), query.get("location", "London"))
+            for query in queries
+        ]
+        unique_pairs = list(dict.fromkeys(pairs))
+        fetched = await asyncio.gather(*(fetch_one(p, l) for p, l in unique_pairs))
+        results_by_pair = dict(zip(unique_pairs, fetched))
+        
+        return {
+            "results": [
+                {"position": p, "location": l, **results_by_pair[(p, l)]}
+                for p, l in pairs
+            ],
+            "success": True
+        }
+    
+    async def get_salary_statistics(
+        self,
+        position: str = "Python Developer",
+        location: str = "London"
+    ) -> Dict[str, Any]:
+        """
+        获取薪资统计信息
+        
+        Args:
+            position: 职位名称
+            location: 地点
+        
+        Returns:
+            薪资统计信息
+        """
+        result = await self.fetch_salary_data(position, location)
+        if result.get("success", True):
+            return {
+                "position": position,
+                "location": location,
+                "average_salary": result.get("average_salary"),
+                "min_salary": result.get("min_salary"),
+                "max_salary": result.get("max_salary"),
+                "sample_count": result.get("sample_count"),
+                "currency": result.get("currency", "GBP")
+            }
+        else:
+            return result
+    
+    def setup_tools(self):
+        """设置 MCP 工具
+        
+        低层 Server 只有一个 call_tool 处理函数，按工具名分发到对应方法；
+        list_tools 返回工具列表，客户端启动时据此发现工具。
+        """
+        handlers = {
+            "get_market_salary_data": self.get_market_salary_data,
+            "get_market_salary_data_batch": self.get_market_salary_data_batch,
+            "get_salary_statistics": self.get_salary_statistics
+        }
+        
+        @self.server.list_tools()
+        async def list_tools() -> List[Tool]:
+            return [Tool(**schema) for schema in TOOL_SCHEMAS]
         
         @self.server.call_tool()
-        async def get_salary_statistics(
-            position: str = "Python Developer",
-            location: str = "London"
-        ) -> Dict[str, Any]:
-            """
-            获取薪资统计信息
-            
-            Args:
-                position: 职位名称
-                location: 地点
-            
-            Returns:
-                薪资统计信息
-            """
-            result = await get_market_salary_data(position, location)
-            if result.get("success", True):
-                return {
-                    "position": position,
-                    "location": location,
-                    "average_salary": result.get("average_salary"),
-                    "min_salary": result.get("min_salary"),
-                    "max_salary": result.get("max_salary"),
-                    "sample_count": result.get("sample_count"),
-                    "currency": result.get("currency", "GBP")
-                }
-            else:
-                return result
+        async def call_tool(name: str, arguments: Optional[Dict[str, Any]]) -> List[TextContent]:
+            handler = handlers.get(name)
+            if handler is None:
+                raise ValueError(f"未知工具: {name}")
+            result = await handler(**(arguments or {}))
+            return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+    
+    @staticmethod
+    def new_salary_stats() -> Dict[str, Any]:
+        """创建空的薪资运行统计（样本进入与客户端相同的分位数草图）"""
+        return {"count": 0, "total": 0.0, "sketch": QuantileSketch()}
+    
+    @staticmethod
+    def fold_salary_page(stats: Dict[str, Any], api_data: Dict[str, Any]) -> int:
+        """将一页 API 结果折叠进运行统计，返回本页有效样本数"""
+        added = 0
+        for job in api_data.get('results', []):
+            salary_min = job.get('salary_min')
+            salary_max = job.get('salary_max')
+            if salary_min and salary_max:
+                salary = (salary_min + salary_max) / 2
+                stats["count"] += 1
+                stats["total"] += salary
+                stats["sketch"].add(salary)
+                added += 1
+        return added
+    
+    @staticmethod
+    def salary_stats_result(stats: Dict[str, Any]) -> Dict[str, Any]:
+        """运行统计转换为工具返回结果"""
+        if not stats["count"]:
+            return {
+                "error": "未找到有效的薪资数据",
+                "success": False,
+                "no_data": True
+            }
+        
+        # 分位数网格、直方图和截尾均值与客户端 SalaryAccumulator 使用同一引擎计算
+        result = stats["sketch"].statistics()
+        result['average_salary'] = round(stats["total"] / stats["count"], 2)
+        result['success'] = True
+        return result
     
     def analyze_salary_data(self, api_data: Dict[str, Any]) -> Dict[str, Any]:
-        """分析 API 返回的薪资数据"""
+        """分析 API 返回的单页薪资数据"""
         try:
-            results = api_data.get('results', [])
-            if not results:
+            if not api_data.get('results', []):
                 return {
                     "error": "未找到相关职位数据",
-                    "success": False
+                    "success": False,
+                    "no_data": True
                 }
-                
-            salaries = []
-            for job in results:
-                salary_min = job.get('salary_min')
-                salary_max = job.get('salary_max')
-                if salary_min and salary_max:
-                    avg_salary = (salary_min + salary_max) / 2
-                    salaries.append(avg_salary)
             
-            if salaries:
-                avg_market_salary = sum(salaries) / len(salaries)
-                min_salary = min(salaries)
-                max_salary = max(salaries)
-                
-                return {
-                    'average_salary': round(avg_market_salary, 2),
-                    'min_salary': round(min_salary, 2),
-                    'max_salary': round(max_salary, 2),
-                    'sample_count': len(salaries),
-                    'currency': 'GBP',
-                    'success': True
-                }
-            else:
-                return {
-                    "error": "未找到有效的薪资数据",
-                    "success": False
-                }
+            stats = self.new_salary_stats()
+            self.fold_salary_page(stats, api_data)
+            return self.salary_stats_result(stats)
         except Exception as e:
             return {
                 "error": f"分析薪资数据失败: {str(e)}",
@@ -153,19 +376,22 @@ async def main():
     server = AdzunaMCPServer()
     
     # 创建 stdio 服务器
-    async with stdio_server() as (read_stream, write_stream):
-        await server.server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="adzuna-api",
-                server_version="1.0.0",
-                capabilities=server.server.get_capabilities(
-                    notification_options=None,
-                    experimental_capabilities=None,
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="adzuna-api",
+                    server_version="1.0.0",
+                    capabilities=server.server.get_capabilities(
+                        notification_options=None,
+                        experimental_capabilities=None,
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        await server.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
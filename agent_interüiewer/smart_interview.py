@@ -5,22 +5,57 @@
 """
 
 import os
+import sys
 import asyncio
+import argparse
 import json
+import contextvars
 from datetime import datetime
 
 # 导入分离的智能体
 from agents import (
+    OFFER_LOCALE,
+    RESULTS_JSON_EXPORT,
+    TranscriptJournal,
+    dedupe_offer_files,
+    get_blob_store,
+    migrate_results,
+    result_path_for,
+    write_result_file,
+    atomic_write_json,
+    interview_stamp,
+    new_interview_id,
+    unique_stamp,
+    follow_journal,
+    journal_path,
+    SKILL_CATEGORIES,
+    analyze_candidate,
+    close_mcp_pool,
     create_technical_interviewer,
     create_hr_interviewer,
     create_boss_interviewer,
     create_candidate_agent,
     create_score_evaluator,
     create_info_extractor,
-    generate_offer_letter,
-    should_generate_offer
+    generate_offer_letter_async,
+    get_results_store,
+    month_range,
+    get_salary_lookup_metrics,
+    import_salary_dumps,
+    regenerate_offers,
+    resolve_offer_position_async,
+    should_generate_offer,
+    start_market_salary_prefetch,
+    weighted_scores,
+    SalaryCacheWarmer,
+    warm_salary_cache,
+    warm_title_translations
 )
 
+# 职位推断使用的技能类别
+POSITION_INFERENCE_CATEGORIES = ["ai_ml", "data_science", "backend_dev", "frontend_dev",
+                                 "data_engineering", "cloud_devops", "mobile_dev"]
+
 # 加载环境变量（请在运行环境或 .env 中配置 API 密钥）
 try:
     from dotenv import load_dotenv
@@ -55,6 +90,13 @@ class ThreeRoleInterviewSystem:
             "overall_score": 0
         }
         self.offer_letter = None                # Offer通知信
+        self.candidate_info = {}                # 候选人信息
+        self.results_file = None                # 面试结果文件路径（导出JSON时）
+        self.result_id = None                   # 面试结果数据库记录ID
+        self.offer_file = None                  # Offer文件路径
+        self.salary_prefetch = None             # 市场薪资缓存预热（职位任务, 地点列表, 预取任务）
+        self.interview_id = None                # 面试ID
+        self.journal = None                     # 面试对话日志
     
     async def conduct_technical_interview(self):
         """进行技术面试"""
@@ -66,7 +108,8 @@ class ThreeRoleInterviewSystem:
         
         try:
             # 技术面试官发起对话
-            result = self.interviewer.initiate_chat(
+            self.journal.begin_round("technical_interview", self.interviewer)
+            result = await self.interviewer.a_initiate_chat(
                 self.user,
                 message="你好！我是今天的技术面试官，很高兴见到你。我们接下来会进行技术面试，主要了解你的技术背景、项目经验，以及解决技术问题的能力。首先，请你简单介绍一下自己的技术背景，包括你掌握的主要技术栈、最有代表性的一个项目，以及你在技术学习方面的规划。请放松，我们就像技术交流一样聊聊。",
                 max_turns=6
@@ -74,10 +117,12 @@ class ThreeRoleInterviewSystem:
             
             # 保存技术面试结果
             self.technical_interview_result = result
+            self.journal.end_round()
             
             print("\n技术面试完成")
             
         except Exception as e:
+            self.journal.end_round("failed")
             print(f"❌ 技术面试出错: {str(e)}")
     
     async def conduct_hr_interview(self):
@@ -90,7 +135,8 @@ class ThreeRoleInterviewSystem:
         
         try:
             # HR面试官发起对话
-            result = self.hr.initiate_chat(
+            self.journal.begin_round("hr_interview", self.hr)
+            result = await self.hr.a_initiate_chat(
                 self.user,
                 message="你好！我是今天的HR面试官，很高兴见到你。刚才的技术面试已经完成，现在我们来进行HR面试，主要了解你的个人背景、职业规划，以及对我们公司的了解。首先，请你介绍一下你的教育背景和工作经历、职业规划和发展目标，以及你对我们公司和这个职位的了解。请放松，我们聊聊你的职业发展。",
                 max_turns=6
@@ -98,10 +144,12 @@ class ThreeRoleInterviewSystem:
             
             # 保存HR面试结果
             self.hr_interview_result = result
+            self.journal.end_round()
             
             print("\nHR面试完成")
             
         except Exception as e:
+            self.journal.end_round("failed")
             print(f"❌ HR面试出错: {str(e)}")
     
     async def conduct_boss_interview(self):
@@ -135,7 +183,8 @@ class ThreeRoleInterviewSystem:
 请放松，我们就像技术同行一样交流。"""
 
             # Boss面试官发起对话
-            result = self.boss.initiate_chat(
+            self.journal.begin_round("boss_interview", self.boss)
+            result = await self.boss.a_initiate_chat(
                 self.user,
                 message=boss_message,
                 max_turns=4
@@ -143,10 +192,12 @@ class ThreeRoleInterviewSystem:
             
             # 保存Boss面试结果
             self.boss_interview_result = result
+            self.journal.end_round()
             
             print("\nBoss面试完成")
             
         except Exception as e:
+            self.journal.end_round("failed")
             print(f"❌ Boss面试出错: {str(e)}")
     
     async def generate_interview_scores(self):
@@ -210,7 +261,7 @@ class ThreeRoleInterviewSystem:
 """
             
             # 获取评分结果
-            score_result = score_agent.generate_reply(
+            score_result = await score_agent.a_generate_reply(
                 messages=[{"role": "user", "content": evaluation_content}]
             )
             
@@ -315,7 +366,7 @@ class ThreeRoleInterviewSystem:
                 conversation_summary += "Boss面试内容：已了解候选人的综合能力和发展潜力\n"
             
             # 获取候选人信息
-            candidate_info_result = info_extractor.generate_reply(
+            candidate_info_result = await info_extractor.a_generate_reply(
                 messages=[{"role": "user", "content": f"请从以下面试对话中提取候选人信息：\n{conversation_summary}"}]
             )
             
@@ -415,92 +466,26 @@ class ThreeRoleInterviewSystem:
         Returns:
             str: 推断的职位名称
         """
-        # 定义技能分类和权重
-        skill_categories = {
-            "ai_ml": {
-                "keywords": ["大模型", "LLM", "LoRA", "微调", "深度学习", "机器学习", "AI", "人工智能", "NLP", "自然语言处理", "计算机视觉", "推荐算法", "向量数据库", "FAISS", "Milvus", "LangChain", "RAG", "Prompt Engineering", "Transformer", "BERT", "GPT", "强化学习", "知识图谱"],
-                "positions": ["大模型算法工程师", "机器学习工程师", "AI工程师", "算法工程师", "NLP工程师"],
-                "weight": 1.5
-            },
-            "data_science": {
-                "keywords": ["数据分析", "数据挖掘", "数据可视化", "统计建模", "数据科学", "BI", "Tableau", "PowerBI", "数据建模"],
-                "positions": ["数据科学家", "数据分析师", "数据工程师"],
-                "weight": 1.3
-            },
-            "backend_dev": {
-                "keywords": ["Django", "Flask", "FastAPI", "MySQL", "PostgreSQL", "Redis", "Docker", "微服务", "高并发", "API", "后端", "Spring Boot", "Node.js", "Go", "微服务架构", "分布式系统", "Saga", "TCC", "Seata"],
-                "positions": ["Python开发工程师", "后端开发工程师", "云原生后端工程师", "系统工程师"],
-                "weight": 1.0
-            },
-            "frontend_dev": {
-                "keywords": ["React", "Vue", "Angular", "JavaScript", "TypeScript", "前端", "UI/UX", "Web开发", "移动端", "小程序", "HTML", "CSS"],
-                "positions": ["前端开发工程师", "UI/UX工程师", "全栈开发工程师"],
-                "weight": 0.8
-            },
-            "data_engineering": {
-                "keywords": ["数据工程", "ETL", "数据仓库", "Spark", "Hadoop", "Kafka", "数据湖", "数据管道", "数据治理", "数据平台"],
-                "positions": ["数据工程师", "数据平台工程师", "大数据工程师"],
-                "weight": 1.2
-            },
-            "cloud_devops": {
-                "keywords": ["Kubernetes", "AWS", "Azure", "GCP", "云原生", "DevOps", "CI/CD", "Jenkins", "GitLab", "监控", "日志", "容器化", "阿里云", "腾讯云"],
-                "positions": ["DevOps工程师", "云原生工程师", "运维工程师"],
-                "weight": 1.1
-            },
-            "mobile_dev": {
-                "keywords": ["Android", "iOS", "移动开发", "React Native", "Flutter", "移动端"],
-                "positions": ["移动开发工程师", "Android开发工程师", "iOS开发工程师"],
-                "weight": 0.9
-            }
-        }
-        
-        # 计算每个类别的得分
-        category_scores = {}
-        for category, config in skill_categories.items():
-            score = 0
-            for skill in skills:
-                for keyword in config["keywords"]:
-                    if keyword in skill:
-                        score += 1
-                        break  # 每个技能只计算一次
-            
-            # 考虑项目经验
-            for project in projects:
-                for keyword in config["keywords"]:
-                    if keyword in project:
-                        score += 0.5  # 项目经验权重较低
-                        break
-            
-            category_scores[category] = score * config["weight"]
+        # 一次扫描计算各技能类别得分（项目经验按0.5个技能计算）
+        analysis = analyze_candidate(skills, projects)
+        category_scores = weighted_scores(analysis, POSITION_INFERENCE_CATEGORIES, project_weight=0.5)
+        signals = analysis["skill_signals"]
         
         # 找出得分最高的类别
         if category_scores:
-            # 打印调试信息
-            print("=== 职位推断调试信息 ===")
-            for category, score in sorted(category_scores.items(), key=lambda x: x[1], reverse=True):
-                print(f"{category}: {score}")
-            
             top_category = max(category_scores.items(), key=lambda x: x[1])
             if top_category[1] > 0:
                 # 根据得分选择具体职位
-                category_config = skill_categories[top_category[0]]
-                positions = category_config["positions"]
+                positions = SKILL_CATEGORIES[top_category[0]]["positions"]
                 
                 # 特殊处理：如果候选人明确有大模型相关技能和项目，优先考虑AI/ML职位
-                ai_ml_indicators = [
-                    any("大模型" in skill for skill in skills),
-                    any("LLM" in skill for skill in skills),
-                    any("LoRA" in skill for skill in skills),
-                    any("大模型" in project for project in projects),
-                    any("LLM" in project for project in projects),
-                    any("LoRA" in project for project in projects)
-                ]
+                ai_ml_indicators = {"llm", "lora"} & (signals | analysis["project_signals"])
                 
-                if any(ai_ml_indicators) and top_category[0] in ["ai_ml", "backend_dev"]:
+                if ai_ml_indicators and top_category[0] in ["ai_ml", "backend_dev"]:
                     print("检测到大模型相关技能/项目，优先考虑AI/ML职位")
-                    if any("大模型" in skill or "LLM" in skill for skill in skills):
+                    if "llm" in signals:
                         return "大模型算法工程师"
-                    elif any("机器学习" in skill or "深度学习" in skill for skill in skills):
+                    elif "ml" in signals:
                         return "机器学习工程师"
                     else:
                         return "AI工程师"
@@ -508,15 +493,15 @@ class ThreeRoleInterviewSystem:
                 # 根据技能特点选择最合适的职位
                 if top_category[0] == "ai_ml":
                     # AI/ML类别，进一步细分
-                    if any("大模型" in skill or "LLM" in skill for skill in skills):
+                    if "llm" in signals:
                         return "大模型算法工程师"
-                    elif any("机器学习" in skill or "深度学习" in skill for skill in skills):
+                    elif "ml" in signals:
                         return "机器学习工程师"
                     else:
                         return "AI工程师"
                 elif top_category[0] == "backend_dev":
                     # 后端开发类别
-                    if any("云原生" in skill or "微服务" in skill for skill in skills):
+                    if "cloud_native" in signals:
                         return "云原生后端工程师"
                     else:
                         return "Python开发工程师"
@@ -544,8 +529,8 @@ class ThreeRoleInterviewSystem:
                 "candidate_profile": self.candidate_info
             }
             
-            # 生成offer通知信
-            self.offer_letter = generate_offer_letter(interview_data)
+            # 生成offer通知信（优先使用面试期间预取的市场薪资数据）
+            self.offer_letter = await self._generate_offer_letter(interview_data)
             
             print("✅ Offer通知信生成完成！")
             print("\n" + "=" * 80)
@@ -554,27 +539,38 @@ class ThreeRoleInterviewSystem:
             print(self.offer_letter)
             print("=" * 80)
             
-            # 保存offer到文件
-            current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # 保存offer到文件（与面试结果文件使用同一面试ID）
+            self.interview_id = self.interview_id or new_interview_id()
+            stamp = interview_stamp(self.interview_id)
             
             # 获取候选人名字
-            candidate_name = self.candidate_info.get('name', f"候选人_{current_time}")
+            candidate_name = self.candidate_info.get('name', f"候选人_{stamp}")
             
-            # 创建候选人文件夹（如果不存在）
+            # 写入候选人文件夹（指向内容寻址存储的硬链接，内容相同的 offer 只存一份）
             candidate_folder = f"data/interview_results/60plus/{candidate_name}"
-            if not os.path.exists(candidate_folder):
-                os.makedirs(candidate_folder)
-            
-            offer_filename = f"{candidate_folder}/offer_letter_{current_time}.txt"
-            
-            with open(offer_filename, 'w', encoding='utf-8') as f:
-                f.write(self.offer_letter)
+            offer_filename = f"{candidate_folder}/offer_letter_{stamp}.txt"
+            get_blob_store().write_linked(offer_filename, self.offer_letter)
+            self.offer_file = offer_filename
+            if self.result_id:
+                position_info = await resolve_offer_position_async(self.candidate_info)
+                get_results_store().record_offer(
+                    self.result_id, offer_filename, self.offer_letter, position_info["refined_position"]
+                )
             
             print(f"\nOffer通知信已保存到: {offer_filename}")
             
         except Exception as e:
             print(f"❌ 生成offer通知信失败: {str(e)}")
     
+    async def _generate_offer_letter(self, interview_data):
+        """生成offer通知信
+        
+        面试期间的预取已预热薪资缓存，这里仍按 SALARY_LOOKUP_TIMEOUT 查询各地点：
+        预取已完成的直接命中缓存，仍在进行的在时限内等待同一请求，职位变化时按新职位查询。
+        """
+        locations = self.salary_prefetch[1] if self.salary_prefetch else None
+        return await generate_offer_letter_async(interview_data, locations=locations)
+    
     async def generate_interview_summary(self):
         """生成面试总结"""
         print("\n面试总结报告")
@@ -615,111 +611,40 @@ class ThreeRoleInterviewSystem:
         print("  - 可继续使用career_agent工具进行技能评估")
         print("  - 制定个人发展计划")
     
+    def _round_conversation(self, round_name, result, label):
+        """某轮面试的对话内容：优先读取对话日志（真实时间和回复耗时），没有日志时从对话结果提取"""
+        if self.journal:
+            conversation = self.journal.conversation(round_name)
+            if conversation:
+                return conversation
+        if not result:
+            return []
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            messages = getattr(result, 'chat_history', None) or getattr(result, 'messages', None)
+            if messages:
+                return [{
+                    "role": msg.get("role", "unknown"),
+                    "content": msg.get("content", ""),
+                    "timestamp": now
+                } for msg in messages]
+            # 如果无法提取具体对话，至少保存面试完成信息
+            return [{"role": "system", "content": f"{label}已完成，对话内容已记录", "timestamp": now}]
+        except Exception as e:
+            print(f"提取{label}对话失败: {e}")
+            return [{"role": "system", "content": f"{label}已完成", "timestamp": now}]
+    
     async def save_interview_results(self):
         """保存面试结果到JSON文件"""
         try:
-            # 获取当前时间
-            current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
-            # 提取面试对话内容
-            technical_conversation = []
-            hr_conversation = []
-            boss_conversation = []
+            # 面试ID（面试开始时生成），结果文件名使用其中的唯一时间戳
+            self.interview_id = self.interview_id or new_interview_id()
+            stamp = interview_stamp(self.interview_id)
             
-            # 提取技术面试对话内容
-            if self.technical_interview_result:
-                try:
-                    # 尝试从对话结果中提取消息
-                    if hasattr(self.technical_interview_result, 'messages'):
-                        for msg in self.technical_interview_result.messages:
-                            technical_conversation.append({
-                                "role": msg.get("role", "unknown"),
-                                "content": msg.get("content", ""),
-                                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                            })
-                    elif hasattr(self.technical_interview_result, 'chat_history'):
-                        for msg in self.technical_interview_result.chat_history:
-                            technical_conversation.append({
-                                "role": getattr(msg, 'role', 'unknown'),
-                                "content": getattr(msg, 'content', ''),
-                                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                            })
-                    else:
-                        # 如果无法提取具体对话，至少保存面试完成信息
-                        technical_conversation.append({
-                            "role": "system",
-                            "content": "技术面试已完成，对话内容已记录",
-                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        })
-                except Exception as e:
-                    print(f"提取技术面试对话失败: {e}")
-                    technical_conversation.append({
-                        "role": "system",
-                        "content": "技术面试已完成",
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    })
-            
-            # 提取HR面试对话内容
-            if self.hr_interview_result:
-                try:
-                    if hasattr(self.hr_interview_result, 'messages'):
-                        for msg in self.hr_interview_result.messages:
-                            hr_conversation.append({
-                                "role": msg.get("role", "unknown"),
-                                "content": msg.get("content", ""),
-                                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                            })
-                    elif hasattr(self.hr_interview_result, 'chat_history'):
-                        for msg in self.hr_interview_result.chat_history:
-                            hr_conversation.append({
-                                "role": getattr(msg, 'role', 'unknown'),
-                                "content": getattr(msg, 'content', ''),
-                                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                            })
-                    else:
-                        hr_conversation.append({
-                            "role": "system",
-                            "content": "HR面试已完成，对话内容已记录",
-                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        })
-                except Exception as e:
-                    print(f"提取HR面试对话失败: {e}")
-                    hr_conversation.append({
-                        "role": "system",
-                        "content": "HR面试已完成",
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    })
-            
-            # 提取Boss面试对话内容
-            if self.boss_interview_result:
-                try:
-                    if hasattr(self.boss_interview_result, 'messages'):
-                        for msg in self.boss_interview_result.messages:
-                            boss_conversation.append({
-                                "role": msg.get("role", "unknown"),
-                                "content": msg.get("content", ""),
-                                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                            })
-                    elif hasattr(self.boss_interview_result, 'chat_history'):
-                        for msg in self.boss_interview_result.chat_history:
-                            boss_conversation.append({
-                                "role": getattr(msg, 'role', 'unknown'),
-                                "content": getattr(msg, 'content', ''),
-                                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                            })
-                    else:
-                        boss_conversation.append({
-                            "role": "system",
-                            "content": "Boss面试已完成，对话内容已记录",
-                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        })
-                except Exception as e:
-                    print(f"提取Boss面试对话失败: {e}")
-                    boss_conversation.append({
-                        "role": "system",
-                        "content": "Boss面试已完成",
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    })
+            # 面试对话内容（来自对话日志）
+            technical_conversation = self._round_conversation("technical_interview", self.technical_interview_result, "技术面试")
+            hr_conversation = self._round_conversation("hr_interview", self.hr_interview_result, "HR面试")
+            boss_conversation = self._round_conversation("boss_interview", self.boss_interview_result, "Boss面试")
             
             # 创建面试结果数据
             interview_results = {
@@ -727,7 +652,8 @@ class ThreeRoleInterviewSystem:
                     "candidate_name": getattr(self, 'candidate_info', {}).get('name', '候选人'),
                     "position": getattr(self, 'candidate_info', {}).get('target_position', '应聘职位'),
                     "interview_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "interview_id": f"INT_{current_time}",
+                    "interview_id": self.interview_id,
+                    "transcript_journal": self.journal.path if self.journal else None,
                     "total_score": self.interview_scores["overall_score"]
                 },
                 "interview_scores": self.interview_scores,
@@ -813,7 +739,7 @@ class ThreeRoleInterviewSystem:
             }
             
             # 获取候选人名字
-            candidate_name = self.candidate_info.get('name', f"候选人_{current_time}")
+            candidate_name = self.candidate_info.get('name', f"候选人_{stamp}")
             
             # 根据分数确定保存文件夹
             overall_score = self.interview_scores["overall_score"]
@@ -822,27 +748,38 @@ class ThreeRoleInterviewSystem:
             else:
                 base_folder = "data/interview_results/below60"
             
-            # 创建以候选人名字命名的文件夹
-            candidate_folder = f"{base_folder}/{candidate_name}"
-            if not os.path.exists(candidate_folder):
-                os.makedirs(candidate_folder)
-                print(f"创建候选人文件夹: {candidate_folder}")
+            filename = None
+            if RESULTS_JSON_EXPORT:
+                # 导出到以候选人名字命名的文件夹（原子写入，自动创建文件夹）
+                candidate_folder = f"{base_folder}/{candidate_name}"
+                filename = result_path_for(candidate_folder, stamp)
+                write_result_file(filename, interview_results)
+                self.results_file = filename
             
-            # 保存到JSON文件
-            filename = f"{candidate_folder}/interview_results_{current_time}.json"
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(interview_results, f, ensure_ascii=False, indent=2)
+            # 保存到面试结果数据库（评分、资料、对话记录在一个事务中写入）
+            self.result_id = get_results_store().save_result(interview_results, filename)
             
-            print(f"\n面试结果已保存到: {filename}")
+            if filename:
+                print(f"\n面试结果已保存到: {filename}")
+                print(f"保存位置: {candidate_folder}/")
+            else:
+                print(f"\n面试结果已保存到数据库（记录 {self.result_id}）")
             print(f"总分: {overall_score}/100")
-            print(f"保存位置: {candidate_folder}/")
-            print("文件包含完整的面试对话内容和评分详情")
+            print("包含完整的面试对话内容和评分详情")
             
         except Exception as e:
             print(f"❌ 保存面试结果失败: {str(e)}")
     
-    async def conduct_full_interview(self):
-        """进行完整面试流程"""
+    async def conduct_full_interview(self, candidate_info=None):
+        """进行完整面试流程
+        
+        Args:
+            candidate_info (dict): 候选人信息，结构同 get_default_candidate_info()，
+                为空时使用默认候选人信息
+            
+        Returns:
+            dict: 面试结果概要（候选人、总分、结果文件、offer文件）
+        """
         print("智能面试系统 - 三角色面试")
         print("=" * 60)
         print("面试流程：技术面试 → HR面试 → Boss面试")
@@ -852,8 +789,9 @@ class ThreeRoleInterviewSystem:
         # 从candidate_agent.py动态获取默认候选人信息
         from agents.candidate_agent import get_default_candidate_info, create_candidate_agent
         
-        # 获取默认候选人信息
-        candidate_info = get_default_candidate_info()
+        # 未指定候选人时使用默认候选人信息
+        if candidate_info is None:
+            candidate_info = get_default_candidate_info()
         
         # 获取候选人职位信息
         target_position = candidate_info.get('target_position', 'Python开发工程师')
@@ -864,8 +802,17 @@ class ThreeRoleInterviewSystem:
         self.boss = create_boss_interviewer()
         self.user = create_candidate_agent(candidate_info)
         
-        # 保存候选人信息供后续使用
-        self.candidate_info = candidate_info
+        # 保存候选人信息供后续使用（复制一份，信息提取时的更新不影响调用方的名单）
+        self.candidate_info = dict(candidate_info)
+        
+        # 每条对话消息发送时写入对话日志
+        self.interview_id = new_interview_id()
+        self.journal = TranscriptJournal(self.interview_id)
+        self.journal.attach(self.interviewer, self.hr, self.boss, self.user)
+        print(f"对话日志: {self.journal.path}")
+        
+        # 职位已确定，面试期间在后台预取市场薪资数据
+        self.salary_prefetch = start_market_salary_prefetch(candidate_info)
         
         print("\n面试开始...")
         print("注意：现在是AI智能体自动对话演示。")
@@ -889,14 +836,19 @@ class ThreeRoleInterviewSystem:
             # 第三阶段：Boss面试
             await self.conduct_boss_interview()
             
-            # 生成评分
-            await self.generate_interview_scores()
-
-            # 提取候选人信息
-            await self.extract_candidate_info()
+            # 评分与候选人信息提取相互独立，并发执行
+            scores_task = asyncio.create_task(self.generate_interview_scores())
+            extract_task = asyncio.create_task(self.extract_candidate_info())
             
-            # 生成总结
-            await self.generate_interview_summary()
+            try:
+                # 生成总结（只依赖评分）
+                await scores_task
+                await self.generate_interview_summary()
+                
+                # 保存结果和生成offer需要评分和候选人信息
+                await extract_task
+            finally:
+                extract_task.cancel()
             
             # 保存面试结果
             await self.save_interview_results()
@@ -906,6 +858,275 @@ class ThreeRoleInterviewSystem:
             
         except Exception as e:
             print(f"❌ 面试过程中出现错误: {str(e)}")
+        finally:
+            self.journal.close()
+            # 未进入offer阶段时取消尚未完成的预取
+            for prefetch_task in (self.salary_prefetch[0], self.salary_prefetch[2]):
+                if not prefetch_task.done():
+                    prefetch_task.cancel()
+        
+        return {
+            "interview_id": self.interview_id,
+            "candidate_name": self.candidate_info.get('name', '候选人'),
+            "position": self.candidate_info.get('target_position', '应聘职位'),
+            "overall_score": self.interview_scores.get("overall_score", 0),
+            "results_file": self.results_file,
+            "offer_file": self.offer_file
+        }
+
+def load_candidate_roster(roster_path):
+    """读取候选人名单
+    
+    Args:
+        roster_path (str): JSON文件路径，内容为候选人信息列表，
+            每项结构同 get_default_candidate_info()
+            
+    Returns:
+        list: 候选人信息列表
+    """
+    with open(roster_path, 'r', encoding='utf-8') as f:
+        roster = json.load(f)
+    
+    if isinstance(roster, dict):
+        roster = roster.get("candidates", [])
+    if not isinstance(roster, list):
+        raise ValueError("候选人名单格式错误，应为候选人信息列表")
+    
+    return roster
+
+# 批量面试时当前任务的输出前缀（每个面试任务各自设置）
+_batch_log_prefix = contextvars.ContextVar("batch_log_prefix", default="")
+
+class BatchLogStream:
+    """批量面试期间替换 sys.stdout：每行输出前加上当前面试任务的前缀，并发面试的输出交错时仍可区分"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self._line_start = True
+    
+    def write(self, text):
+        prefix = _batch_log_prefix.get()
+        if not prefix:
+            if text:
+                self._line_start = text.endswith("\n")
+            return self.stream.write(text)
+        for line in text.splitlines(keepends=True):
+            if self._line_start:
+                self.stream.write(prefix)
+            self.stream.write(line)
+            self._line_start = line.endswith("\n")
+        return len(text)
+    
+    def flush(self):
+        self.stream.flush()
+    
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+async def run_batch_interviews(roster, concurrency=4):
+    """批量并发面试
+    
+    每个候选人使用独立的 ThreeRoleInterviewSystem（独立的智能体和输出文件），
+    所有面试共享同一事件循环，并通过信号量限制同时进行的面试数量。
+    
+    Args:
+        roster (list): 候选人信息列表
+        concurrency (int): 最大并发面试数
+        
+    Returns:
+        list: 每个候选人的面试结果概要，顺序与名单一致
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def run_one(index, candidate_info):
+        async with semaphore:
+            name = candidate_info.get('name', f"候选人_{index + 1}")
+            # gather 为每个面试创建独立的任务，前缀只对本任务（及其中启动的任务）生效
+            _batch_log_prefix.set(f"[{index + 1}/{len(roster)} {name}] ")
+            print("开始面试")
+            interview_system = ThreeRoleInterviewSystem()
+            try:
+                summary = await interview_system.conduct_full_interview(candidate_info)
+                summary["status"] = "completed"
+            except Exception as e:
+                print(f"❌ 面试失败: {str(e)}")
+                summary = {"candidate_name": name, "status": "failed", "error": str(e)}
+                if interview_system.interview_id:
+                    summary["interview_id"] = interview_system.interview_id
+            print(f"面试结束（面试ID: {interview_system.interview_id}）")
+            return summary
+    
+    stdout = sys.stdout
+    sys.stdout = BatchLogStream(stdout)
+    try:
+        return await asyncio.gather(*(run_one(i, info) for i, info in enumerate(roster)))
+    finally:
+        sys.stdout = stdout
+
+def save_batch_summary(summaries):
+    """保存批量面试结果概要到JSON文件"""
+    batch_folder = "data/interview_results/batches"
+    filename = f"{batch_folder}/batch_{unique_stamp()}.json"
+    atomic_write_json(filename, {
+        "batch_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "total": len(summaries),
+        "completed": sum(1 for s in summaries if s.get("status") == "completed"),
+        "salary_lookup": get_salary_lookup_metrics(),
+        "results": summaries
+    })
+    
+    return filename
+
+async def batch_main(roster_path, concurrency, warm_salary=False):
+    """批量面试入口"""
+    roster = load_candidate_roster(roster_path)
+    print(f"批量面试：共 {len(roster)} 位候选人，并发数 {concurrency}")
+    print("=" * 50)
+    
+    # 可选：批量面试期间在后台定时预热薪资缓存
+    warmer = SalaryCacheWarmer() if warm_salary else None
+    if warmer:
+        warmer.start()
+    
+    try:
+        summaries = await run_batch_interviews(roster, concurrency)
+    finally:
+        if warmer:
+            await warmer.stop()
+        await close_mcp_pool()
+    
+    print("\n批量面试结果")
+    print("=" * 50)
+    for summary in summaries:
+        if summary.get("status") == "completed":
+            print(f"{summary['candidate_name']}: {summary['overall_score']}/100")
+        else:
+            print(f"{summary['candidate_name']}: 失败（{summary.get('error', '未知错误')}）")
+    
+    metrics = get_salary_lookup_metrics()
+    print(f"\n薪资查询：{metrics['lookups']}次，超时{metrics['lookup_timeouts']}次，"
+          f"基准薪资回退{metrics['baseline_fallbacks']}次，熔断器状态 {metrics['breaker']['state']}")
+    
+    summary_file = save_batch_summary(summaries)
+    print(f"\n批量结果概要已保存到: {summary_file}")
+
+async def warm_salary_main(locations):
+    """薪资缓存预热入口"""
+    try:
+        await warm_salary_cache(locations)
+    finally:
+        await close_mcp_pool()
+
+async def regenerate_offers_main(base_dir, workers, locale, locations):
+    """批量重新生成offer入口"""
+    try:
+        await regenerate_offers(base_dir, workers, locale, locations)
+    finally:
+        await close_mcp_pool()
+
+def list_results_main(args):
+    """查询面试结果数据库"""
+    store = get_results_store()
+    if args.rebuild:
+        store.rebuild()
+    else:
+        store.ensure_indexed()
+    date_from, date_to = month_range() if args.this_month else (args.date_from, args.date_to)
+    records = store.query(
+        candidate=args.candidate,
+        score_band=args.band,
+        position=args.position,
+        date_from=date_from,
+        date_to=date_to,
+        min_score=args.min_score,
+        max_score=args.max_score,
+        tags=args.tag,
+        limit=args.limit
+    )
+    for record in records:
+        print(f"[{record['id']}] {record['interview_date']}  {record['candidate_name']}  {record['position']}  "
+              f"{record['total_score']}分（技术{record['technical_score']} / HR{record['hr_score']} / "
+              f"老板{record['boss_score']}）  {record['results_path'] or '仅数据库'}")
+    print(f"共 {len(records)} 条")
+
+def tail_transcript_main(interview):
+    """实时输出面试对话日志，面试结束时退出"""
+    path = interview if interview.endswith(".jsonl") else journal_path(interview)
+    print(f"正在跟踪对话日志: {path}")
+    for entry in follow_journal(path):
+        if entry["event"] == "message":
+            print(f"[{entry['timestamp']}] {entry['round']} #{entry['seq']} {entry['name']}"
+                  f"（{entry['latency_ms']}ms）: {entry['content']}")
+        else:
+            print(f"[{entry['timestamp']}] {entry['event']} {entry.get('round') or ''}")
+
+def load_title_list(paths):
+    """读取职位列表文件（JSON列表或每行一个职位）"""
+    titles = []
+    for path in paths or []:
+        with open(path, "r", encoding="utf-8") as f:
+            if path.endswith(".json"):
+                titles.extend(json.load(f))
+            else:
+                titles.extend(line.strip() for line in f if line.strip())
+    return titles
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="智能面试系统 - 三角色面试")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    batch_parser = subparsers.add_parser("batch", help="按候选人名单批量并发面试")
+    batch_parser.add_argument("roster", help="候选人名单JSON文件（候选人信息列表）")
+    batch_parser.add_argument("--concurrency", type=int, default=4, help="最大并发面试数（默认4）")
+    batch_parser.add_argument("--warm-salary", action="store_true", help="批量面试期间在后台定时预热薪资缓存")
+    
+    warm_parser = subparsers.add_parser("warm-salary", help="为所有已映射职位预热市场薪资缓存")
+    warm_parser.add_argument("--locations", nargs="+", help="地点列表（默认读取 SALARY_LOCATIONS）")
+    
+    import_parser = subparsers.add_parser("import-salary", help="将 Adzuna 原始结果页导入离线薪资快照")
+    import_parser.add_argument("paths", nargs="+", help="原始结果文件（.json/.jsonl）或目录")
+    import_parser.add_argument("--position", help="页面未记录 what 字段时使用的职位（英文）")
+    import_parser.add_argument("--location", help="页面未记录 where 字段时使用的地点")
+    
+    translate_parser = subparsers.add_parser("translate-titles", help="批量翻译未映射的中文职位并写入翻译缓存")
+    translate_parser.add_argument("titles", nargs="*", help="中文职位名称")
+    translate_parser.add_argument("--file", action="append", help="职位列表文件（JSON列表或每行一个职位，可重复指定）")
+    
+    regenerate_parser = subparsers.add_parser("regenerate-offers", help="按当前薪资策略为已保存的面试结果重新生成offer")
+    regenerate_parser.add_argument("--base-dir", default="data/interview_results/60plus", help="面试结果目录（默认 data/interview_results/60plus）")
+    regenerate_parser.add_argument("--workers", type=int, help="工作进程数（默认为CPU核数）")
+    regenerate_parser.add_argument("--locale", default=OFFER_LOCALE, help=f"offer语言（默认 {OFFER_LOCALE}）")
+    regenerate_parser.add_argument("--locations", nargs="+", help="工作地点列表（默认按候选人信息确定）")
+    
+    results_parser = subparsers.add_parser("list-results", help="查询已保存的面试结果")
+    results_parser.add_argument("--candidate", help="候选人姓名")
+    results_parser.add_argument("--band", choices=["60plus", "below60"], help="分数段")
+    results_parser.add_argument("--position", help="应聘职位")
+    results_parser.add_argument("--from", dest="date_from", help="起始日期，如 2025-01-01")
+    results_parser.add_argument("--to", dest="date_to", help="截止日期，如 2025-01-31")
+    results_parser.add_argument("--this-month", action="store_true", help="只查询本月的面试")
+    results_parser.add_argument("--min-score", type=float, help="最低总分")
+    results_parser.add_argument("--max-score", type=float, help="最高总分")
+    results_parser.add_argument("--tag", action="append", help="技能标签，如 llm、ai_ml（可重复，需全部匹配）")
+    results_parser.add_argument("--limit", type=int, default=20, help="最多显示条数（默认20）")
+    results_parser.add_argument("--rebuild", action="store_true", help="先从结果目录重新导入JSON结果")
+    
+    gc_parser = subparsers.add_parser("gc-blobs", help="删除内容寻址存储中不再被引用的 blob")
+    gc_parser.add_argument("--grace", type=int, help="保留最近写入的 blob（秒，默认读取 BLOB_GC_GRACE）")
+    gc_parser.add_argument("--dry-run", action="store_true", help="只统计不删除")
+    
+    dedupe_parser = subparsers.add_parser("dedupe-offers", help="将已有的 offer 文件改为共享存储（相同内容只存一份）")
+    dedupe_parser.add_argument("--base-dir", default="data/interview_results/60plus", help="面试结果目录（默认 data/interview_results/60plus）")
+    
+    migrate_parser = subparsers.add_parser("migrate-results", help="将已保存的 JSON 面试结果转换为压缩归档格式")
+    migrate_parser.add_argument("--base-dir", default="data/interview_results", help="面试结果目录（默认 data/interview_results）")
+    migrate_parser.add_argument("--keep-json", action="store_true", help="保留原 JSON 文件")
+    
+    tail_parser = subparsers.add_parser("tail-transcript", help="实时查看面试对话日志")
+    tail_parser.add_argument("interview", help="面试ID（如 INT_20250101_100000_000123_4242）或对话日志文件路径")
+    
+    return parser.parse_args()
 
 async def main():
     """主函数"""
@@ -922,11 +1143,36 @@ async def main():
     input("按回车键开始面试...")
     
     interview_system = ThreeRoleInterviewSystem()
-    await interview_system.conduct_full_interview()
+    try:
+        await interview_system.conduct_full_interview()
+    finally:
+        await close_mcp_pool()
 
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        asyncio.run(main())
+        if args.command == "batch":
+            asyncio.run(batch_main(args.roster, args.concurrency, args.warm_salary))
+        elif args.command == "warm-salary":
+            asyncio.run(warm_salary_main(args.locations))
+        elif args.command == "import-salary":
+            import_salary_dumps(args.paths, args.position, args.location)
+        elif args.command == "regenerate-offers":
+            asyncio.run(regenerate_offers_main(args.base_dir, args.workers, args.locale, args.locations))
+        elif args.command == "list-results":
+            list_results_main(args)
+        elif args.command == "gc-blobs":
+            get_results_store().gc_blobs(args.grace, args.dry_run)
+        elif args.command == "dedupe-offers":
+            dedupe_offer_files(args.base_dir)
+        elif args.command == "migrate-results":
+            migrate_results(args.base_dir, args.keep_json)
+        elif args.command == "tail-transcript":
+            tail_transcript_main(args.interview)
+        elif args.command == "translate-titles":
+            asyncio.run(warm_title_translations(args.titles + load_title_list(args.file)))
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         print("\n\n面试被中断")
     except Exception as e:
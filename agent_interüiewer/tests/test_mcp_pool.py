@@ -0,0 +1,50 @@
+"""MCP 会话启动：超时或被取消时不遗留服务器任务"""
+
+import asyncio
+import contextlib
+
+import pytest
+
+from agents import mcp_pool
+
+
+def hanging_session_factory(exited):
+    @contextlib.asynccontextmanager
+    async def create_session(server_params):
+        try:
+            await asyncio.sleep(3600)  # 握手一直没有完成
+            yield None
+        finally:
+            exited.append(server_params)
+    return create_session
+
+
+def test_start_timeout_closes_session(monkeypatch):
+    exited = []
+    monkeypatch.setattr(mcp_pool, "create_mcp_server_session", hanging_session_factory(exited), raising=False)
+    monkeypatch.setattr(mcp_pool, "ADZUNA_MCP_STARTUP_TIMEOUT", 0.01)
+    session = mcp_pool.MCPServerSession("params", 0)
+
+    async def start():
+        with pytest.raises(RuntimeError):
+            await session.start()
+        assert session._task.done()
+        assert exited == ["params"]
+
+    asyncio.run(start())
+
+
+def test_cancelled_start_closes_session(monkeypatch):
+    exited = []
+    monkeypatch.setattr(mcp_pool, "create_mcp_server_session", hanging_session_factory(exited), raising=False)
+    session = mcp_pool.MCPServerSession("params", 0)
+
+    async def cancel_start():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(session.start(), 0.01)
+        # 在事件循环结束前检查，asyncio.run 退出时会取消遗留任务
+        assert session._task.done()
+        assert exited == ["params"]
+
+    asyncio.run(cancel_start())
+    assert not session.alive
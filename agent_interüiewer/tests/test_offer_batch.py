@@ -0,0 +1,57 @@
+"""批量 offer：薪资数据按 (职位, 地点) 去重后一次批量查询"""
+
+import asyncio
+
+import pytest
+
+from agents import hr_offer_agent
+from agents.salary_cache import SalaryCache
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    cache = SalaryCache(str(tmp_path / "salary_cache.db"))
+    monkeypatch.setattr(hr_offer_agent, "get_salary_cache", lambda: cache)
+    monkeypatch.setattr(hr_offer_agent, "SALARY_SOURCE", "online")
+    yield cache
+    cache.close()
+
+
+def test_for_queries_uses_cache_and_one_batch_call(monkeypatch, cache):
+    cached = {"average_salary": 60000, "sample_count": 10}
+    cache.put("Data Scientist", "London", cached)
+    batches = []
+
+    async def fake_batch(queries):
+        batches.append(list(queries))
+        return {query: {"average_salary": 50000, "sample_count": 5} for query in queries}
+
+    monkeypatch.setattr(hr_offer_agent, "get_market_salary_data_batch", fake_batch)
+    queries = [("Data Scientist", "London"), ("Python Developer", "London"),
+               ("Python Developer", "Manchester"), ("Python Developer", "London")]
+    results = asyncio.run(hr_offer_agent.get_market_salary_data_for_queries(queries))
+
+    assert batches == [[("Python Developer", "London"), ("Python Developer", "Manchester")]]
+    assert results[("Data Scientist", "London")] == cached
+    assert results[("Python Developer", "Manchester")]["average_salary"] == 50000
+    # 批量结果写入缓存
+    assert cache.get_entry("Python Developer", "Manchester")[0]["average_salary"] == 50000
+
+
+def test_prepare_offer_batch_queries_salaries_once(monkeypatch, cache):
+    batches = []
+
+    async def fake_batch(queries):
+        batches.append(list(queries))
+        return {query: None for query in queries}
+
+    monkeypatch.setattr(hr_offer_agent, "get_market_salary_data_batch", fake_batch)
+    candidates = [
+        {"technical_skills": ["Django", "FastAPI", "Redis"], "locations": ["London", "Leeds"]},
+        {"technical_skills": ["Flask", "MySQL", "Docker"], "locations": ["London"]},
+    ]
+    prepared, locations_by_position = asyncio.run(hr_offer_agent.prepare_offer_batch(candidates))
+
+    assert len(batches) == 1
+    assert sorted(batches[0]) == sorted((p, l) for p, locs in locations_by_position.items() for l in locs)
+    assert [locs for _, _, locs, _ in prepared] == [["London", "Leeds"], ["London"]]
@@ -0,0 +1,79 @@
+"""向量职位分类器：模型加载失败只尝试一次，文本向量缓存只在有新向量时写入"""
+
+import numpy as np
+import pytest
+
+from agents import position_classifier
+from agents.position_classifier import PositionClassifier
+
+POSITION_MAPPING = {"机器学习工程师": "Machine Learning Engineer", "前端开发工程师": "Frontend Developer"}
+
+
+class FakeEncoder:
+    """按关键词生成二维向量：AI 相关文本靠近机器学习，其余靠近前端"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, **kwargs):
+        self.calls += 1
+        vectors = []
+        for text in texts:
+            ai = any(k in text for k in ("机器学习", "Machine Learning", "PyTorch", "LLM"))
+            vectors.append([1.0, 0.1] if ai else [0.1, 1.0])
+        vectors = np.array(vectors, dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_classify_and_save_cache_only_when_dirty(tmp_path):
+    encoder = FakeEncoder()
+    classifier = PositionClassifier(POSITION_MAPPING, cache_dir=tmp_path, encoder=encoder)
+
+    result = classifier.classify(["PyTorch"], ["LLM 微调"])
+    assert result["position"] == "机器学习工程师"
+    assert result["english_position"] == "Machine Learning Engineer"
+
+    classifier.save_cache()
+    cache_file = classifier._text_cache_path()
+    saved_at = cache_file.stat().st_mtime_ns
+
+    # 相同资料直接命中缓存，不编码也不重写缓存文件
+    calls = encoder.calls
+    classifier.classify(["PyTorch"], ["LLM 微调"])
+    classifier.save_cache()
+    assert encoder.calls == calls
+    assert cache_file.stat().st_mtime_ns == saved_at
+
+    # 新的分类器从持久化的缓存读取文本向量
+    reloaded = PositionClassifier(POSITION_MAPPING, cache_dir=tmp_path, encoder=FakeEncoder())
+    assert reloaded.classify(["PyTorch"], ["LLM 微调"])["position"] == "机器学习工程师"
+    assert reloaded._encoder.calls == 0
+
+
+def test_model_load_failure_is_remembered(monkeypatch, tmp_path):
+    attempts = []
+
+    def failing_model(name, device=None):
+        attempts.append(name)
+        raise OSError("无法下载模型")
+
+    monkeypatch.setattr(position_classifier, "EMBEDDING_AVAILABLE", True)
+    monkeypatch.setattr(position_classifier, "SentenceTransformer", failing_model, raising=False)
+    classifier = PositionClassifier(POSITION_MAPPING, cache_dir=tmp_path)
+
+    for _ in range(3):
+        with pytest.raises(Exception):
+            classifier.classify(["PyTorch"])
+    assert len(attempts) == 1
+    assert not classifier.available
+
+
+def test_shared_classifier_disabled_after_load_failure(monkeypatch, tmp_path):
+    classifier = PositionClassifier(POSITION_MAPPING, cache_dir=tmp_path)
+    classifier._load_error = OSError("无法下载模型")
+    monkeypatch.setattr(position_classifier, "POSITION_CLASSIFIER_ENABLED", True)
+    monkeypatch.setattr(position_classifier, "EMBEDDING_AVAILABLE", True)
+    monkeypatch.setattr(position_classifier, "_position_classifier", classifier)
+
+    assert not position_classifier.classifier_enabled()
+    assert position_classifier.classify_positions([(["PyTorch"], [])]) == [None]
@@ -0,0 +1,97 @@
+"""面试结果归档格式：打包/解包往返、文件读写与迁移"""
+
+import json
+
+from agents import result_archive
+from agents.result_archive import (
+    RESULT_ARCHIVE_SCHEMAS,
+    find_result_files,
+    load_result_file,
+    pack_result,
+    result_path_for,
+    result_stamp,
+    unpack_result,
+    write_result_file
+)
+
+
+def full_result():
+    """与 smart_interview 保存的结构相同：固定内容与模板一致，评分字段互相引用"""
+    scores = {
+        "technical_score": 82, "hr_score": 75, "boss_score": 80, "overall_score": 79.5,
+        "recommendation": "推荐录用", "evaluation_summary": "技术扎实",
+        "improvement_suggestions": ["加强系统设计"]
+    }
+    template = RESULT_ARCHIVE_SCHEMAS[1]
+    rounds = {}
+    for name, round_template in template["interview_rounds"].items():
+        rounds[name] = {key: value for key, value in round_template.items() if key != "score"}
+        rounds[name]["score"] = scores[name.replace("_interview", "_score")]
+        rounds[name]["conversation"] = [{"role": "user", "content": f"{name} 的问题", "timestamp": "2025-01-15 10:00:00"}]
+    return {
+        "interview_info": {"candidate_name": "张三", "position": "AI工程师", "total_score": 79.5,
+                           "interview_date": "2025-01-15 10:00:00"},
+        "interview_scores": scores,
+        "candidate_profile": {"name": "张三", "technical_skills": ["Python", "LLM"]},
+        "interview_rounds": rounds,
+        "interview_flow": json.loads(json.dumps(template["interview_flow"])),
+        "interview_summary": {
+            **{k: v for k, v in template["interview_summary"].items() if not isinstance(v, result_archive.SchemaRef)},
+            "overall_assessment": "技术扎实",
+            "final_recommendation": "推荐录用",
+            "improvement_suggestions": ["加强系统设计"]
+        }
+    }
+
+
+def test_pack_round_trip_and_deterministic():
+    result = full_result()
+    packed = pack_result(result)
+    assert unpack_result(packed) == result
+    assert pack_result(full_result()) == packed
+    # 固定内容不进入归档
+    assert len(packed) < len(json.dumps(result, ensure_ascii=False).encode("utf-8")) / 2
+
+
+def test_round_trip_keeps_differences_and_absent_fields():
+    result = full_result()
+    result["interview_rounds"]["hr_interview"]["summary"] = "自定义总结"
+    result["interview_info"]["total_score"] = 81          # 与引用的字段不同
+    del result["interview_flow"]["boss_evaluation_basis"]  # 模板中有而结果中没有
+    del result["interview_rounds"]["boss_interview"]
+    assert unpack_result(pack_result(result)) == result
+
+
+def test_files_round_trip_in_both_formats(tmp_path):
+    result = full_result()
+    json_path = result_path_for(tmp_path / "60plus" / "张三", "20250115_100000_000001_1", "json")
+    archive_path = result_path_for(tmp_path / "60plus" / "李四", "20250115_100000_000002_1", "archive")
+    for path in (json_path, archive_path):
+        write_result_file(path, result)
+        assert load_result_file(path) == result
+    assert json_path.endswith(".json") and archive_path.endswith(".json.gz")
+    assert result_stamp(archive_path) == "20250115_100000_000002_1"
+    assert [p.name for p in find_result_files(tmp_path / "60plus")] == [
+        "interview_results_20250115_100000_000001_1.json", "interview_results_20250115_100000_000002_1.json.gz"
+    ]
+
+
+def test_migrate_results_converts_json_and_updates_store(monkeypatch, tmp_path):
+    from agents import results_store
+    from agents.blob_store import BlobStore
+
+    store = results_store.ResultsStore(path=str(tmp_path / "results.db"), blobs=BlobStore(tmp_path / "blobs"))
+    monkeypatch.setattr(results_store, "_results_store", store)
+    base_dir = tmp_path / "interview_results"
+    json_path = result_path_for(base_dir / "60plus" / "张三", "20250115_100000_000001_1", "json")
+    write_result_file(json_path, full_result())
+    result_id = store.record_result(json_path, full_result())
+
+    stats = result_archive.migrate_results(base_dir)
+
+    assert stats["migrated"] == 1 and stats["failed"] == 0
+    archive_path = json_path + ".gz"
+    assert load_result_file(archive_path) == full_result()
+    assert store.query()[0]["results_path"] == archive_path
+    assert store.query()[0]["id"] == result_id
+    store.close()
@@ -0,0 +1,112 @@
+"""面试结果存储：保存、查询和重建索引"""
+
+import pytest
+
+from agents.blob_store import BlobStore
+from agents.result_archive import result_path_for, write_result_file
+from agents.results_store import ResultsStore
+
+
+def make_result(name, score, date="2025-01-15 10:00:00"):
+    return {
+        "interview_info": {
+            "interview_id": f"id-{name}",
+            "candidate_name": name,
+            "position": "AI工程师",
+            "total_score": score,
+            "interview_date": date
+        },
+        "interview_scores": {"technical_score": score, "overall_score": score},
+        "candidate_profile": {"name": name, "technical_skills": ["Python", "PyTorch", "LLM"]},
+        "interview_rounds": {
+            "technical": {"conversation": [{"role": "user", "content": f"{name} 的回答", "timestamp": date}]}
+        }
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(path=str(tmp_path / "results.db"), blobs=BlobStore(tmp_path / "blobs"))
+    yield store
+    store.close()
+
+
+def export(base_dir, name, score, stamp):
+    """按 smart_interview 的目录结构导出结果文件和 offer 文件（复制而不是硬链接）"""
+    folder = base_dir / ("60plus" if score >= 60 else "below60") / name
+    folder.mkdir(parents=True)
+    path = result_path_for(folder, stamp, "json")
+    write_result_file(path, make_result(name, score))
+    offer = folder / f"offer_letter_{stamp}.txt"
+    offer.write_text(f"{name} 的录用通知书", encoding="utf-8")
+    return path, offer
+
+
+def test_save_and_query(store):
+    high = store.save_result(make_result("张三", 85))
+    store.save_result(make_result("李四", 40, date="2025-01-16 10:00:00"))
+
+    assert store.count() == 2
+    assert [r["candidate_name"] for r in store.query()] == ["李四", "张三"]
+    assert [r["id"] for r in store.query(score_band="60plus")] == [high]
+    assert [r["id"] for r in store.query(min_score=80, tags=["ai_ml"])] == [high]
+    assert store.query(date_from="2025-01-16", date_to="2025-01-16")[0]["candidate_name"] == "李四"
+
+    restored = store.load_result(high)
+    assert restored["interview_rounds"]["technical"]["conversation"][0]["content"] == "张三 的回答"
+
+
+def test_rebuild_keeps_ids_and_offer_letters(store, tmp_path):
+    base_dir = tmp_path / "interview_results"
+    path, offer = export(base_dir, "张三", 85, "20250115_100000_000001")
+    result_id = store.record_result(path, make_result("张三", 85))
+    store.record_offer(result_id, offer, offer.read_text(encoding="utf-8"), refined_position="Machine Learning Engineer")
+    db_only = store.save_result(make_result("王五", 70))
+
+    assert store.rebuild(base_dir) == 1
+
+    assert store.count() == 2
+    record = store.query(candidate="张三")[0]
+    assert record["id"] == result_id
+    assert record["offer_path"] == str(offer)
+    assert store.query(candidate="王五")[0]["id"] == db_only
+    row = store._connect().execute(
+        "SELECT refined_position, letter_blob FROM offers WHERE result_id = ?", (result_id,)
+    ).fetchone()
+    assert row["refined_position"] == "Machine Learning Engineer"
+    assert row["letter_blob"] is not None
+    # 删除 offer 文件后仍能从内容寻址存储读取通知信
+    offer.unlink()
+    assert store.offer_letter(result_id) == "张三 的录用通知书"
+
+
+def test_rebuild_indexes_new_files_and_drops_deleted(store, tmp_path):
+    base_dir = tmp_path / "interview_results"
+    path, _ = export(base_dir, "张三", 85, "20250115_100000_000001")
+    store.record_result(path, make_result("张三", 85))
+    gone = store.record_result(str(base_dir / "below60" / "赵六" / "interview_results_x.json"), make_result("赵六", 30))
+    export(base_dir, "李四", 40, "20250116_100000_000001")
+
+    assert store.rebuild(base_dir) == 2
+
+    assert sorted(r["candidate_name"] for r in store.query()) == ["张三", "李四"]
+    assert store.load_result(gone) is None
+    assert store.offer_letter(store.query(candidate="李四")[0]["id"]) == "李四 的录用通知书"
+
+
+def test_gc_after_rebuild_keeps_copied_offer_letters(store, tmp_path):
+    base_dir = tmp_path / "interview_results"
+    path, offer = export(base_dir, "张三", 85, "20250115_100000_000001")
+    result_id = store.record_result(path, make_result("张三", 85))
+    store.record_offer(result_id, offer, "旧的通知书")
+    store.rebuild(base_dir)
+    # offer 文件在重建后被修改（复制的文件，没有硬链接到 blob）
+    offer.write_text("修改后的通知书", encoding="utf-8")
+
+    stats = store.gc_blobs(grace=-1)
+
+    # 只删除了两个旧版本的通知信（记录时的内容和重建时的文件内容），对话内容保留
+    assert stats["removed"] == 2
+    offer.unlink()
+    assert store.offer_letter(result_id) == "修改后的通知书"
+    assert store.load_result(result_id)["interview_rounds"]["technical"]["conversation"][0]["content"] == "张三 的回答"
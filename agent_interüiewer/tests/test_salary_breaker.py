@@ -0,0 +1,93 @@
+"""薪资查询熔断器计数：只有上游故障计入失败"""
+
+import asyncio
+
+import pytest
+
+from agents import hr_offer_agent
+from agents.circuit_breaker import CircuitBreaker
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=60.0)
+    monkeypatch.setattr(hr_offer_agent, "_salary_breaker", breaker)
+    return breaker
+
+
+def fake_fetch(monkeypatch, fetch):
+    monkeypatch.setattr(hr_offer_agent, "_fetch_market_salary_data", fetch)
+
+
+def test_no_data_is_not_a_failure(monkeypatch, breaker):
+    async def fetch(position, location, use_mcp=False):
+        return None
+
+    fake_fetch(monkeypatch, fetch)
+    assert asyncio.run(hr_offer_agent.fetch_market_salary_data("Rare Title", "London")) is None
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats["failures"] == 0
+    assert breaker.stats["successes"] == 1
+
+
+def test_upstream_error_counts_as_failure(monkeypatch, breaker):
+    async def fetch(position, location, use_mcp=False):
+        raise hr_offer_agent.SalaryUpstreamError("Adzuna API 请求失败（第1页）: 503")
+
+    fake_fetch(monkeypatch, fetch)
+    assert asyncio.run(hr_offer_agent.fetch_market_salary_data("Python Developer", "London")) is None
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats["failures"] == 1
+
+
+def test_timeout_counts_as_failure(monkeypatch, breaker):
+    async def fetch(position, location, use_mcp=False):
+        await asyncio.sleep(1)
+
+    fake_fetch(monkeypatch, fetch)
+    monkeypatch.setattr(hr_offer_agent, "ADZUNA_REQUEST_TIMEOUT", 0.01)
+    assert asyncio.run(hr_offer_agent.fetch_market_salary_data("Python Developer", "London")) is None
+    assert breaker.stats["failures"] == 1
+
+
+def test_cancellation_releases_probe_without_counting(monkeypatch, breaker):
+    async def fetch(position, location, use_mcp=False):
+        await asyncio.sleep(1)
+
+    async def cancel_probe():
+        task = asyncio.create_task(hr_offer_agent.fetch_market_salary_data("Python Developer", "London"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    fake_fetch(monkeypatch, fetch)
+    breaker.state = CircuitBreaker.HALF_OPEN
+    asyncio.run(cancel_probe())
+    assert breaker.stats["failures"] == 0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # 试探名额已释放，下一次请求可以继续试探
+    assert breaker.allow()
+
+
+def test_batch_no_data_is_not_a_failure(monkeypatch, breaker):
+    async def fetch(position, location, pages=None, min_samples=None):
+        return None
+
+    monkeypatch.setattr(hr_offer_agent, "MCP_AVAILABLE", False)
+    monkeypatch.setattr(hr_offer_agent, "_fetch_salary_data_http", fetch)
+    results = asyncio.run(hr_offer_agent.get_market_salary_data_batch([("Rare Title", "London")]))
+    assert results == {("Rare Title", "London"): None}
+    assert breaker.stats["failures"] == 0
+
+
+def test_batch_all_upstream_errors_count_once(monkeypatch, breaker):
+    async def fetch(position, location, pages=None, min_samples=None):
+        raise hr_offer_agent.SalaryUpstreamError("connection refused")
+
+    monkeypatch.setattr(hr_offer_agent, "MCP_AVAILABLE", False)
+    monkeypatch.setattr(hr_offer_agent, "_fetch_salary_data_http", fetch)
+    queries = [("Python Developer", "London"), ("Data Engineer", "London")]
+    results = asyncio.run(hr_offer_agent.get_market_salary_data_batch(queries))
+    assert set(results.values()) == {None}
+    assert breaker.stats["failures"] == 1
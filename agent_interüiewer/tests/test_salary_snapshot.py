@@ -0,0 +1,67 @@
+"""离线薪资快照：导入去重、合并和查询"""
+
+import json
+
+from agents.salary_snapshot import SalarySnapshot, import_salary_dumps
+
+
+def _page(what, where, jobs):
+    return {"what": what, "where": where,
+            "results": [{"id": job_id, "salary_min": low, "salary_max": high} for job_id, low, high in jobs]}
+
+
+def _write_dump(path, pages):
+    path.write_text("\n".join(json.dumps(page) for page in pages), encoding="utf-8")
+    return path
+
+
+def test_import_dedupes_job_ids_per_group(tmp_path):
+    dump = _write_dump(tmp_path / "dump.jsonl", [
+        _page("Data Scientist", "London", [("1", 40000, 60000), ("2", 60000, 80000)]),
+        # 同一查询的下一页重复出现职位 2（新数据优先）
+        _page("data  scientist", "LONDON", [("2", 80000, 100000), ("3", 100000, 120000)]),
+        # 同一职位出现在另一地点的查询结果中，不去重
+        _page("Data Scientist", "Manchester", [("1", 40000, 60000)]),
+        {"results": [{"id": "9", "salary_min": 1, "salary_max": 2}]}
+    ])
+    snapshot_dir = tmp_path / "snapshot"
+
+    stats = import_salary_dumps([dump], snapshot_dir=snapshot_dir)
+
+    assert stats["pages"] == 4
+    assert stats["skipped_pages"] == 1
+    assert stats["imported"] == 5
+    assert stats["sample_count"] == 4
+    assert stats["groups"] == 2
+
+    snapshot = SalarySnapshot(snapshot_dir)
+    london = snapshot.lookup("Data Scientist", "london")
+    assert london["sample_count"] == 3
+    assert london["min_salary"] == 50000
+    assert london["max_salary"] == 110000
+    assert snapshot.lookup("data scientist", "Manchester")["sample_count"] == 1
+    assert snapshot.lookup("Data Scientist", "Paris") is None
+    assert snapshot.lookup("Chef", "London") is None
+
+
+def test_import_merges_with_existing_snapshot(tmp_path):
+    snapshot_dir = tmp_path / "snapshot"
+    first = _write_dump(tmp_path / "first.jsonl", [_page("Engineer", "Leeds", [("1", 30000, 50000)])])
+    second = _write_dump(tmp_path / "second.jsonl", [
+        _page("Engineer", "Leeds", [("1", 50000, 70000), ("2", 70000, 90000)])
+    ])
+
+    import_salary_dumps([first], snapshot_dir=snapshot_dir)
+    stats = import_salary_dumps([second], snapshot_dir=snapshot_dir)
+
+    assert stats["sample_count"] == 2
+    result = SalarySnapshot(snapshot_dir).lookup("engineer", "leeds")
+    assert result["sample_count"] == 2
+    # 重新导入的职位 1 使用新的薪资
+    assert result["min_salary"] == 60000
+
+
+def test_missing_snapshot_returns_none(tmp_path):
+    snapshot = SalarySnapshot(tmp_path / "missing")
+    assert not snapshot.exists
+    assert snapshot.lookup("Engineer", "Leeds") is None
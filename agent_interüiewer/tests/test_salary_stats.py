@@ -0,0 +1,95 @@
+"""薪资统计引擎：精确分位数、流式草图和分数到百分位数的映射"""
+
+import numpy as np
+import pytest
+
+from agents.hr_offer_agent import SalaryAccumulator
+from agents.salary_stats import (
+    QUANTILE_GRID,
+    QuantileSketch,
+    compute_salary_statistics,
+    merge_market_data,
+    score_to_percentile,
+    suggest_salaries
+)
+
+
+def adzuna_page(salaries):
+    return {"results": [{"salary_min": s - 5000, "salary_max": s + 5000} for s in salaries]}
+
+
+def test_compute_salary_statistics_matches_numpy():
+    salaries = [30000, 45000, 52000, 61000, 75000, 90000, 120000]
+    stats = compute_salary_statistics(salaries + [float("nan")])
+
+    assert stats["sample_count"] == 7
+    assert stats["min_salary"] == 30000
+    assert stats["max_salary"] == 120000
+    assert stats["median_salary"] == 61000
+    assert stats["quantiles"] == pytest.approx(np.quantile(salaries, QUANTILE_GRID), abs=0.01)
+    assert sum(stats["histogram"]["counts"]) == 7
+    assert compute_salary_statistics([]) is None
+
+
+def test_sketch_is_exact_for_small_samples_and_close_after_compression():
+    rng = np.random.default_rng(0)
+    small = rng.normal(55000, 12000, 500)
+    sketch = QuantileSketch()
+    sketch.extend(small)
+    assert sketch.quantile(QUANTILE_GRID) == pytest.approx(np.quantile(small, QUANTILE_GRID))
+
+    large = rng.normal(55000, 12000, 20000)
+    merged = QuantileSketch()
+    for part in np.array_split(large, 8):
+        page = QuantileSketch()
+        page.extend(part)
+        merged.merge(page)
+    assert merged.count == 20000
+    assert merged.quantile(0.5) == pytest.approx(np.median(large), rel=0.01)
+    assert merged.quantile(0.0) == large.min()
+    assert merged.quantile(1.0) == large.max()
+
+
+def test_accumulator_matches_exact_engine():
+    # 客户端逐页折叠的结果与一次性精确计算一致（MCP 服务器使用同一草图）
+    pages = [[40000, 50000, 60000], [55000, 65000], [70000, 80000, 95000]]
+    accumulator = SalaryAccumulator()
+    for page in pages:
+        accumulator.add_page(adzuna_page(page))
+    exact = compute_salary_statistics([s for page in pages for s in page])
+
+    result = accumulator.result()
+    for key in ("average_salary", "min_salary", "max_salary", "median_salary", "sample_count", "quantiles", "histogram"):
+        assert result[key] == exact[key]
+
+
+def test_mcp_server_matches_client_statistics():
+    server = pytest.importorskip("mcp_servers.adzuna_mcp_server", exc_type=ImportError)
+    pages = [[40000, 50000, 60000], [55000, 65000, 95000]]
+    stats = server.AdzunaMCPServer.new_salary_stats()
+    accumulator = SalaryAccumulator()
+    for page in pages:
+        server.AdzunaMCPServer.fold_salary_page(stats, adzuna_page(page))
+        accumulator.add_page(adzuna_page(page))
+
+    result = server.AdzunaMCPServer.salary_stats_result(stats)
+    assert result.pop("success") is True
+    assert result == accumulator.result()
+
+
+def test_score_to_percentile_breakpoints():
+    assert score_to_percentile([60, 65, 70, 78, 100]) == pytest.approx([0.40, 0.50, 0.60, 0.75, 0.90])
+    # 断点范围外取端点
+    assert score_to_percentile(30) == pytest.approx(0.40)
+    assert score_to_percentile(120) == pytest.approx(0.90)
+
+
+def test_suggest_salaries_and_merge():
+    market = compute_salary_statistics(np.linspace(40000, 80000, 101))
+    suggestion = suggest_salaries([70, 78], market)
+    assert suggestion["suggested"] == pytest.approx([64000, 70000])
+    assert np.all(suggestion["range_min"] < suggestion["suggested"])
+    assert np.all(suggestion["suggested"] < suggestion["range_max"])
+
+    merged = merge_market_data([market, None, market])
+    assert merged["median_salary"] == pytest.approx(market["median_salary"], rel=0.01)
@@ -0,0 +1,36 @@
+"""技能分类体系：多模式匹配与按类别计分"""
+
+from agents.skill_taxonomy import KeywordAutomaton, analyze_candidate, match_labels, score_skills
+
+
+def test_automaton_matches_overlapping_keywords():
+    automaton = KeywordAutomaton({"微服务": {"a"}, "微服务架构": {"b"}, "服务": {"c"}, "he": {"d"}, "she": {"e"}})
+    assert automaton.labels("基于微服务架构") == {"a", "b", "c"}
+    assert automaton.labels("ushers") == {"d", "e"}
+    assert automaton.labels("无关文本") == frozenset()
+
+
+def test_match_labels_is_case_sensitive_substring():
+    labels = match_labels("熟悉LLM微调")
+    assert ("skill", "ai_ml") in labels
+    assert ("signal", "llm") in labels
+    assert ("skill", "ai_ml") not in match_labels("llm")
+
+
+def test_analyze_candidate_counts_skills_and_projects():
+    projects = [{"name": "RAG 知识库", "description": "基于大模型的后端 API 服务"}, "数据仓库 ETL"]
+    analysis = analyze_candidate(["Python", "PyTorch 深度学习", "FastAPI", "Redis"], projects)
+
+    assert analysis["skill_counts"]["ai_ml"] == 1
+    assert analysis["skill_counts"]["backend_dev"] == 2
+    assert analysis["project_counts"]["ai_ml"] == 1
+    assert analysis["project_analysis"]["ai_ml_projects"] == 1
+    assert analysis["project_analysis"]["data_projects"] == 1
+    assert "ml" in analysis["skill_signals"]
+    assert "llm" in analysis["project_signals"]
+
+
+def test_score_skills_weights_and_category_subset():
+    scores = score_skills(["LLM", "Django"], categories=["ai_ml", "backend_dev"])
+    assert scores == {"ai_ml": 1.5, "backend_dev": 1.0}
+    assert score_skills(["LLM", "Django"], categories=["ai_ml"], weighted=False) == {"ai_ml": 1}
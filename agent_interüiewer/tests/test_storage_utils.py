@@ -0,0 +1,40 @@
+"""存储工具：唯一时间戳和原子写入"""
+
+import json
+import threading
+
+from agents.storage_utils import atomic_write_json, interview_stamp, new_interview_id, unique_stamp
+
+
+def test_unique_stamp_is_strictly_increasing_across_threads():
+    stamps = []
+
+    def worker():
+        for _ in range(500):
+            stamps.append(unique_stamp())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(stamps)) == len(stamps)
+    ordered = sorted(stamps)
+    # 按字符串排序即按时间排序：后生成的时间戳不会小于之前的
+    assert unique_stamp() > ordered[-1]
+
+
+def test_interview_id_and_stamp():
+    interview_id = new_interview_id()
+    assert interview_id.startswith("INT_")
+    assert interview_stamp(interview_id) == interview_id[4:]
+    assert interview_stamp("20250115_100000_000001_1") == "20250115_100000_000001_1"
+
+
+def test_atomic_write_json_replaces_file(tmp_path):
+    path = tmp_path / "nested" / "result.json"
+    atomic_write_json(path, {"a": 1})
+    atomic_write_json(path, {"a": 2, "名字": "张三"})
+    assert json.loads(path.read_text(encoding="utf-8")) == {"a": 2, "名字": "张三"}
+    assert [p.name for p in path.parent.iterdir()] == ["result.json"]
@@ -0,0 +1,87 @@
+"""职位名称翻译：规则翻译、大模型回复解析和失败缓存"""
+
+import asyncio
+
+import pytest
+
+from agents import title_translator
+from agents.title_translator import TitleTranslationCache, _parse_llm_translations, translate_title_by_rules
+
+
+@pytest.mark.parametrize("title, english", [
+    ("高级Java开发工程师", "Senior Java Developer"),
+    ("资深前端开发工程师", "Senior Frontend Developer"),
+    ("大模型算法工程师", "LLM Algorithm Engineer"),
+    ("数据分析师", "Data Analyst"),
+    ("C++/嵌入式开发工程师", "C++ Embedded Developer"),
+])
+def test_translate_title_by_rules(title, english):
+    assert translate_title_by_rules(title) == english
+
+
+@pytest.mark.parametrize("title", ["高级Java", "区块链智能合约工程师", "前端"])
+def test_translate_title_by_rules_rejects_partial_titles(title):
+    # 没有角色词或含有词表外的中文时交给大模型
+    assert translate_title_by_rules(title) is None
+
+
+def test_parse_llm_translations_strips_think_block():
+    response = {"content": '<think>先想想 {"草稿": "x"} 怎么翻译</think>\n{"区块链智能合约工程师": "Blockchain Smart Contract Engineer"}'}
+    assert _parse_llm_translations(response, ["区块链智能合约工程师"]) == {
+        "区块链智能合约工程师": "Blockchain Smart Contract Engineer"
+    }
+    # 只有结束标签（开头被服务端截掉）
+    response = '思考过程 {x}</think>{"区块链智能合约工程师": "Smart Contract Engineer"}'
+    assert _parse_llm_translations(response, ["区块链智能合约工程师"]) == {"区块链智能合约工程师": "Smart Contract Engineer"}
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    monkeypatch.setenv("SILICONFLOW_API_KEY", "test-key")
+    monkeypatch.setattr(title_translator, "TITLE_TRANSLATION_LLM", True)
+    monkeypatch.setattr(title_translator, "SALARY_SOURCE", "online")
+    return TitleTranslationCache(tmp_path / "titles.json")
+
+
+def test_failed_translation_is_cached(monkeypatch, cache):
+    calls = []
+
+    async def failing_llm(titles):
+        calls.append(titles)
+        raise RuntimeError("服务不可用")
+
+    monkeypatch.setattr(cache, "_translate_with_llm", failing_llm)
+    for _ in range(3):
+        assert asyncio.run(cache.translate("区块链智能合约工程师")) is None
+    assert len(calls) == 1
+    assert cache.failed_recently("区块链智能合约工程师")
+
+    # 失败记录随缓存文件保存，重启后同样生效
+    assert TitleTranslationCache(cache.path).failed_recently("区块链智能合约工程师")
+
+    # 超过重试间隔后重新调用大模型
+    monkeypatch.setattr(title_translator, "TITLE_TRANSLATION_RETRY_AFTER", 0)
+    asyncio.run(cache.translate("区块链智能合约工程师"))
+    assert len(calls) == 2
+
+
+def test_llm_translation_times_out(monkeypatch, cache):
+    async def slow_llm(titles):
+        await asyncio.sleep(1)
+        return {titles[0]: "Too Late"}
+
+    monkeypatch.setattr(cache, "_translate_with_llm", slow_llm)
+    monkeypatch.setattr(title_translator, "TITLE_TRANSLATION_TIMEOUT", 0.01)
+    assert asyncio.run(cache.translate("区块链智能合约工程师")) is None
+    assert cache.failed_recently("区块链智能合约工程师")
+
+
+def test_offline_mode_skips_llm(monkeypatch, cache):
+    async def unexpected_llm(titles):
+        raise AssertionError("离线模式不应调用大模型")
+
+    monkeypatch.setattr(cache, "_translate_with_llm", unexpected_llm)
+    monkeypatch.setattr(title_translator, "SALARY_SOURCE", "offline")
+    assert not cache.llm_enabled
+    assert asyncio.run(cache.translate("区块链智能合约工程师")) is None
+    assert asyncio.run(cache.translate("高级Java开发工程师")) == "Senior Java Developer"